@@ -0,0 +1,105 @@
+import importlib
+import os
+
+from log_columnar import ParquetReport
+from log_discovery import get_log_files_in_date_range
+from log_partitions import PartitionedReport
+from log_reports import run_reports
+from log_store import STORE_PATH, ResultStore, StoreReport
+
+def main():
+    """
+    Main function to run the script. It runs the whole daily set of reports
+    in one pass: the shares are listed once, every file is read once, and
+    each file is handed to every report that wants it. Each report writes
+    the same rows its own script would, to '<OUTPUT_DIR>/<script>.csv', or
+    to a '<OUTPUT_DIR>/<script>/Date=.../Station=.../' Parquet dataset.
+    """
+    # --- !!! IMPORTANT: SET YOUR VARIABLES HERE !!! ---
+
+    # 1. The shares to read. .log reports only see .log files and .txt
+    #    reports only .txt files, whichever pattern found them.
+    #    Note: Use forward slashes '/'.
+    LOG_PATTERNS = [
+        'Z:/Bianca/????-??-??/??/*.log',
+        'Z:/MACHINE/Analysis/????-??-??/??/*.txt',
+    ]
+
+    # 2. Set your desired date range
+    START_DATE = "2026-05-15"
+    END_DATE   = "2026-05-15"
+
+    # 3. The reports to run, by script name. Comment out the ones you don't need.
+    REPORTS = [
+        'AnalysisTIM',
+        'AnalysisEC140',
+        'AnalysisSN_TestParts',
+        'AnalysisEC140_NVL_SN',
+        'AnalysisEC140_GetNVLChannel_FromLogFile',
+        'AnalysisEC140_EC585_and_PASS_GetNVLChannel_FromLogFile',
+        'AnalysisEC140_TRAY__GetNVLChannel_FromLogFile',
+        'AnalysisEC_ByStation_FromLogFile',
+        'Analysis_MODS-700000122233',
+    ]
+
+    # 4. Also upsert every new or changed .log into the local result store
+    #    (see AnalysisResultStore.py) from the same read
+    UPDATE_RESULT_STORE = True
+
+    # 5. 'csv' or 'parquet'. Parquet (needs pyarrow) stores the repetitive
+    #    string columns dictionary-encoded and compressed, partitioned by
+    #    date and station; pandas.read_parquet(path, columns=[...]) reads
+    #    just the columns it needs.
+    OUTPUT_FORMAT = 'csv'
+
+    # 6. Keep each report's rows per hour folder under .log_cache/partitions
+    #    and build the CSVs from them, so only new or changed hours are
+    #    parsed and overlapping windows reuse each other's work. CSV only.
+    INCREMENTAL = True
+
+    # 7. Concurrent reads against the share, and how many files may be read
+    #    ahead of the parser. Keep READERS low enough not to flood the server.
+    READERS = 8
+    MAX_IN_FLIGHT = 32
+
+    # --- Run the function ---
+
+    output_dir = 'DailyReports_' + START_DATE + '_' + END_DATE
+
+    final_file_list = []
+    for pattern in dict.fromkeys(LOG_PATTERNS):
+        final_file_list.extend(get_log_files_in_date_range(pattern, START_DATE, END_DATE))
+
+    if not final_file_list:
+        print("--- No log files found matching the criteria. ---")
+        return
+
+    # Every script exposes make_report(); the MODS one has a '-' in its
+    # name, so they are all imported by name
+    reports = []
+    for script_name in REPORTS:
+        module = importlib.import_module(script_name)
+        report = module.make_report(os.path.join(output_dir, script_name + '.csv'))
+        if OUTPUT_FORMAT == 'parquet':
+            report = ParquetReport.from_csv_report(report, os.path.join(output_dir, script_name))
+        elif INCREMENTAL:
+            report = PartitionedReport(report, script_name)
+        reports.append(report)
+
+    store = ResultStore(STORE_PATH) if UPDATE_RESULT_STORE else None
+    if store is not None:
+        reports.append(StoreReport(store))
+
+    try:
+        file_count = run_reports(final_file_list, reports, readers=READERS, max_in_flight=MAX_IN_FLIGHT)
+    except Exception as e:
+        print(f"Error writing reports: {e}")
+        return
+    finally:
+        if store is not None:
+            store.close()
+
+    print(f"\n{len(reports)} report(s) built from one read of {file_count} file(s). Written to {output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os
+import csv
+from dataclasses import asdict
+
+from log_cache import CACHE_DIR, parse_files_incrementally
+from log_discovery import get_log_files_in_date_range, parse_log_name
+from log_parsers import DiagResult, diag_result_matches, read_diag_results
+
+# Exit codes written to the CSV. Every row of every table is parsed and kept
+# in the manifest regardless, so changing this never rescans the share.
+# EXIT_CODE_FILTER = 'MODS-000000000140'
+# EXIT_CODE_FILTER = ['MODS-000000000140', 'MODS-700000122233']
+EXIT_CODE_FILTER = None
+
+# Leave the OK rows out of the CSV.
+FAILED_ONLY = True
+
+def parse_log_file(file_path):
+    """
+    Parses every ONEDIAG result row of a single log file, OK rows included.
+
+    Args:
+        file_path (str): The full path to the log file.
+
+    Returns:
+        list: A list of dictionaries, one per result row, with the board SN
+              and station decoded from the file name.
+    """
+    log_name = parse_log_name(file_path)
+    sn = log_name.sn if log_name else None
+    station = log_name.station if log_name else None
+
+    extracted_data = []
+    for result in read_diag_results(file_path):
+        row = {'SN': sn, 'Station': station}
+        row.update(asdict(result))
+        row['log_file_name'] = os.path.basename(file_path)
+        extracted_data.append(row)
+
+    return extracted_data
+
+def main():
+    """
+    Main function to run the script. It finds all .log files within any
+    'yyyy-mm-dd' formatted subdirectories, parses every ONEDIAG result table
+    once, and writes the rows matching EXIT_CODE_FILTER to a CSV file.
+    """
+    # --- !!! IMPORTANT: SET YOUR VARIABLES HERE !!! ---
+
+    # 1. This is your original glob pattern
+    #    Note: Use forward slashes '/'.
+    LOG_PATTERN = 'Z:/Bianca/????-??-??/??/*.log'
+    # LOG_PATTERN = 'D:/TestLogs/????-??-??/??/*.log'
+
+    # 2. Set your desired date range
+    START_DATE = "2026-03-20"
+    END_DATE   = "2026-03-20"
+
+    # Worker processes used to parse new/changed files (None = all cores, 1 = serial)
+    WORKERS = None
+
+    # --- Run the function ---
+
+    final_file_list = get_log_files_in_date_range(LOG_PATTERN, START_DATE, END_DATE)
+    if not final_file_list:
+        print("--- No .log files found matching the criteria. ---")
+        return
+
+    csv_output_path = 'DiagResults_' + START_DATE + '_' + END_DATE + '.csv'
+    # Define the column headers for the CSV
+    fieldnames = ['SN', 'Station'] + list(DiagResult.__dataclass_fields__) + ['log_file_name']
+    manifest_path = os.path.join(CACHE_DIR, 'diag_results_manifest.json')
+    log_files_to_parse = [file_path for file_path in final_file_list if file_path.endswith(".log")]
+
+    # Only new or changed files are parsed; the rest come from the manifest.
+    all_data = parse_files_incrementally(log_files_to_parse, parse_log_file, manifest_path,
+                                         fieldnames, workers=WORKERS)
+
+    # Filtering happens on the already-parsed rows, not on the logs
+    all_data = [row for row in all_data
+                if diag_result_matches(DiagResult.from_dict(row), EXIT_CODE_FILTER, FAILED_ONLY)]
+
+    if not all_data:
+        print("No matching result rows found in any of the log files.")
+        return
+
+    # Write the extracted data to a CSV file
+    try:
+        with open(csv_output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+
+            writer.writeheader()
+            writer.writerows(all_data)
+
+        print(f"\nSuccessfully parsed log files. {len(all_data)} row(s) written to {csv_output_path}")
+    except Exception as e:
+        print(f"Error writing to CSV file: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -2,25 +2,69 @@ import csv
 import glob
 import os
 
-def get_value_from_log(file_content: str, key: str) -> str:
+from log_parsers import parse_txt_bytes, read_txt_values
+from log_reports import CsvReport
+
+# The primary key to filter by
+FILTER_KEY = "CoreErrorCode"
+
+# The other keys to extract if the filter matches
+KEYS_TO_EXTRACT = [
+    "SN",
+    "ProcessName",
+    "NVL0_SN",
+    "NVL1_SN",
+    "HOST_DATE_TIME",
+    "BMC_IP",
+    "DUT_IP",
+    "HOST_IP"
+]
+
+def match_row(file_path, values):
     """
-    Parses the given text to find the value for a specific key using an exact match.
+    Builds the CSV row of one .txt file if its CoreErrorCode ends with "140".
 
     Args:
-        file_content: A string containing the log file's text.
-        key: The exact key to search for.
+        file_path: The full path to the .txt file.
+        values: Its values, holding FILTER_KEY and KEYS_TO_EXTRACT.
 
     Returns:
-        The corresponding value as a string, or "Value not found" message.
+        A dictionary for the CSV row, or None if the file doesn't match.
+    """
+    # Get the value of the key we are filtering by
+    error_code = values[FILTER_KEY]
+
+    # Check if the error code ends with "140"
+    if not error_code.endswith("140"):
+        return None
+
+    print(f"\nFound matching file: '{file_path}' (CoreErrorCode: {error_code})")
+
+    # Create a dictionary to hold the data for the current file
+    result_row = {'Filepath': file_path, FILTER_KEY: error_code}
+
+    # If it matches, extract the other specified values
+    for key in KEYS_TO_EXTRACT:
+        value = values[key]
+        result_row[key] = value
+        print(f"- {key}: {value}")
+
+    return result_row
+
+def parse_txt_data(file_path, data):
+    """
+    Returns the CSV row of one .txt file, given its contents, or no row if
+    it doesn't match.
+    """
+    result_row = match_row(file_path, parse_txt_bytes(data, [FILTER_KEY] + KEYS_TO_EXTRACT))
+    return [result_row] if result_row is not None else []
+
+def make_report(output_path: str) -> CsvReport:
+    """
+    This script's rows as a report for log_reports.run_reports.
     """
-    for line in file_content.splitlines():
-        parts = line.split('=', 1)
-        if len(parts) == 2:
-            found_key = parts[0].strip()
-            if found_key == key:
-                value = parts[1].strip()
-                return value
-    return "Value not found"
+    return CsvReport('Core error 140', output_path, ['Filepath', FILTER_KEY] + KEYS_TO_EXTRACT,
+                     parse_txt_data, suffix='.txt')
 
 def main():
     # """
@@ -61,46 +105,17 @@ def main():
 
     print(f"Found {len(log_files)} log file(s) to scan.")
 
-    # The primary key to filter by
-    filter_key = "CoreErrorCode"
-    
-    # The other keys to extract if the filter matches
-    keys_to_extract = [
-        "SN",
-        "ProcessName",
-        "NVL0_SN",
-        "NVL1_SN",
-        "HOST_DATE_TIME",
-        "BMC_IP",
-        "DUT_IP",
-        "HOST_IP"
-    ]
-    
     # List to hold all the rows of data for the CSV file
     all_results = []
 
     try:
         # Process each log file found
         for file_path in log_files:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Get the value of the key we are filtering by
-            error_code = get_value_from_log(content, filter_key)
-
-            # Check if the error code ends with "140"
-            if error_code.endswith("140"):
-                print(f"\nFound matching file: '{file_path}' (CoreErrorCode: {error_code})")
-                
-                # Create a dictionary to hold the data for the current file
-                result_row = {'Filepath': file_path, filter_key: error_code}
-                
-                # If it matches, extract the other specified values
-                for key in keys_to_extract:
-                    value = get_value_from_log(content, key)
-                    result_row[key] = value
-                    print(f"- {key}: {value}")
-                
+            # One pass over the file, stopping once every key is found
+            values = read_txt_values(file_path, [FILTER_KEY] + KEYS_TO_EXTRACT)
+            result_row = match_row(file_path, values)
+
+            if result_row is not None:
                 all_results.append(result_row)
             else:
                 # Optional: print which files are being skipped
@@ -113,7 +128,7 @@ def main():
             
         with open(csv_output_path, 'w', newline='', encoding='utf-8') as csvfile:
             # Define the header based on the keys of the first result
-            header = ['Filepath', filter_key] + keys_to_extract
+            header = ['Filepath', FILTER_KEY] + KEYS_TO_EXTRACT
             writer = csv.DictWriter(csvfile, fieldnames=header)
             
             # Write the header and all the result rows
@@ -2,11 +2,14 @@ import os
 import csv
 import re
 import csv
-import glob
 import os
-import sys
 from pathlib import Path
-from datetime import datetime, date
+from datetime import datetime
+
+from log_discovery import get_log_files_in_date_range, parse_log_name
+from log_parallel import run_io_pipeline
+from log_parsers import filter_diag_results, map_file, parse_fru_and_diag_bytes, parse_lane_ber
+from log_reports import CsvReport
 
 LBPCB_FAIL_SN = {'1821925953098':0, '1822025953976':0, 
                     '1822325950716':0, '1822325950442':0, 
@@ -17,65 +20,8 @@ LBPCB_FAIL_SN = {'1821925953098':0, '1822025953976':0,
 # TO-DO: Initialize a dictionary to keep track of total LBPCB serial numbers
 TOTAL_LBPCB_SN = {}
 
-def get_log_files_in_date_range(base_pattern: str, 
-                                start_date_str: str, 
-                                end_date_str: str) -> list[str]:
-    """
-    Finds log files from a glob pattern that fall within a date range.
-
-    Args:
-        base_pattern: The glob pattern to search (e.g., 'Z:/.../*.txt').
-        start_date_str: The start date in 'YYYY-MM-DD' format (inclusive).
-        end_date_str: The end date in 'YYYY-MM-DD' format (inclusive).
-
-    Returns:
-        A list of file paths that match the criteria.
-    """
-    
-    # --- 1. Define Date Range ---
-    try:
-        start_date = date.fromisoformat(start_date_str)
-        end_date = date.fromisoformat(end_date_str)
-    except ValueError as e:
-        print(f"Error: Invalid date format. Please use YYYY-MM-DD. Details: {e}", file=sys.stderr)
-        return []
-
-    print(f"Filtering for dates: {start_date} to {end_date}\n")
-
-    # --- 2. Get ALL files matching the pattern ---
-    # This is your original line of code
-    all_log_files = glob.glob(base_pattern)
-    
-    if not all_log_files:
-        print(f"Warning: glob pattern '{base_pattern}' found 0 files.", file=sys.stderr)
-        return []
-
-    # --- 3. Filter the results ---
-    filtered_log_files = []
-    
-    for file_path in all_log_files:
-        try:
-            # We need to extract the date string 'YYYY-MM-DD' from the path.
-            # os.path.dirname(file_path) -> 'Z:/MACHINE/Analysis/2025-10-15/03'
-            # os.path.dirname(...) -> 'Z:/MACHINE/Analysis/2025-10-15'
-            # os.path.basename(...) -> '2025-10-15'
-            
-            date_str = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
-            
-            # Convert the folder name to a date object
-            current_date = date.fromisoformat(date_str)
-            
-            # The core logic: check if the date is within the desired range
-            if start_date <= current_date <= end_date:
-                filtered_log_files.append(file_path)
-                
-        except ValueError:
-            # This handles cases where a file path matches the glob
-            # but the folder name isn't a valid date (e.g., 'ABCD-12-34')
-            # We simply ignore that file.
-            continue
-            
-    return filtered_log_files
+# Column headers for the CSV
+FIELDNAMES = ['SN', 'log_file_name', 'GPU', 'Nvlink', 'Lane', 'BER', 'BER_Threshold', 'BER_Margin', 'NVL0_SN', 'NVL1_SN']
 
 def parse_log_file(file_path):
     """
@@ -90,118 +36,109 @@ def parse_log_file(file_path):
               the extracted data for a matching log entry. Returns an
               empty list if no matching entries are found.
     """
+    # Scanned through a read-only mapping; only marker lines are decoded
+    with map_file(file_path) as data:
+        return parse_log_bytes(file_path, data)
+
+def parse_log_bytes(file_path, data):
+    """
+    Extracts the ProcMod_0/CBC serials and the MODS-000000000140 rows from
+    the contents of one log file.
+
+    Args:
+        file_path (str): The full path to the log file.
+        data (bytes): The file contents, as fetched by the I/O pipeline or
+                      mapped by parse_log_file.
+
+    Returns:
+        list: A list of dictionaries, one per matching entry.
+    """
     extracted_data = []
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            results = {}
-            device_name = ""
-
-            for i, line in enumerate(lines):
-                procmod_0 = None
-                
-                if "FRU Device Description" in line:
-                    if "ProcMod_0" in line:
-                        procmod_0 = "ProcMod_0"
-
-                if procmod_0 and (i + 2) < len(lines):
-                    serial_line = lines[i + 2]
-                    if "Board Serial Number" in serial_line:
-                        serial_number = serial_line.split()[-1]
-                        results["SN"] = serial_number
-            sn_548 = results.get("SN", "N/A")
-
-            for i, line in enumerate(lines):
-                if "FRU Device Description" in line:
-                    if "CBC_0" in line:
-                        device_name = "CBC_0"
-                    elif "CBC_1" in line:
-                        device_name = "CBC_1"
-                
-                if device_name and (i + 2) < len(lines):
-                    serial_line = lines[i + 2]
-                    if "Board Serial Number" in serial_line:
-                        serial_number = serial_line.split()[-1]
-                        results[device_name] = serial_number
-
-            cbc0 = results.get("CBC_0")
-            cbc1 = results.get("CBC_1")
-
-            if cbc0 in LBPCB_FAIL_SN: 
-                LBPCB_FAIL_SN[cbc0] += 1
-                print(f"Key '{cbc0}' found and its value was incremented.")
-            else:
-                 print(f"Key '{cbc0}' not found in the dictionary.")
-
-            if cbc1 in LBPCB_FAIL_SN: 
-                LBPCB_FAIL_SN[cbc1] += 1
-                print(f"Key '{cbc1}' found and its value was incremented.")
-            else:
-                 print(f"Key '{cbc1}' not found in the dictionary.")
-
-            # Iterate through each line with its index
-            for i, line in enumerate(lines):
-                # Condition 1: Check for header keywords in the current line
-                if "Exit Code" in line and "Component Id" in line:
-                    # Ensure we don't go out of bounds when checking the next line
-                    if i + 2 < len(lines):
-                        next_line = lines[i+2]
-
-                        # Condition 2: Check for the specific module code in the next line
-                        if "MODS-000000000140" in next_line:
-                            # Use regular expressions to find the data in the next line.
-                            # This pattern is more specific to match formats like "GPU0_..."
-                            if "_FCT_" in file_path: # GPU0_0008:06:00.0
-                                gpu_match = re.search(r"(GPU\d+_\S+),", next_line)
-
-                            if "_NVL_" in file_path: # GPU 1 [0009:06:00.0]
-                                gpu_match = re.search(r"(GPU \d+ \[\S+),", next_line)
-
-                            # This pattern looks for "Nvlink" followed by space(s) and digits.
-                            nvlink_match = re.search(r"Nvlink\s+(\d+)", next_line)
-                            # This pattern looks for "Lane" followed by space(s) and digits.
-                            lane_match = re.search(r"Lane\s+(\d+)", next_line)
-
-                            # Extract the matched group, otherwise assign "N/A"
-                            gpu = gpu_match.group(1) if gpu_match else "N/A"
-                            nvlink = nvlink_match.group(1) if nvlink_match else "N/A"
-                            lane = lane_match.group(1) if lane_match else "N/A"
-
-                            # Store the found data
-                            extracted_data.append({
-                                'SN': sn_548,
-                                'log_file_name': os.path.basename(file_path),
-                                'GPU': gpu,
-                                'Nvlink': nvlink,
-                                'Lane': lane,
-                                'NVL0_SN' : cbc0,
-                                'NVL1_SN' : cbc1
-                            })
-    except Exception as e:
-        print(f"Error processing file {file_path}: {e}")
+    # One pass collects the FRU serials and every ONEDIAG result row
+    fru_serials, diag_results = parse_fru_and_diag_bytes(data)
+    sn_548 = fru_serials.get("ProcMod_0", "N/A")
+
+    cbc0 = fru_serials.get("CBC_0")
+    cbc1 = fru_serials.get("CBC_1")
+
+    if cbc0 in LBPCB_FAIL_SN: 
+        LBPCB_FAIL_SN[cbc0] += 1
+        print(f"Key '{cbc0}' found and its value was incremented.")
+    else:
+         print(f"Key '{cbc0}' not found in the dictionary.")
+
+    if cbc1 in LBPCB_FAIL_SN: 
+        LBPCB_FAIL_SN[cbc1] += 1
+        print(f"Key '{cbc1}' found and its value was incremented.")
+    else:
+         print(f"Key '{cbc1}' not found in the dictionary.")
+
+    # Every row of every result table, filtered by exit code
+    for result in filter_diag_results(diag_results, "MODS-000000000140"):
+        # Use regular expressions to find the data in the result row.
+        # This pattern is more specific to match formats like "GPU0_..."
+        if "_FCT_" in file_path: # GPU0_0008:06:00.0
+            gpu_match = re.search(r"(GPU\d+_\S+),", result.component_id)
+
+        if "_NVL_" in file_path: # GPU 1 [0009:06:00.0]
+            gpu_match = re.search(r"(GPU \d+ \[\S+),", result.component_id)
+
+        # This pattern looks for "Nvlink" followed by space(s) and digits.
+        nvlink_match = re.search(r"Nvlink\s+(\d+)", result.component_id)
+        # This pattern looks for "Lane" followed by space(s) and digits.
+        lane_match = re.search(r"Lane\s+(\d+)", result.component_id)
+
+        # Extract the matched group, otherwise assign "N/A"
+        gpu = gpu_match.group(1) if gpu_match else "N/A"
+        nvlink = nvlink_match.group(1) if nvlink_match else "N/A"
+        lane = lane_match.group(1) if lane_match else "N/A"
+
+        # Measured and limit BER as numbers (None for non-BER rows)
+        lane_ber = parse_lane_ber(result)
+        ber = lane_ber.measured if lane_ber else None
+        ber_threshold = lane_ber.threshold if lane_ber else None
+        ber_margin = lane_ber.margin if lane_ber else None
+
+        # Store the found data
+        extracted_data.append({
+            'SN': sn_548,
+            'log_file_name': os.path.basename(file_path),
+            'GPU': gpu,
+            'Nvlink': nvlink,
+            'Lane': lane,
+            'BER': ber,
+            'BER_Threshold': ber_threshold,
+            'BER_Margin': ber_margin,
+            'NVL0_SN' : cbc0,
+            'NVL1_SN' : cbc1
+        })
 
     return extracted_data
 
 def check_filename(filename: str) -> bool:
     """
-    Checks if a filename contains either '_FCT_' or '_NVL_'.
+    Checks if a file is a FAIL log, using the fields decoded from its name.
 
     Args:
-        filename: The name of the file (e.g., "my_file.txt").
+        filename: The name or path of the file.
 
     Returns:
-        True if either substring is found, False otherwise.
+        True for FAIL logs, False otherwise.
     """
+    log_name = parse_log_name(filename)
+    if log_name is None:
+        # Name doesn't follow the usual layout; fall back to a substring test
+        return "_F_" in filename
 
-    if "_F_" in filename:
-         return True
-    # if "_FCT_" in filename:
-    #    return True
-    # if "_NVL_" in filename:
-    #    return True
-    
-    # If neither substring was found, return False
-    return False
+    # return log_name.failed and log_name.station in ('FCT', 'NVL', 'IST')
+    return log_name.failed
+
+def make_report(output_path: str) -> CsvReport:
+    """
+    This script's rows as a report for log_reports.run_reports.
+    """
+    return CsvReport('EC140 NVL channel', output_path, FIELDNAMES, parse_log_bytes,
+                     accept_fn=check_filename)
 
 def main():
     """
@@ -219,6 +156,11 @@ def main():
     START_DATE = "2026-05-13" # "2025-10-10"
     END_DATE = "2026-05-16"   # "2025-10-15"
 
+    # 3. Concurrent reads against the share, and how many files may be read
+    #    ahead of the parser. Keep READERS low enough not to flood the server.
+    READERS = 8
+    MAX_IN_FLIGHT = 32
+
     # --- Run the function ---
     
     # Note: This will only find files if they *actually exist*
@@ -236,7 +178,7 @@ def main():
         return
 
     csv_output_path = 'core_error_140_nvlchannel_' + START_DATE + '_' + END_DATE + '.csv'
-    all_data = []
+    log_files_to_parse = []
 
     # Find all files ending with .log in the specified directory
     for file_path in final_file_list:
@@ -245,28 +187,27 @@ def main():
             continue
 
         if file_path.endswith(".log"):
-            print(f"Parsing {file_path}...")
-            data = parse_log_file(file_path)
-            if data:
-                all_data.extend(data)
-
-    if not all_data:
-        print("No matching log entries found in any of the log files.")
-        return
+            log_files_to_parse.append(file_path)
 
-    # Write the extracted data to a CSV file
+    # Reading, parsing and writing overlap; rows are streamed to the CSV
+    # in file order as soon as each log is parsed.
     try:
         with open(csv_output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            # Define the column headers for the CSV
-            fieldnames = ['SN', 'log_file_name', 'GPU', 'Nvlink', 'Lane', 'NVL0_SN', 'NVL1_SN']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
 
             writer.writeheader()
-            writer.writerows(all_data)
-
-        print(f"\nSuccessfully parsed log files. Data written to {csv_output_path}")
+            row_count = run_io_pipeline(log_files_to_parse, parse_log_bytes, writer.writerows,
+                                        readers=READERS, max_in_flight=MAX_IN_FLIGHT)
     except Exception as e:
         print(f"Error writing to CSV file: {e}")
+        return
+
+    if not row_count:
+        os.remove(csv_output_path)
+        print("No matching log entries found in any of the log files.")
+        return
+
+    print(f"\nSuccessfully parsed log files. Data written to {csv_output_path}")
 
     print(LBPCB_FAIL_SN)
 
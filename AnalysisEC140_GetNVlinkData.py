@@ -2,6 +2,8 @@ import os
 import csv
 import re
 
+from log_parsers import filter_diag_results, map_file, parse_fru_and_diag_bytes
+
 LBPCB_FAIL_SN = {'1821925953098':0, '1822025953976':0, 
                     '1822325950716':0, '1822325950442':0, 
                     '1822625959024':0, '1822625959209':0, 
@@ -23,40 +25,14 @@ def parse_log_file(file_path):
     """
     extracted_data = []
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            results = {}
-            device_name = ""
-
-            for i, line in enumerate(lines):
-                procmod_0 = None
-                
-                if "FRU Device Description" in line:
-                    if "ProcMod_0" in line:
-                        procmod_0 = "ProcMod_0"
-
-                if procmod_0 and (i + 2) < len(lines):
-                    serial_line = lines[i + 2]
-                    if "Board Serial Number" in serial_line:
-                        serial_number = serial_line.split()[-1]
-                        results["SN"] = serial_number
-            sn_548 = results.get("SN", "N/A")
-
-            for i, line in enumerate(lines):
-                if "FRU Device Description" in line:
-                    if "CBC_0" in line:
-                        device_name = "CBC_0"
-                    elif "CBC_1" in line:
-                        device_name = "CBC_1"
-                
-                if device_name and (i + 2) < len(lines):
-                    serial_line = lines[i + 2]
-                    if "Board Serial Number" in serial_line:
-                        serial_number = serial_line.split()[-1]
-                        results[device_name] = serial_number
-
-            cbc0 = results.get("CBC_0")
-            cbc1 = results.get("CBC_1")
+        with map_file(file_path) as data:
+            # The mapped file is searched for the FRU and result-table
+            # markers; only the lines around them are decoded
+            fru_serials, diag_results = parse_fru_and_diag_bytes(data)
+            sn_548 = fru_serials.get("ProcMod_0", "N/A")
+
+            cbc0 = fru_serials.get("CBC_0")
+            cbc1 = fru_serials.get("CBC_1")
 
             if cbc0 in LBPCB_FAIL_SN: 
                 LBPCB_FAIL_SN[cbc0] += 1
@@ -70,39 +46,31 @@ def parse_log_file(file_path):
             else:
                  print(f"Key '{cbc1}' not found in the dictionary.")
 
-            # Iterate through each line with its index
-            for i, line in enumerate(lines):
-                # Condition 1: Check for header keywords in the current line
-                if "Exit Code" in line and "Component Id" in line:
-                    # Ensure we don't go out of bounds when checking the next line
-                    if i + 2 < len(lines):
-                        next_line = lines[i+2]
-
-                        # Condition 2: Check for the specific module code in the next line
-                        if "MODS-000000000140" in next_line:
-                            # Use regular expressions to find the data in the next line.
-                            # This pattern is more specific to match formats like "GPU0_..."
-                            gpu_match = re.search(r"(GPU\d+_\S+),", next_line)
-                            # This pattern looks for "Nvlink" followed by space(s) and digits.
-                            nvlink_match = re.search(r"Nvlink\s+(\d+)", next_line)
-                            # This pattern looks for "Lane" followed by space(s) and digits.
-                            lane_match = re.search(r"Lane\s+(\d+)", next_line)
-
-                            # Extract the matched group, otherwise assign "N/A"
-                            gpu = gpu_match.group(1) if gpu_match else "N/A"
-                            nvlink = nvlink_match.group(1) if nvlink_match else "N/A"
-                            lane = lane_match.group(1) if lane_match else "N/A"
-
-                            # Store the found data
-                            extracted_data.append({
-                                'SN': sn_548,
-                                'log_file_name': os.path.basename(file_path),
-                                'GPU': gpu,
-                                'Nvlink': nvlink,
-                                'Lane': lane,
-                                'NVL0_SN' : cbc0,
-                                'NVL1_SN' : cbc1
-                            })
+            # Every row of every result table, filtered by exit code
+            for result in filter_diag_results(diag_results, "MODS-000000000140"):
+                # Use regular expressions to find the data in the result row.
+                # This pattern is more specific to match formats like "GPU0_..."
+                gpu_match = re.search(r"(GPU\d+_\S+),", result.component_id)
+                # This pattern looks for "Nvlink" followed by space(s) and digits.
+                nvlink_match = re.search(r"Nvlink\s+(\d+)", result.component_id)
+                # This pattern looks for "Lane" followed by space(s) and digits.
+                lane_match = re.search(r"Lane\s+(\d+)", result.component_id)
+
+                # Extract the matched group, otherwise assign "N/A"
+                gpu = gpu_match.group(1) if gpu_match else "N/A"
+                nvlink = nvlink_match.group(1) if nvlink_match else "N/A"
+                lane = lane_match.group(1) if lane_match else "N/A"
+
+                # Store the found data
+                extracted_data.append({
+                    'SN': sn_548,
+                    'log_file_name': os.path.basename(file_path),
+                    'GPU': gpu,
+                    'Nvlink': nvlink,
+                    'Lane': lane,
+                    'NVL0_SN' : cbc0,
+                    'NVL1_SN' : cbc1
+                })
     except Exception as e:
         print(f"Error processing file {file_path}: {e}")
 
@@ -2,11 +2,12 @@ import os
 import csv
 import re
 import csv
-import glob
 import os
-import sys
 from pathlib import Path
-from datetime import datetime, date
+from datetime import datetime
+
+from log_discovery import get_log_files_in_date_range, parse_log_name
+from log_parsers import map_file, parse_fru_and_diag_bytes, print_footer, read_footer_if
 
 # LBPCB_FAIL_SN = {'1821925953098':0, '1822025953976':0, 
 #                     '1822325950716':0, '1822325950442':0, 
@@ -18,50 +19,9 @@ LBPCB_FAIL_SN = {}
 # TO-DO: Initialize a dictionary to keep track of total LBPCB serial numbers
 # TOTAL_LBPCB_SN = {}
 
-def extract_tray_sn(line: str, search_key: str) -> str | None:
-    """
-    Extracts the value following 'TRAY_SN:' from a given string.
-    
-    Args:
-        line: The input string containing the key-value pair.
-        
-    Returns:
-        The extracted serial number as a string, or None if the key isn't found.
-    """
-    #key = "TRAY_SN:"
-    key = search_key
-    
-    # Check if the key exists in the line
-    if key in line:
-        # Split the string by the key and take the second part
-        # The 1 ensures we only split on the first occurrence
-        parts = line.split(key, 1)
-        if len(parts) > 1:
-            # strip() removes any leading/trailing whitespace or newlines
-            return parts[1].strip()
-            
-    return None
-
-def process_file_for_tray_sn(file_path: str, search_key: str):
-    """
-    Reads a file line by line and attempts to find the TRAY_SN key.
-    """
-    if not os.path.exists(file_path):
-        print(f"Error: File '{file_path}' not found.")
-        return None
-
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            for line_num, line in enumerate(f, 1):
-                result = extract_tray_sn(line, search_key)
-                if result:
-                    return result
-    except Exception as e:
-        print(f"An error occurred while reading the file: {e}")
-    
-    return None
-
-
+# Only logs with this footer Error Code are parsed in full.
+# ERROR_CODE_FILTER = 'E108003006_023-049-0-000000000008'
+ERROR_CODE_FILTER = 'E028163006_000-001-1-0-008-00-546-284'
 
 # def extract_keyword(line: str, key: str = "TRAY_SN") -> str | None:
 #     """
@@ -74,66 +34,6 @@ def process_file_for_tray_sn(file_path: str, search_key: str):
 #             return parts[1].strip()
 #     return None
 
-def get_log_files_in_date_range(base_pattern: str, 
-                                start_date_str: str, 
-                                end_date_str: str) -> list[str]:
-    """
-    Finds log files from a glob pattern that fall within a date range.
-
-    Args:
-        base_pattern: The glob pattern to search (e.g., 'Z:/.../*.txt').
-        start_date_str: The start date in 'YYYY-MM-DD' format (inclusive).
-        end_date_str: The end date in 'YYYY-MM-DD' format (inclusive).
-
-    Returns:
-        A list of file paths that match the criteria.
-    """
-    
-    # --- 1. Define Date Range ---
-    try:
-        start_date = date.fromisoformat(start_date_str)
-        end_date = date.fromisoformat(end_date_str)
-    except ValueError as e:
-        print(f"Error: Invalid date format. Please use YYYY-MM-DD. Details: {e}", file=sys.stderr)
-        return []
-
-    print(f"Filtering for dates: {start_date} to {end_date}\n")
-
-    # --- 2. Get ALL files matching the pattern ---
-    # This is your original line of code
-    all_log_files = glob.glob(base_pattern)
-    
-    if not all_log_files:
-        print(f"Warning: glob pattern '{base_pattern}' found 0 files.", file=sys.stderr)
-        return []
-
-    # --- 3. Filter the results ---
-    filtered_log_files = []
-    
-    for file_path in all_log_files:
-        try:
-            # We need to extract the date string 'YYYY-MM-DD' from the path.
-            # os.path.dirname(file_path) -> 'Z:/MACHINE/Analysis/2025-10-15/03'
-            # os.path.dirname(...) -> 'Z:/MACHINE/Analysis/2025-10-15'
-            # os.path.basename(...) -> '2025-10-15'
-            
-            date_str = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
-            
-            # Convert the folder name to a date object
-            current_date = date.fromisoformat(date_str)
-            
-            # The core logic: check if the date is within the desired range
-            if start_date <= current_date <= end_date:
-                filtered_log_files.append(file_path)
-                
-        except ValueError:
-            # This handles cases where a file path matches the glob
-            # but the folder name isn't a valid date (e.g., 'ABCD-12-34')
-            # We simply ignore that file.
-            continue
-            
-    return filtered_log_files
-
 def parse_log_file(file_path):
     """
     Parses a single log file to find and extract specific data from lines
@@ -149,95 +49,33 @@ def parse_log_file(file_path):
     """
     extracted_data = []
 
-    board_sn = process_file_for_tray_sn(file_path, "BrdSN:")
-    if board_sn:
-        print(f"Extracted BrdSN: {board_sn}")
-    else:
-        print("BrdSN key not found in the file.")
-
-    tray_sn = process_file_for_tray_sn(file_path, "TRAY_SN:")
-    if tray_sn:
-        print(f"Extracted TRAY_SN: {tray_sn}")
-    else:
-        print("TRAY_SN key not found in the file.")
-    
-    flat_id = process_file_for_tray_sn(file_path, "FLAT ID:")
-    if flat_id:
-        print(f"Extracted FLAT ID: {flat_id}")
-    else:
-        print("FLAT ID key not found in the file.")
-    
-    fox_routing = process_file_for_tray_sn(file_path, "FOX_Routing:")
-    if fox_routing:
-        print(f"Extracted FOX Routing: {fox_routing}")
-    else:
-        print("FOX_Routing key not found in the file.")
-
-    error_code = process_file_for_tray_sn(file_path, "Error Code:")
-    if error_code:
-        print(f"Extracted Error Code: {error_code}")
-    else:
-        print("Error Code key not found in the file.")
-
-    product_pn = process_file_for_tray_sn(file_path, "PN:")
-    if product_pn:
-        print(f"Extracted PN: {product_pn}")
-    else:
-        print("PN key not found in the file.")
-
-    diag_version = process_file_for_tray_sn(file_path, "DiagVer:")
-    if diag_version:
-        print(f"Extracted DiagVer: {diag_version}")
-    else:
-        print("DiagVer key not found in the file.")
-    
-    start_test_time = process_file_for_tray_sn(file_path, "StartTestTime:")
-    if start_test_time:
-        print(f"Extracted StartTestTime: {start_test_time}")
-    else:
-        print("StartTestTime key not found in the file.")
-
-    end_test_time = process_file_for_tray_sn(file_path, "EndTestTime:")
-    if end_test_time:
-        print(f"Extracted EndTestTime: {end_test_time}")
-    else:
-        print("EndTestTime key not found in the file.")
+    # Check the footer (the last few KB) first; most logs stop here.
+    footer = read_footer_if(file_path, error_code=ERROR_CODE_FILTER)
+    if footer is None:
+        return extracted_data
 
     # sn_548 = None
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            # results_sn = {}
-            results_cbc = {}
-            device_name = ""
-
-            for i, line in enumerate(lines):
-                procmod_0 = None
-                
-                if "FRU Device Description" in line:
-                    if "ProcMod_0" in line:
-                        procmod_0 = "ProcMod_0"
-                    if "CBC_0" in line:
-                        device_name = "CBC_0"
-                    elif "CBC_1" in line:
-                        device_name = "CBC_1"
-
-                if device_name and (i + 2) < len(lines):
-                    serial_line = lines[i + 2]
-                    if "Board Serial Number" in serial_line:
-                        serial_number = serial_line.split()[-1]
-                        results_cbc[device_name] = serial_number
-
-                # if procmod_0 and (i + 2) < len(lines):
-                #     serial_line = lines[i + 2]
-                #     if "Board Serial Number" in serial_line:
-                #         serial_number = serial_line.split()[-1]
-                #         results_sn["SN"] = serial_number
-                #         sn_548 = results_sn.get("SN", "N/A")
-
-            
-            cbc0 = results_cbc.get("CBC_0")
-            cbc1 = results_cbc.get("CBC_1")
+        with map_file(file_path) as data:
+            # The footer was already read above; the mapped body is searched
+            # for the FRU serials, decoding only the lines around them
+            print_footer(footer)
+
+            board_sn = footer.get("BrdSN")
+            tray_sn = footer.get("TRAY_SN")
+            flat_id = footer.get("FLAT ID")
+            fox_routing = footer.get("FOX_Routing")
+            error_code = footer.get("Error Code")
+            product_pn = footer.get("PN")
+            diag_version = footer.get("DiagVer")
+            start_test_time = footer.get("StartTestTime")
+            end_test_time = footer.get("EndTestTime")
+
+            fru_serials, _ = parse_fru_and_diag_bytes(data)
+            # sn_548 = fru_serials.get("ProcMod_0", "N/A")
+
+            cbc0 = fru_serials.get("CBC_0")
+            cbc1 = fru_serials.get("CBC_1")
 
             # if cbc0 in LBPCB_FAIL_SN: 
             #     LBPCB_FAIL_SN[cbc0] += 1
@@ -251,8 +89,7 @@ def parse_log_file(file_path):
             # else:
             #      print(f"Key '{cbc1}' not found in the dictionary.")
 
-        # if error_code == 'E108003006_023-049-0-000000000008':
-        if error_code == 'E028163006_000-001-1-0-008-00-546-284':
+        if error_code == ERROR_CODE_FILTER:
             # Store the found data
             extracted_data.append({
                 'SN': board_sn,
@@ -279,23 +116,22 @@ def parse_log_file(file_path):
 
 def check_filename(filename: str) -> bool:
     """
-    Checks if a filename contains either '_FCT_' or '_NVL_'.
+    Checks if a file comes from the FCT station, using the fields
+    decoded from its name.
 
     Args:
-        filename: The name of the file (e.g., "my_file.txt").
+        filename: The name or path of the file.
 
     Returns:
-        True if either substring is found, False otherwise.
+        True if the station matches, False otherwise.
     """
-    if "_FCT_" in filename:
-        return True
-    # if "_NVL_" in filename:
-    #     return True
-    # if "_IST_" in filename:
-    #    return True
-    
-    # If neither substring was found, return False
-    return False
+    log_name = parse_log_name(filename)
+    if log_name is None:
+        # Name doesn't follow the usual layout; fall back to a substring test
+        return "_FCT_" in filename
+
+    # return log_name.station in ('FCT', 'NVL', 'IST')
+    return log_name.station == 'FCT'
 
 def main():
     """
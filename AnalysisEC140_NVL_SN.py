@@ -1,69 +1,45 @@
 import csv
-import glob
 import os
-import sys
 from pathlib import Path
-from datetime import datetime, date
-
-def get_log_files_in_date_range(base_pattern: str, 
-                                start_date_str: str, 
-                                end_date_str: str) -> list[str]:
-    """
-    Finds log files from a glob pattern that fall within a date range.
-
-    Args:
-        base_pattern: The glob pattern to search (e.g., 'Z:/.../*.txt').
-        start_date_str: The start date in 'YYYY-MM-DD' format (inclusive).
-        end_date_str: The end date in 'YYYY-MM-DD' format (inclusive).
-
-    Returns:
-        A list of file paths that match the criteria.
-    """
-    
-    # --- 1. Define Date Range ---
-    try:
-        start_date = date.fromisoformat(start_date_str)
-        end_date = date.fromisoformat(end_date_str)
-    except ValueError as e:
-        print(f"Error: Invalid date format. Please use YYYY-MM-DD. Details: {e}", file=sys.stderr)
-        return []
-
-    print(f"Filtering for dates: {start_date} to {end_date}\n")
-
-    # --- 2. Get ALL files matching the pattern ---
-    # This is your original line of code
-    all_log_files = glob.glob(base_pattern)
-    
-    if not all_log_files:
-        print(f"Warning: glob pattern '{base_pattern}' found 0 files.", file=sys.stderr)
-        return []
-
-    # --- 3. Filter the results ---
-    filtered_log_files = []
-    
-    for file_path in all_log_files:
-        try:
-            # We need to extract the date string 'YYYY-MM-DD' from the path.
-            # os.path.dirname(file_path) -> 'Z:/MACHINE/Analysis/2025-10-15/03'
-            # os.path.dirname(...) -> 'Z:/MACHINE/Analysis/2025-10-15'
-            # os.path.basename(...) -> '2025-10-15'
-            
-            date_str = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
-            
-            # Convert the folder name to a date object
-            current_date = date.fromisoformat(date_str)
-            
-            # The core logic: check if the date is within the desired range
-            if start_date <= current_date <= end_date:
-                filtered_log_files.append(file_path)
-                
-        except ValueError:
-            # This handles cases where a file path matches the glob
-            # but the folder name isn't a valid date (e.g., 'ABCD-12-34')
-            # We simply ignore that file.
-            continue
-            
-    return filtered_log_files
+from datetime import datetime
+
+from functools import partial
+
+from log_cache import ParseCache, cached_fields
+from log_discovery import get_log_files_in_date_range, parse_log_name
+from log_parsers import VALUE_NOT_FOUND, parse_txt_bytes, read_txt_values
+from log_reports import CsvReport
+
+# The primary key to filter by
+FILTER_ERRORCODE = "CoreErrorCode"
+FILTER_PROCESS = "PROCESS"
+
+# The other keys to extract if the filter matches
+KEYS_TO_EXTRACT = [
+    "SN",
+    "PN",
+    "SKU",
+    "PROCESS",
+    "CoreErrorCode",
+    "NVL0_ID",
+    "NVL0_SN",
+    "NVL1_ID",
+    "NVL1_SN",
+    "DIAG",
+    "BMC_IP",
+    "DUT_IP",
+    "HOST_IP_ADDR",
+    "FIXTURE",
+    "HOST_DATE_TIME",
+    "TIME_BEGIN_RECIPE",
+    "TIME_END_RECIPE"
+]
+
+# Every key this report reads
+KEYS_NEEDED = list(dict.fromkeys([FILTER_ERRORCODE, FILTER_PROCESS] + KEYS_TO_EXTRACT))
+
+# Column headers for the CSV
+FIELDNAMES = ['Filepath', FILTER_ERRORCODE] + KEYS_TO_EXTRACT
 
 def format_iso_datetime(iso_string: str) -> str | None:
     """
@@ -102,43 +78,93 @@ def format_iso_datetime(iso_string: str) -> str | None:
         print(f"Error: Input must be a string, but got {type(iso_string)}")
         return None
 
-def get_value_from_log(file_content: str, key: str) -> str:
+def read_txt_fields(file_path: str, keys: list[str]) -> dict:
     """
-    Parses the given text to find the value for a specific key using an exact match.
+    Reads every key = value pair of a .txt summary file in one pass.
+
+    The whole map is returned (and cached), so later reports asking for other
+    keys don't have to read the file again.
 
     Args:
-        file_content: A string containing the log file's text.
-        key: The exact key to search for.
+        file_path: The full path to the .txt file.
+        keys: Keys this report needs; missing ones map to "Value not found".
 
     Returns:
-        The corresponding value as a string, or "Value not found" message.
+        A dictionary of key -> value.
     """
-    for line in file_content.splitlines():
-        parts = line.split('=', 1)
-        if len(parts) == 2:
-            found_key = parts[0].strip()
-            if found_key == key:
-                value = parts[1].strip()
-                return value
-    return "Value not found"
+    values = read_txt_values(file_path)
+    for key in keys:
+        values.setdefault(key, VALUE_NOT_FOUND)
+    return values
 
 def check_filename(filename: str) -> bool:
     """
-    Checks if a filename contains either '_FCT_' or '_NVL_'.
+    Checks if a file comes from the FCT / NVL station(s), using the fields
+    decoded from its name.
 
     Args:
-        filename: The name of the file (e.g., "my_file.txt").
+        filename: The name or path of the file.
 
     Returns:
-        True if either substring is found, False otherwise.
+        True if the station matches, False otherwise.
     """
-    if "_FCT_" in filename:
-        return True
-    if "_NVL_" in filename:
-        return True
-    
-    # If neither substring was found, return False
-    return False
+    log_name = parse_log_name(filename)
+    if log_name is None:
+        # Name doesn't follow the usual layout; fall back to a substring test
+        return "_FCT_" in filename or "_NVL_" in filename
+
+    return log_name.station in ('FCT', 'NVL')
+
+def match_row(file_path: str, values: dict) -> dict | None:
+    """
+    Builds the CSV row of one .txt file if its CoreErrorCode ends with "140"
+    and it comes from an FCT or NVL process.
+
+    Args:
+        file_path: The full path to the .txt file.
+        values: Its values, holding every key in KEYS_NEEDED.
+
+    Returns:
+        A dictionary for the CSV row, or None if the file doesn't match.
+    """
+    # Get the value of the key we are filtering by
+    error_code = values[FILTER_ERRORCODE]
+    process = values[FILTER_PROCESS]
+
+    # Check if the error code ends with "140"
+    if not (error_code.endswith("140") and ( process.endswith("FCT") or process.endswith("NVL") )):
+        return None
+
+    print(f"\nFound matching file: '{file_path}' (CoreErrorCode: {error_code})")
+
+    # Create a dictionary to hold the data for the current file
+    result_row = {'Filepath': file_path, FILTER_ERRORCODE: error_code}
+
+    # If it matches, extract the other specified values
+    for key in KEYS_TO_EXTRACT:
+        value = values[key]
+        if key == "TIME_BEGIN_RECIPE" or key == "TIME_END_RECIPE":
+            value = format_iso_datetime(value)
+
+        result_row[key] = value
+        print(f"- {key}: {value}")
+
+    return result_row
+
+def parse_txt_data(file_path: str, data: bytes) -> list[dict]:
+    """
+    Returns the CSV row of one .txt file, given its contents, or no row if
+    it doesn't match.
+    """
+    result_row = match_row(file_path, parse_txt_bytes(data, KEYS_NEEDED))
+    return [result_row] if result_row is not None else []
+
+def make_report(output_path: str) -> CsvReport:
+    """
+    This script's rows as a report for log_reports.run_reports.
+    """
+    return CsvReport('Core error 140 NVL SN', output_path, FIELDNAMES, parse_txt_data,
+                     accept_fn=check_filename, suffix='.txt')
 
 def main():
     """
@@ -174,31 +200,9 @@ def main():
     
     csv_output_path = 'core_error_140_analysis.csv'
     
-    # The primary key to filter by
-    filter_errorcode = "CoreErrorCode"
-    filter_process = "PROCESS"
-    
-    # The other keys to extract if the filter matches
-    keys_to_extract = [
-        "SN",
-        "PN",
-        "SKU",
-        "PROCESS",
-        "CoreErrorCode",
-        "NVL0_ID",
-        "NVL0_SN",
-        "NVL1_ID",
-        "NVL1_SN",
-        "DIAG",
-        "BMC_IP",
-        "DUT_IP",
-        "HOST_IP_ADDR",
-        "FIXTURE",
-        "HOST_DATE_TIME",
-        "TIME_BEGIN_RECIPE",
-        "TIME_END_RECIPE"
-    ]
-    
+    # Every key this report reads is cached per file by path/size/mtime
+    parse_cache = ParseCache(max_age_days=90)
+
     # List to hold all the rows of data for the CSV file
     all_results = []
 
@@ -209,43 +213,27 @@ def main():
                 print(f"\nNot FCT or NVL log file: '{file_path}'")
                 continue
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Get the value of the key we are filtering by
-            error_code = get_value_from_log(content, filter_errorcode)
-            process = get_value_from_log(content, filter_process)
-
-            # Check if the error code ends with "140"
-            if error_code.endswith("140") and ( process.endswith("FCT") or process.endswith("NVL") ):
-                print(f"\nFound matching file: '{file_path}' (CoreErrorCode: {error_code})")
-                
-                # Create a dictionary to hold the data for the current file
-                result_row = {'Filepath': file_path, filter_errorcode: error_code}
-                
-                # If it matches, extract the other specified values
-                for key in keys_to_extract:
-                    value = get_value_from_log(content, key)
-                    if key == "TIME_BEGIN_RECIPE" or key == "TIME_END_RECIPE":
-                        value = format_iso_datetime(value)
-
-                    result_row[key] = value
-                    print(f"- {key}: {value}")
-                
+            # Served from the local cache when the file hasn't changed
+            values = cached_fields(parse_cache, file_path, KEYS_NEEDED,
+                                   partial(read_txt_fields, keys=KEYS_NEEDED))
+            result_row = match_row(file_path, values)
+
+            if result_row is not None:
                 all_results.append(result_row)
             else:
                 # Optional: print which files are being skipped
                 print(f". Skipping '{os.path.basename(file_path)}'")
 
+        # Drop cache entries nobody has used in a while
+        parse_cache.evict()
+
         # After checking all files, write the collected results to CSV
         if not all_results:
             print("\nNo log files matched the criteria (CoreErrorCode ending in '140').")
             return
             
         with open(csv_output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            # Define the header based on the keys of the first result
-            header = ['Filepath', filter_errorcode] + keys_to_extract
-            writer = csv.DictWriter(csvfile, fieldnames=header)
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
             
             # Write the header and all the result rows
             writer.writeheader()
@@ -2,11 +2,15 @@ import os
 import csv
 import re
 import csv
-import glob
 import os
-import sys
 from pathlib import Path
-from datetime import datetime, date
+from datetime import datetime
+
+from log_cache import CACHE_DIR, parse_files_incrementally
+from log_discovery import get_log_files_in_date_range, parse_log_name
+from log_parsers import (filter_diag_results, footer_matches, map_file, parse_fru_and_diag_bytes, parse_lane_ber,
+                         parse_log_footer, print_footer)
+from log_reports import CsvReport
 
 # LBPCB_FAIL_SN = {'1821925953098':0, '1822025953976':0, 
 #                     '1822325950716':0, '1822325950442':0, 
@@ -18,50 +22,14 @@ LBPCB_FAIL_SN = {}
 # TO-DO: Initialize a dictionary to keep track of total LBPCB serial numbers
 # TOTAL_LBPCB_SN = {}
 
-def extract_tray_sn(line: str, search_key: str) -> str | None:
-    """
-    Extracts the value following 'TRAY_SN:' from a given string.
-    
-    Args:
-        line: The input string containing the key-value pair.
-        
-    Returns:
-        The extracted serial number as a string, or None if the key isn't found.
-    """
-    #key = "TRAY_SN:"
-    key = search_key
-    
-    # Check if the key exists in the line
-    if key in line:
-        # Split the string by the key and take the second part
-        # The 1 ensures we only split on the first occurrence
-        parts = line.split(key, 1)
-        if len(parts) > 1:
-            # strip() removes any leading/trailing whitespace or newlines
-            return parts[1].strip()
-            
-    return None
-
-def process_file_for_tray_sn(file_path: str, search_key: str):
-    """
-    Reads a file line by line and attempts to find the TRAY_SN key.
-    """
-    if not os.path.exists(file_path):
-        print(f"Error: File '{file_path}' not found.")
-        return None
-
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            for line_num, line in enumerate(f, 1):
-                result = extract_tray_sn(line, search_key)
-                if result:
-                    return result
-    except Exception as e:
-        print(f"An error occurred while reading the file: {e}")
-    
-    return None
-
+# Footer predicates checked before the body is parsed (see log_parsers.footer_matches).
+# Logs that fail them are rejected after reading only the last few KB.
+# FOOTER_FILTERS = {'error_code': 'E028163006_000-000-1-000000000140'}
+# FOOTER_FILTERS = {'routing': 'FUNCTIONAL_TEST', 'pn': ['900-2G548-0081-000', '900-2G548-A881-000']}
+FOOTER_FILTERS = {}
 
+# Column headers for the CSV
+FIELDNAMES = ['SN', 'Tray_SN', 'POD_Rack_Slot', 'FOX_Routing', 'Error_Code', 'GPU', 'Nvlink', 'Lane', 'BER', 'BER_Threshold', 'BER_Margin', 'NVL0_SN', 'NVL1_SN', 'PN', 'Diag', 'StartTestTime', 'EndTestTime', 'log_file_name']
 
 # def extract_keyword(line: str, key: str = "TRAY_SN") -> str | None:
 #     """
@@ -74,66 +42,6 @@ def process_file_for_tray_sn(file_path: str, search_key: str):
 #             return parts[1].strip()
 #     return None
 
-def get_log_files_in_date_range(base_pattern: str, 
-                                start_date_str: str, 
-                                end_date_str: str) -> list[str]:
-    """
-    Finds log files from a glob pattern that fall within a date range.
-
-    Args:
-        base_pattern: The glob pattern to search (e.g., 'Z:/.../*.txt').
-        start_date_str: The start date in 'YYYY-MM-DD' format (inclusive).
-        end_date_str: The end date in 'YYYY-MM-DD' format (inclusive).
-
-    Returns:
-        A list of file paths that match the criteria.
-    """
-    
-    # --- 1. Define Date Range ---
-    try:
-        start_date = date.fromisoformat(start_date_str)
-        end_date = date.fromisoformat(end_date_str)
-    except ValueError as e:
-        print(f"Error: Invalid date format. Please use YYYY-MM-DD. Details: {e}", file=sys.stderr)
-        return []
-
-    print(f"Filtering for dates: {start_date} to {end_date}\n")
-
-    # --- 2. Get ALL files matching the pattern ---
-    # This is your original line of code
-    all_log_files = glob.glob(base_pattern)
-    
-    if not all_log_files:
-        print(f"Warning: glob pattern '{base_pattern}' found 0 files.", file=sys.stderr)
-        return []
-
-    # --- 3. Filter the results ---
-    filtered_log_files = []
-    
-    for file_path in all_log_files:
-        try:
-            # We need to extract the date string 'YYYY-MM-DD' from the path.
-            # os.path.dirname(file_path) -> 'Z:/MACHINE/Analysis/2025-10-15/03'
-            # os.path.dirname(...) -> 'Z:/MACHINE/Analysis/2025-10-15'
-            # os.path.basename(...) -> '2025-10-15'
-            
-            date_str = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
-            
-            # Convert the folder name to a date object
-            current_date = date.fromisoformat(date_str)
-            
-            # The core logic: check if the date is within the desired range
-            if start_date <= current_date <= end_date:
-                filtered_log_files.append(file_path)
-                
-        except ValueError:
-            # This handles cases where a file path matches the glob
-            # but the folder name isn't a valid date (e.g., 'ABCD-12-34')
-            # We simply ignore that file.
-            continue
-            
-    return filtered_log_files
-
 def parse_log_file(file_path):
     """
     Parses a single log file to find and extract specific data from lines
@@ -147,179 +55,137 @@ def parse_log_file(file_path):
               the extracted data for a matching log entry. Returns an
               empty list if no matching entries are found.
     """
-    extracted_data = []
+    with map_file(file_path) as data:
+        return parse_log_bytes(file_path, data)
 
-    board_sn = process_file_for_tray_sn(file_path, "BrdSN:")
-    if board_sn:
-        print(f"Extracted BrdSN: {board_sn}")
-    else:
-        print("BrdSN key not found in the file.")
-
-    tray_sn = process_file_for_tray_sn(file_path, "TRAY_SN:")
-    if tray_sn:
-        print(f"Extracted TRAY_SN: {tray_sn}")
-    else:
-        print("TRAY_SN key not found in the file.")
-    
-    flat_id = process_file_for_tray_sn(file_path, "FLAT ID:")
-    if flat_id:
-        print(f"Extracted FLAT ID: {flat_id}")
-    else:
-        print("FLAT ID key not found in the file.")
-    
-    fox_routing = process_file_for_tray_sn(file_path, "FOX_Routing:")
-    if fox_routing:
-        print(f"Extracted FOX Routing: {fox_routing}")
-    else:
-        print("FOX_Routing key not found in the file.")
-
-    error_code = process_file_for_tray_sn(file_path, "Error Code:")
-    if error_code:
-        print(f"Extracted Error Code: {error_code}")
-    else:
-        print("Error Code key not found in the file.")
+def parse_log_bytes(file_path, data):
+    """
+    Extracts the footer fields, the CBC serials and the MODS-000000000140
+    rows from the contents of one log file.
 
-    product_pn = process_file_for_tray_sn(file_path, "PN:")
-    if product_pn:
-        print(f"Extracted PN: {product_pn}")
-    else:
-        print("PN key not found in the file.")
+    Args:
+        file_path (str): The full path to the log file.
+        data (bytes): The file contents, mapped by parse_log_file or read
+                      by log_reports.run_reports.
 
-    diag_version = process_file_for_tray_sn(file_path, "DiagVer:")
-    if diag_version:
-        print(f"Extracted DiagVer: {diag_version}")
-    else:
-        print("DiagVer key not found in the file.")
-    
-    start_test_time = process_file_for_tray_sn(file_path, "StartTestTime:")
-    if start_test_time:
-        print(f"Extracted StartTestTime: {start_test_time}")
-    else:
-        print("StartTestTime key not found in the file.")
+    Returns:
+        list: A list of dictionaries, one per matching entry.
+    """
+    extracted_data = []
 
-    end_test_time = process_file_for_tray_sn(file_path, "EndTestTime:")
-    if end_test_time:
-        print(f"Extracted EndTestTime: {end_test_time}")
-    else:
-        print("EndTestTime key not found in the file.")
+    # Check the footer (the last few KB) first; rejected logs stop here.
+    footer = parse_log_footer(data)
+    if FOOTER_FILTERS and (not footer or not footer_matches(footer, **FOOTER_FILTERS)):
+        return extracted_data
 
     # sn_548 = None
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            # results_sn = {}
-            results_cbc = {}
-            device_name = ""
-
-            for i, line in enumerate(lines):
-                procmod_0 = None
-                
-                if "FRU Device Description" in line:
-                    if "ProcMod_0" in line:
-                        procmod_0 = "ProcMod_0"
-                    if "CBC_0" in line:
-                        device_name = "CBC_0"
-                    elif "CBC_1" in line:
-                        device_name = "CBC_1"
-
-                if device_name and (i + 2) < len(lines):
-                    serial_line = lines[i + 2]
-                    if "Board Serial Number" in serial_line:
-                        serial_number = serial_line.split()[-1]
-                        results_cbc[device_name] = serial_number
-
-                # if procmod_0 and (i + 2) < len(lines):
-                #     serial_line = lines[i + 2]
-                #     if "Board Serial Number" in serial_line:
-                #         serial_number = serial_line.split()[-1]
-                #         results_sn["SN"] = serial_number
-                #         sn_548 = results_sn.get("SN", "N/A")
-
-            
-            cbc0 = results_cbc.get("CBC_0")
-            cbc1 = results_cbc.get("CBC_1")
-
-            # if cbc0 in LBPCB_FAIL_SN: 
-            #     LBPCB_FAIL_SN[cbc0] += 1
-            #     print(f"Key '{cbc0}' found and its value was incremented.")
-            # else:
-            #      print(f"Key '{cbc0}' not found in the dictionary.")
-
-            # if cbc1 in LBPCB_FAIL_SN: 
-            #     LBPCB_FAIL_SN[cbc1] += 1
-            #     print(f"Key '{cbc1}' found and its value was incremented.")
-            # else:
-            #      print(f"Key '{cbc1}' not found in the dictionary.")
-
-            # Iterate through each line with its index
-            for i, line in enumerate(lines):
-                # Condition 1: Check for header keywords in the current line
-                if "Exit Code" in line and "Component Id" in line:
-                    # Ensure we don't go out of bounds when checking the next line
-                    if i + 2 < len(lines):
-                        next_line = lines[i+2]
-
-                        # Condition 2: Check for the specific module code in the next line
-                        if "MODS-000000000140" in next_line:
-                            # Use regular expressions to find the data in the next line.
-                            # This pattern is more specific to match formats like "GPU0_..."
-                            if "_FCT_" in file_path: # GPU0_0008:06:00.0
-                                gpu_match = re.search(r"(GPU\d+_\S+),", next_line)
-
-                            if "_NVL_" in file_path: # GPU 1 [0009:06:00.0]
-                                gpu_match = re.search(r"(GPU \d+ \[\S+),", next_line)
-
-                            # This pattern looks for "Nvlink" followed by space(s) and digits.
-                            nvlink_match = re.search(r"Nvlink\s+(\d+)", next_line)
-                            # This pattern looks for "Lane" followed by space(s) and digits.
-                            lane_match = re.search(r"Lane\s+(\d+)", next_line)
-
-                            # Extract the matched group, otherwise assign "N/A"
-                            gpu = gpu_match.group(1) if gpu_match else "N/A"
-                            nvlink = nvlink_match.group(1) if nvlink_match else "N/A"
-                            lane = lane_match.group(1) if lane_match else "N/A"
-                
-                            # Store the found data
-                            extracted_data.append({
-                                'SN': board_sn,
-                                'Tray_SN': tray_sn,
-                                'POD_Rack_Slot': flat_id,
-                                'FOX_Routing': fox_routing,
-                                'Error_Code': error_code,
-                                'GPU': gpu,
-                                'Nvlink': nvlink,
-                                'Lane': lane,
-                                'NVL0_SN' : cbc0,
-                                'NVL1_SN' : cbc1,
-                                'PN' : product_pn,
-                                'Diag' : diag_version,
-                                'StartTestTime': start_test_time,
-                                'EndTestTime': end_test_time,
-                                'log_file_name': os.path.basename(file_path)
-                            })
-                            print(extracted_data)
-    except Exception as e:
-        print(f"Error processing file {file_path}: {e}")
+    print_footer(footer)
+
+    board_sn = footer.get("BrdSN")
+    tray_sn = footer.get("TRAY_SN")
+    flat_id = footer.get("FLAT ID")
+    fox_routing = footer.get("FOX_Routing")
+    error_code = footer.get("Error Code")
+    product_pn = footer.get("PN")
+    diag_version = footer.get("DiagVer")
+    start_test_time = footer.get("StartTestTime")
+    end_test_time = footer.get("EndTestTime")
+
+    # The body is searched for the FRU serials and ONEDIAG result rows,
+    # decoding only the lines around them
+    fru_serials, diag_results = parse_fru_and_diag_bytes(data)
+    # sn_548 = fru_serials.get("ProcMod_0", "N/A")
+
+    cbc0 = fru_serials.get("CBC_0")
+    cbc1 = fru_serials.get("CBC_1")
+
+    # if cbc0 in LBPCB_FAIL_SN: 
+    #     LBPCB_FAIL_SN[cbc0] += 1
+    #     print(f"Key '{cbc0}' found and its value was incremented.")
+    # else:
+    #      print(f"Key '{cbc0}' not found in the dictionary.")
+
+    # if cbc1 in LBPCB_FAIL_SN: 
+    #     LBPCB_FAIL_SN[cbc1] += 1
+    #     print(f"Key '{cbc1}' found and its value was incremented.")
+    # else:
+    #      print(f"Key '{cbc1}' not found in the dictionary.")
+
+    # Every row of every result table, filtered by exit code
+    for result in filter_diag_results(diag_results, "MODS-000000000140"):
+        # Use regular expressions to find the data in the result row.
+        # This pattern is more specific to match formats like "GPU0_..."
+        if "_FCT_" in file_path: # GPU0_0008:06:00.0
+            gpu_match = re.search(r"(GPU\d+_\S+),", result.component_id)
+
+        if "_NVL_" in file_path: # GPU 1 [0009:06:00.0]
+            gpu_match = re.search(r"(GPU \d+ \[\S+),", result.component_id)
+
+        # This pattern looks for "Nvlink" followed by space(s) and digits.
+        nvlink_match = re.search(r"Nvlink\s+(\d+)", result.component_id)
+        # This pattern looks for "Lane" followed by space(s) and digits.
+        lane_match = re.search(r"Lane\s+(\d+)", result.component_id)
+
+        # Extract the matched group, otherwise assign "N/A"
+        gpu = gpu_match.group(1) if gpu_match else "N/A"
+        nvlink = nvlink_match.group(1) if nvlink_match else "N/A"
+        lane = lane_match.group(1) if lane_match else "N/A"
+
+        # Measured and limit BER as numbers (None for non-BER rows)
+        lane_ber = parse_lane_ber(result)
+        ber = lane_ber.measured if lane_ber else None
+        ber_threshold = lane_ber.threshold if lane_ber else None
+        ber_margin = lane_ber.margin if lane_ber else None
+
+        # Store the found data
+        extracted_data.append({
+            'SN': board_sn,
+            'Tray_SN': tray_sn,
+            'POD_Rack_Slot': flat_id,
+            'FOX_Routing': fox_routing,
+            'Error_Code': error_code,
+            'GPU': gpu,
+            'Nvlink': nvlink,
+            'Lane': lane,
+            'BER': ber,
+            'BER_Threshold': ber_threshold,
+            'BER_Margin': ber_margin,
+            'NVL0_SN' : cbc0,
+            'NVL1_SN' : cbc1,
+            'PN' : product_pn,
+            'Diag' : diag_version,
+            'StartTestTime': start_test_time,
+            'EndTestTime': end_test_time,
+            'log_file_name': os.path.basename(file_path)
+        })
+        print(extracted_data)
 
     return extracted_data
 
 def check_filename(filename: str) -> bool:
     """
-    Checks if a filename contains either '_FCT_' or '_NVL_'.
+    Checks if a file comes from the FCT / NVL station(s), using the fields
+    decoded from its name.
 
     Args:
-        filename: The name of the file (e.g., "my_file.txt").
+        filename: The name or path of the file.
 
     Returns:
-        True if either substring is found, False otherwise.
+        True if the station matches, False otherwise.
     """
-    if "_FCT_" in filename:
-        return True
-    if "_NVL_" in filename:
-        return True
-    
-    # If neither substring was found, return False
-    return False
+    log_name = parse_log_name(filename)
+    if log_name is None:
+        # Name doesn't follow the usual layout; fall back to a substring test
+        return "_FCT_" in filename or "_NVL_" in filename
+
+    return log_name.station in ('FCT', 'NVL')
+
+def make_report(output_path: str) -> CsvReport:
+    """
+    This script's rows as a report for log_reports.run_reports.
+    """
+    return CsvReport('EC140 tray NVL channel', output_path, FIELDNAMES, parse_log_bytes,
+                     accept_fn=check_filename, config={'filters': str(FOOTER_FILTERS)})
 
 def main():
     """
@@ -340,6 +206,9 @@ def main():
     START_DATE = "2026-03-20" # "2026-01-21" # "2025-10-10"
     END_DATE   = "2026-03-20" # "2026-02-01" # "2025-10-15"
 
+    # Worker processes used to parse new/changed files (None = all cores, 1 = serial)
+    WORKERS = None
+
     # --- Run the function ---
     
     # Note: This will only find files if they *actually exist*
@@ -357,7 +226,8 @@ def main():
         return
 
     csv_output_path = 'EC140_' + START_DATE + '_' + END_DATE + '.csv'
-    all_data = []
+    manifest_path = os.path.join(CACHE_DIR, 'EC140_tray_manifest.json')
+    log_files_to_parse = []
 
     # Find all files ending with .log in the specified directory
     for file_path in final_file_list:
@@ -366,10 +236,12 @@ def main():
             continue
 
         if file_path.endswith(".log"):
-            print(f"Parsing {file_path}...")
-            data = parse_log_file(file_path)
-            if data:
-                all_data.extend(data)
+            log_files_to_parse.append(file_path)
+
+    # Only new or changed files are parsed; the rest come from the manifest.
+    all_data = parse_files_incrementally(log_files_to_parse, parse_log_file, manifest_path,
+                                         {'fieldnames': FIELDNAMES, 'filters': str(FOOTER_FILTERS)},
+                                         workers=WORKERS)
 
     if not all_data:
         print("No matching log entries found in any of the log files.")
@@ -378,9 +250,7 @@ def main():
     # Write the extracted data to a CSV file
     try:
         with open(csv_output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            # Define the column headers for the CSV
-            fieldnames = ['SN', 'Tray_SN', 'POD_Rack_Slot', 'FOX_Routing', 'Error_Code', 'GPU', 'Nvlink', 'Lane', 'NVL0_SN', 'NVL1_SN', 'PN', 'Diag', 'StartTestTime', 'EndTestTime', 'log_file_name']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
 
             writer.writeheader()
             writer.writerows(all_data)
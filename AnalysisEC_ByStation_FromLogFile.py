@@ -2,11 +2,14 @@ import os
 import csv
 import re
 import csv
-import glob
 import os
-import sys
 from pathlib import Path
-from datetime import datetime, date
+from datetime import datetime
+
+from log_cache import CACHE_DIR, parse_files_incrementally
+from log_discovery import get_log_files_in_date_range, get_log_files_in_time_range, parse_log_name
+from log_parsers import map_file, parse_fru_and_diag_bytes, parse_log_footer, print_footer, read_footer
+from log_reports import CsvReport
 
 # LBPCB_FAIL_SN = {'1821925953098':0, '1822025953976':0, 
 #                     '1822325950716':0, '1822325950442':0, 
@@ -15,54 +18,12 @@ from datetime import datetime, date
 #                     '1822625957789':0, '1822625958383':0}
 LBPCB_FAIL_SN = {}
 
+# Column headers for the CSV
+FIELDNAMES = ['SN', 'Tray_SN', 'POD_Rack_Slot', 'FOX_Routing', 'Error_Code', 'GPU', 'Nvlink', 'Lane', 'NVL0_SN', 'NVL1_SN', 'PN', 'Diag', 'StartTestTime', 'EndTestTime', 'log_file_name']
+
 # TO-DO: Initialize a dictionary to keep track of total LBPCB serial numbers
 # TOTAL_LBPCB_SN = {}
 
-def extract_tray_sn(line: str, search_key: str) -> str | None:
-    """
-    Extracts the value following 'TRAY_SN:' from a given string.
-    
-    Args:
-        line: The input string containing the key-value pair.
-        
-    Returns:
-        The extracted serial number as a string, or None if the key isn't found.
-    """
-    #key = "TRAY_SN:"
-    key = search_key
-    
-    # Check if the key exists in the line
-    if key in line:
-        # Split the string by the key and take the second part
-        # The 1 ensures we only split on the first occurrence
-        parts = line.split(key, 1)
-        if len(parts) > 1:
-            # strip() removes any leading/trailing whitespace or newlines
-            return parts[1].strip()
-            
-    return None
-
-def process_file_for_tray_sn(file_path: str, search_key: str):
-    """
-    Reads a file line by line and attempts to find the TRAY_SN key.
-    """
-    if not os.path.exists(file_path):
-        print(f"Error: File '{file_path}' not found.")
-        return None
-
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            for line_num, line in enumerate(f, 1):
-                result = extract_tray_sn(line, search_key)
-                if result:
-                    return result
-    except Exception as e:
-        print(f"An error occurred while reading the file: {e}")
-    
-    return None
-
-
-
 # def extract_keyword(line: str, key: str = "TRAY_SN") -> str | None:
 #     """
 #     Extracts the value following a specific key (e.g., 'TRAY_SN:') from a given string.
@@ -74,236 +35,159 @@ def process_file_for_tray_sn(file_path: str, search_key: str):
 #             return parts[1].strip()
 #     return None
 
-def get_log_files_in_date_range(base_pattern: str, 
-                                start_date_str: str, 
-                                end_date_str: str) -> list[str]:
+def parse_log_file(file_path):
     """
-    Finds log files from a glob pattern that fall within a date range.
+    Parses a single log file to find and extract specific data from lines
+    that follow a specific header line.
 
     Args:
-        base_pattern: The glob pattern to search (e.g., 'Z:/.../*.txt').
-        start_date_str: The start date in 'YYYY-MM-DD' format (inclusive).
-        end_date_str: The end date in 'YYYY-MM-DD' format (inclusive).
+        file_path (str): The full path to the log file.
 
     Returns:
-        A list of file paths that match the criteria.
+        list: A list of dictionaries, where each dictionary contains
+              the extracted data for a matching log entry. Returns an
+              empty list if no matching entries are found.
     """
-    
-    # --- 1. Define Date Range ---
-    try:
-        start_date = date.fromisoformat(start_date_str)
-        end_date = date.fromisoformat(end_date_str)
-    except ValueError as e:
-        print(f"Error: Invalid date format. Please use YYYY-MM-DD. Details: {e}", file=sys.stderr)
-        return []
-
-    print(f"Filtering for dates: {start_date} to {end_date}\n")
+    with map_file(file_path) as data:
+        return parse_log_bytes(file_path, data)
 
-    # --- 2. Get ALL files matching the pattern ---
-    # This is your original line of code
-    all_log_files = glob.glob(base_pattern)
-    
-    if not all_log_files:
-        print(f"Warning: glob pattern '{base_pattern}' found 0 files.", file=sys.stderr)
-        return []
-
-    # --- 3. Filter the results ---
-    filtered_log_files = []
-    
-    for file_path in all_log_files:
-        try:
-            # We need to extract the date string 'YYYY-MM-DD' from the path.
-            # os.path.dirname(file_path) -> 'Z:/MACHINE/Analysis/2025-10-15/03'
-            # os.path.dirname(...) -> 'Z:/MACHINE/Analysis/2025-10-15'
-            # os.path.basename(...) -> '2025-10-15'
-            
-            date_str = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
-            
-            # Convert the folder name to a date object
-            current_date = date.fromisoformat(date_str)
-            
-            # The core logic: check if the date is within the desired range
-            if start_date <= current_date <= end_date:
-                filtered_log_files.append(file_path)
-                
-        except ValueError:
-            # This handles cases where a file path matches the glob
-            # but the folder name isn't a valid date (e.g., 'ABCD-12-34')
-            # We simply ignore that file.
-            continue
-            
-    return filtered_log_files
-
-def parse_log_file(file_path):
+def parse_log_bytes(file_path, data):
     """
-    Parses a single log file to find and extract specific data from lines
-    that follow a specific header line.
+    Builds the row of one log file from its footer and CBC serials.
 
     Args:
         file_path (str): The full path to the log file.
+        data (bytes): The file contents, mapped by parse_log_file or read
+                      by log_reports.run_reports.
 
     Returns:
-        list: A list of dictionaries, where each dictionary contains
-              the extracted data for a matching log entry. Returns an
-              empty list if no matching entries are found.
+        list: A single-element list with the row.
     """
     extracted_data = []
 
-    board_sn = process_file_for_tray_sn(file_path, "BrdSN:")
-    if board_sn:
-        print(f"Extracted BrdSN: {board_sn}")
-    else:
-        print("BrdSN key not found in the file.")
-
-    tray_sn = process_file_for_tray_sn(file_path, "TRAY_SN:")
-    if tray_sn:
-        print(f"Extracted TRAY_SN: {tray_sn}")
-    else:
-        print("TRAY_SN key not found in the file.")
-    
-    flat_id = process_file_for_tray_sn(file_path, "FLAT ID:")
-    if flat_id:
-        print(f"Extracted FLAT ID: {flat_id}")
-    else:
-        print("FLAT ID key not found in the file.")
-    
-    fox_routing = process_file_for_tray_sn(file_path, "FOX_Routing:")
-    if fox_routing:
-        print(f"Extracted FOX Routing: {fox_routing}")
-    else:
-        print("FOX_Routing key not found in the file.")
+    # sn_548 = None
+    # The footer sits in the last few KB; the body is searched for the
+    # FRU serials, decoding only the lines around them
+    footer = parse_log_footer(data)
+    print_footer(footer)
+
+    board_sn = footer.get("BrdSN")
+    tray_sn = footer.get("TRAY_SN")
+    flat_id = footer.get("FLAT ID")
+    fox_routing = footer.get("FOX_Routing")
+    error_code = footer.get("Error Code")
+    product_pn = footer.get("PN")
+    diag_version = footer.get("DiagVer")
+    start_test_time = footer.get("StartTestTime")
+    end_test_time = footer.get("EndTestTime")
+
+    fru_serials, _ = parse_fru_and_diag_bytes(data)
+    # sn_548 = fru_serials.get("ProcMod_0", "N/A")
+
+    cbc0 = fru_serials.get("CBC_0")
+    cbc1 = fru_serials.get("CBC_1")
+
+    # if cbc0 in LBPCB_FAIL_SN: 
+    #     LBPCB_FAIL_SN[cbc0] += 1
+    #     print(f"Key '{cbc0}' found and its value was incremented.")
+    # else:
+    #      print(f"Key '{cbc0}' not found in the dictionary.")
+
+    # if cbc1 in LBPCB_FAIL_SN: 
+    #     LBPCB_FAIL_SN[cbc1] += 1
+    #     print(f"Key '{cbc1}' found and its value was incremented.")
+    # else:
+    #      print(f"Key '{cbc1}' not found in the dictionary.")
+
+    # if error_code == 'E108003006_023-049-0-000000000008':
+    # if error_code == 'E028163006_000-001-1-0-008-00-546-284':
+    # if error_code == 'E028163006_000-000-0-000000000001':
+    # if error_code == 'E028001006_654':
+    # Store the found data
+    extracted_data.append({
+        'SN': board_sn,
+        'Tray_SN': tray_sn,
+        'POD_Rack_Slot': flat_id,
+        'FOX_Routing': fox_routing,
+        'Error_Code': error_code,
+        'GPU': None,
+        'Nvlink': None,
+        'Lane': None,
+        'NVL0_SN' : cbc0,
+        'NVL1_SN' : cbc1,
+        'PN' : product_pn,
+        'Diag' : diag_version,
+        'StartTestTime': start_test_time,
+        'EndTestTime': end_test_time,
+        'log_file_name': os.path.basename(file_path)
+    })
+    # print(extracted_data)
 
-    error_code = process_file_for_tray_sn(file_path, "Error Code:")
-    if error_code:
-        print(f"Extracted Error Code: {error_code}")
-    else:
-        print("Error Code key not found in the file.")
+    return extracted_data
 
-    product_pn = process_file_for_tray_sn(file_path, "PN:")
-    if product_pn:
-        print(f"Extracted PN: {product_pn}")
-    else:
-        print("PN key not found in the file.")
+def parse_log_footer_only(file_path):
+    """
+    Builds the same row as parse_log_file from the footer alone.
 
-    diag_version = process_file_for_tray_sn(file_path, "DiagVer:")
-    if diag_version:
-        print(f"Extracted DiagVer: {diag_version}")
-    else:
-        print("DiagVer key not found in the file.")
-    
-    start_test_time = process_file_for_tray_sn(file_path, "StartTestTime:")
-    if start_test_time:
-        print(f"Extracted StartTestTime: {start_test_time}")
-    else:
-        print("StartTestTime key not found in the file.")
+    Only the last few KB of the log are read, so NVL0_SN/NVL1_SN (which live
+    in the FRU dump in the body) are left empty.
 
-    end_test_time = process_file_for_tray_sn(file_path, "EndTestTime:")
-    if end_test_time:
-        print(f"Extracted EndTestTime: {end_test_time}")
-    else:
-        print("EndTestTime key not found in the file.")
+    Args:
+        file_path (str): The full path to the log file.
 
-    # sn_548 = None
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            # results_sn = {}
-            results_cbc = {}
-            device_name = ""
-
-            for i, line in enumerate(lines):
-                procmod_0 = None
-                
-                if "FRU Device Description" in line:
-                    if "ProcMod_0" in line:
-                        procmod_0 = "ProcMod_0"
-                    if "CBC_0" in line:
-                        device_name = "CBC_0"
-                    elif "CBC_1" in line:
-                        device_name = "CBC_1"
-
-                if device_name and (i + 2) < len(lines):
-                    serial_line = lines[i + 2]
-                    if "Board Serial Number" in serial_line:
-                        serial_number = serial_line.split()[-1]
-                        results_cbc[device_name] = serial_number
-
-                # if procmod_0 and (i + 2) < len(lines):
-                #     serial_line = lines[i + 2]
-                #     if "Board Serial Number" in serial_line:
-                #         serial_number = serial_line.split()[-1]
-                #         results_sn["SN"] = serial_number
-                #         sn_548 = results_sn.get("SN", "N/A")
-
-            
-            cbc0 = results_cbc.get("CBC_0")
-            cbc1 = results_cbc.get("CBC_1")
-
-            # if cbc0 in LBPCB_FAIL_SN: 
-            #     LBPCB_FAIL_SN[cbc0] += 1
-            #     print(f"Key '{cbc0}' found and its value was incremented.")
-            # else:
-            #      print(f"Key '{cbc0}' not found in the dictionary.")
-
-            # if cbc1 in LBPCB_FAIL_SN: 
-            #     LBPCB_FAIL_SN[cbc1] += 1
-            #     print(f"Key '{cbc1}' found and its value was incremented.")
-            # else:
-            #      print(f"Key '{cbc1}' not found in the dictionary.")
-
-        # if error_code == 'E108003006_023-049-0-000000000008':
-        # if error_code == 'E028163006_000-001-1-0-008-00-546-284':
-        # if error_code == 'E028163006_000-000-0-000000000001':
-        # if error_code == 'E028001006_654':
-        # Store the found data
-        extracted_data.append({
-            'SN': board_sn,
-            'Tray_SN': tray_sn,
-            'POD_Rack_Slot': flat_id,
-            'FOX_Routing': fox_routing,
-            'Error_Code': error_code,
-            'GPU': None,
-            'Nvlink': None,
-            'Lane': None,
-            'NVL0_SN' : cbc0,
-            'NVL1_SN' : cbc1,
-            'PN' : product_pn,
-            'Diag' : diag_version,
-            'StartTestTime': start_test_time,
-            'EndTestTime': end_test_time,
-            'log_file_name': os.path.basename(file_path)
-        })
-            # print(extracted_data)
-    except Exception as e:
-        print(f"Error processing file {file_path}: {e}")
+    Returns:
+        list: A single-element list with the row, or an empty list if the
+              log has no footer.
+    """
+    footer = read_footer(file_path, strict=True)
+    if not footer:
+        return []
 
-    return extracted_data
+    print_footer(footer)
+
+    return [{
+        'SN': footer.get("BrdSN"),
+        'Tray_SN': footer.get("TRAY_SN"),
+        'POD_Rack_Slot': footer.get("FLAT ID"),
+        'FOX_Routing': footer.get("FOX_Routing"),
+        'Error_Code': footer.get("Error Code"),
+        'GPU': None,
+        'Nvlink': None,
+        'Lane': None,
+        'NVL0_SN' : None,
+        'NVL1_SN' : None,
+        'PN' : footer.get("PN"),
+        'Diag' : footer.get("DiagVer"),
+        'StartTestTime': footer.get("StartTestTime"),
+        'EndTestTime': footer.get("EndTestTime"),
+        'log_file_name': os.path.basename(file_path)
+    }]
 
 def check_filename(filename: str) -> bool:
     """
-    Checks if a filename contains either '_FCT_' or '_NVL_'.
+    Checks if a file is a FAIL log, using the fields decoded from its name.
 
     Args:
-        filename: The name of the file (e.g., "my_file.txt").
+        filename: The name or path of the file.
 
     Returns:
-        True if either substring is found, False otherwise.
+        True for FAIL logs, False otherwise.
     """
-    if "_F_" in filename:
-         return True
-    # if "-TS3_" in filename and "_F_" in filename:
-    #     return True
-    # if "_FCT_" in filename:
-    #     return True
-    # if "_NVL_" in filename:
-    #      return True
-    # if "_IST_" in filename:
-    #     return True
-    else:
-        return False
+    log_name = parse_log_name(filename)
+    if log_name is None:
+        # Name doesn't follow the usual layout; fall back to a substring test
+        return "_F_" in filename
 
-    # If neither substring was found, return False
-    return False
+    # return log_name.failed and log_name.station in ('FCT', 'NVL', 'IST')
+    return log_name.failed
+
+def make_report(output_path: str) -> CsvReport:
+    """
+    This script's rows as a report for log_reports.run_reports. NVL0_SN and
+    NVL1_SN are always read, as with READ_NVL_SN = True.
+    """
+    return CsvReport('EC by station', output_path, FIELDNAMES, parse_log_bytes,
+                     accept_fn=check_filename)
 
 def main():
     """
@@ -325,12 +209,27 @@ def main():
     START_DATE = "2026-05-15" # "2026-01-21" # "2025-10-10"
     END_DATE   = "2026-05-15" #"2026-02-01" # "2025-10-15"
 
+    # 3. Optional: narrow the window to hours (e.g. a line-down event).
+    #    When set, only the matching HH folders are listed.
+    START_TIME = None # "2026-05-14 22:00"
+    END_TIME   = None # "2026-05-15 02:00"
+
+    # 4. NVL0_SN/NVL1_SN come from the log body. Set to False for a
+    #    footer-only summary that reads a few KB per file instead of MBs.
+    READ_NVL_SN = True
+
+    # Worker processes used to parse new/changed files (None = all cores, 1 = serial)
+    WORKERS = None
+
     # --- Run the function ---
     
     # Note: This will only find files if they *actually exist*
     # on your 'Z:/' drive when you run the script.
     
-    final_file_list = get_log_files_in_date_range(LOG_PATTERN, START_DATE, END_DATE)
+    if START_TIME and END_TIME:
+        final_file_list = get_log_files_in_time_range(LOG_PATTERN, START_TIME, END_TIME)
+    else:
+        final_file_list = get_log_files_in_date_range(LOG_PATTERN, START_DATE, END_DATE)
     # --- Print the results ---
     if final_file_list:
         # print(f"--- Found {len(final_file_list)} matching .txt files in range ---")
@@ -342,7 +241,8 @@ def main():
         return
 
     csv_output_path = '' + START_DATE + '_' + END_DATE + '.csv'
-    all_data = []
+    manifest_path = os.path.join(CACHE_DIR, 'ec_by_station_manifest.json')
+    log_files_to_parse = []
 
     # Find all files ending with .log in the specified directory
     for file_path in final_file_list:
@@ -352,10 +252,13 @@ def main():
             continue
 
         if file_path.endswith(".log"):
-            print(f"Parsing {file_path}...")
-            data = parse_log_file(file_path)
-            if data:
-                all_data.extend(data)
+            log_files_to_parse.append(file_path)
+
+    # Only new or changed files are parsed; the rest come from the manifest.
+    parse_fn = parse_log_file if READ_NVL_SN else parse_log_footer_only
+    all_data = parse_files_incrementally(log_files_to_parse, parse_fn, manifest_path,
+                                         {'fieldnames': FIELDNAMES, 'read_nvl_sn': READ_NVL_SN},
+                                         workers=WORKERS)
 
     if not all_data:
         print("No matching log entries found in any of the log files.")
@@ -364,9 +267,7 @@ def main():
     # Write the extracted data to a CSV file
     try:
         with open(csv_output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            # Define the column headers for the CSV
-            fieldnames = ['SN', 'Tray_SN', 'POD_Rack_Slot', 'FOX_Routing', 'Error_Code', 'GPU', 'Nvlink', 'Lane', 'NVL0_SN', 'NVL1_SN', 'PN', 'Diag', 'StartTestTime', 'EndTestTime', 'log_file_name']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
 
             writer.writeheader()
             writer.writerows(all_data)
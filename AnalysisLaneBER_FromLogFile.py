@@ -0,0 +1,148 @@
+import os
+import csv
+
+from log_cache import CACHE_DIR, file_identity
+from log_discovery import get_log_files_in_date_range
+from log_parallel import run_io_pipeline
+from log_parsers import parse_fru_and_diag_bytes, parse_lane_ber
+from log_stats import GroupedStats, load_stats_state, save_stats_state
+
+# Quantiles reported per lane.
+QUANTILES = (0.5, 0.9, 0.99)
+
+def parse_lane_bers_bytes(file_path, data):
+    """
+    Extracts every lane BER measurement from one log's contents.
+
+    Args:
+        file_path (str): The full path to the log file.
+        data (bytes): The file contents, as fetched by the I/O pipeline.
+
+    Returns:
+        list: A single (file_path, [LaneBer, ...]) item, so the caller
+              learns about files with no BER rows too.
+    """
+    _, diag_results = parse_fru_and_diag_bytes(data, devices=())
+    lane_bers = [lane_ber for lane_ber in map(parse_lane_ber, diag_results) if lane_ber]
+    return [(file_path, lane_bers)]
+
+def log_date(file_path):
+    """
+    Returns the 'YYYY-MM-DD' folder a log sits in, two levels up.
+    """
+    return os.path.basename(os.path.dirname(os.path.dirname(file_path)))
+
+def main():
+    """
+    Main function to run the script. It keeps per-(GPU, Nvlink, Lane)
+    statistics for each date folder on local disk, adds the lane BERs of
+    every log not counted yet, then merges the dates in the range and writes
+    count, mean and percentiles per lane to a CSV file.
+    """
+    # --- !!! IMPORTANT: SET YOUR VARIABLES HERE !!! ---
+
+    # 1. This is your original glob pattern
+    #    Note: Use forward slashes '/'.
+    LOG_PATTERN = 'Z:/Bianca/????-??-??/??/*.log'
+    # LOG_PATTERN = 'D:/TestLogs/????-??-??/??/*.log'
+
+    # 2. Set your desired date range
+    START_DATE = "2026-03-01"
+    END_DATE   = "2026-03-20"
+
+    # 3. Concurrent reads against the share
+    READERS = 8
+
+    # --- Run the function ---
+
+    final_file_list = get_log_files_in_date_range(LOG_PATTERN, START_DATE, END_DATE)
+    if not final_file_list:
+        print("--- No .log files found matching the criteria. ---")
+        return
+
+    csv_output_path = 'LaneBER_' + START_DATE + '_' + END_DATE + '.csv'
+    state_dir = os.path.join(CACHE_DIR, 'lane_ber_stats')
+
+    files_by_date = {}
+    for file_path in final_file_list:
+        if file_path.endswith(".log"):
+            files_by_date.setdefault(log_date(file_path), []).append(file_path)
+
+    # One state per date folder, so the output covers exactly the date range.
+    # Logs are counted under (path, size, mtime_ns); a date whose counted
+    # logs were rewritten or removed since is counted again from scratch,
+    # since a log's values can't be taken back out of the statistics.
+    states = {}
+    file_keys = {}
+    new_files = []
+    for day, day_files in files_by_date.items():
+        state_path = os.path.join(state_dir, day + '.json')
+        stats, merged_files = load_stats_state(state_path, schema=list(QUANTILES))
+
+        day_keys = {}
+        for file_path in day_files:
+            identity = file_identity(file_path)
+            if identity is not None:
+                day_keys[file_path] = (file_path,) + tuple(identity)
+        if not merged_files <= set(day_keys.values()):
+            print(f"Logs of {day} changed since they were counted; counting the day again.")
+            stats, merged_files = {}, set()
+
+        stats.setdefault('measured', GroupedStats())
+        stats.setdefault('margin', GroupedStats())
+        states[day] = (state_path, stats, merged_files)
+        file_keys.update(day_keys)
+        new_files.extend(file_path for file_path, key in day_keys.items() if key not in merged_files)
+
+    print(f"{len(file_keys) - len(new_files)} file(s) already counted, {len(new_files)} to read.")
+
+    def add_lane_bers(items):
+        for file_path, lane_bers in items:
+            _, stats, merged_files = states[log_date(file_path)]
+            for lane_ber in lane_bers:
+                key = (lane_ber.gpu, lane_ber.nvlink, lane_ber.lane)
+                stats['measured'].add(key, lane_ber.measured)
+                stats['margin'].add(key, lane_ber.margin)
+            merged_files.add(file_keys[file_path])
+
+    # Only the running statistics are kept, never the individual rows
+    run_io_pipeline(new_files, parse_lane_bers_bytes, add_lane_bers, readers=READERS)
+
+    ber_stats = GroupedStats()
+    margin_stats = GroupedStats()
+    for state_path, stats, merged_files in states.values():
+        save_stats_state(state_path, stats, merged_files, schema=list(QUANTILES))
+        ber_stats.merge(stats['measured'])
+        margin_stats.merge(stats['margin'])
+
+    rows = ber_stats.summary_rows(QUANTILES)
+    if not rows:
+        print("No lane BER measurements found in any of the log files.")
+        return
+
+    margins = {row['key']: row for row in margin_stats.summary_rows(QUANTILES)}
+    quantile_names = [f"p{q * 100:g}" for q in QUANTILES]
+    fieldnames = ['GPU', 'Nvlink', 'Lane', 'Count', 'Mean_BER', 'Min_BER'] + \
+                 [f"{name}_BER" for name in quantile_names] + ['Max_BER', 'Mean_Margin', 'Min_Margin']
+
+    try:
+        with open(csv_output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+
+            for row in rows:
+                gpu, nvlink, lane = row['key']
+                csv_row = {'GPU': gpu, 'Nvlink': nvlink, 'Lane': lane, 'Count': row['count'],
+                           'Mean_BER': row['mean'], 'Min_BER': row['min'], 'Max_BER': row['max'],
+                           'Mean_Margin': margins[row['key']]['mean'],
+                           'Min_Margin': margins[row['key']]['min']}
+                for name in quantile_names:
+                    csv_row[f"{name}_BER"] = row[name]
+                writer.writerow(csv_row)
+
+        print(f"\nLane BER statistics for {len(rows)} lane(s) written to {csv_output_path}")
+    except Exception as e:
+        print(f"Error writing to CSV file: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from log_query import LogSet
+
+def main():
+    """
+    Main function to run the script. It runs one LogSet query over the share
+    and writes the matching rows to a CSV file. Edit the query instead of
+    copying a script: filters on the folder or file name never open a log,
+    footer filters read its last few KB, and only FRU/diag columns or
+    exit_code filters parse the body.
+    """
+    # --- !!! IMPORTANT: SET YOUR VARIABLES HERE !!! ---
+
+    # 1. The share root holding the 'YYYY-MM-DD/HH' folders
+    #    Note: Use forward slashes '/'.
+    LOG_ROOT = 'Z:/Bianca'
+    # LOG_ROOT = 'D:/TestLogs'
+
+    # 2. The query
+    query = (LogSet(LOG_ROOT)
+             .between("2026-05-13", "2026-05-16")
+             # .between("2026-05-14 22:00", "2026-05-15 02:00")
+             .station('FCT', 'NVL')
+             .failed()
+             .where(error_code=lambda code: code is not None and code.endswith('140'))
+             # .where(tray_sn='P3952-L1000000005179')
+             # .where(exit_code='MODS-000000000140')
+             .select('SN', 'Tray_SN', 'POD_Rack_Slot', 'Error_Code', 'NVL0_SN', 'NVL1_SN',
+                     'Diag', 'StartTestTime', 'log_file_name'))
+
+    csv_output_path = 'LogQuery.csv'
+
+    # --- Run the function ---
+
+    try:
+        row_count = query.to_csv(csv_output_path)
+    except Exception as e:
+        print(f"Error writing to CSV file: {e}")
+        return
+
+    print(f"\n{row_count} row(s) written to {csv_output_path}")
+
+if __name__ == "__main__":
+    main()
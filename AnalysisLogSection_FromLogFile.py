@@ -0,0 +1,46 @@
+import sys
+
+from log_index import FOOTER_SECTION, read_section_index, read_section_lines
+
+def main():
+    """
+    Main function to run the script. It prints the top-level recipe sections
+    of one .log file with their byte offsets, or the lines of one section.
+    The index is built once per log and kept in the local cache, so going
+    back to the same log later costs one small read plus one seek.
+    """
+    # --- !!! IMPORTANT: SET YOUR VARIABLES HERE !!! ---
+
+    # 1. The log to look at
+    #    Note: Use forward slashes '/'.
+    LOG_FILE = 'Z:/Bianca/2026-03-20/08/FXHC_NA_692-2G548-0081-000_1653025045150_F_FCT_20250810T124736Z.log'
+
+    # 2. The section to print, or None to list the sections
+    SECTION = None
+    # SECTION = 'TEST_FIXTURE_CHECK'
+    # SECTION = 'ONEDIAG_BAT_THERMAL_C2C'
+    # SECTION = FOOTER_SECTION
+
+    # --- Run the function ---
+
+    try:
+        spans = read_section_index(LOG_FILE)
+    except OSError as e:
+        print(f"Error reading {LOG_FILE}: {e}")
+        return
+
+    if SECTION is None:
+        print(f"{'Section':<40} {'Offset':>12} {'Bytes':>12}")
+        for name, offset, length in spans:
+            print(f"{name:<40} {offset:>12} {length:>12}")
+        return
+
+    found = False
+    for line in read_section_lines(LOG_FILE, SECTION):
+        found = True
+        sys.stdout.write(line)
+    if not found:
+        print(f"--- No section '{SECTION}' in {LOG_FILE}. ---")
+
+if __name__ == "__main__":
+    main()
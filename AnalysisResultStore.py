@@ -0,0 +1,63 @@
+import csv
+from datetime import datetime, timedelta
+
+from log_discovery import get_log_files_in_date_range
+from log_store import STORE_PATH, Like, ResultStore
+
+def main():
+    """
+    Main function to run the script. It upserts the footer, FRU and ONEDIAG
+    result records of every .log in the date range into the local SQLite
+    store (only new or changed logs are read), then answers one lookup from
+    the store and writes it to a CSV file. Later lookups over logs already
+    stored don't touch the share at all.
+    """
+    # --- !!! IMPORTANT: SET YOUR VARIABLES HERE !!! ---
+
+    # 1. This is your original glob pattern
+    #    Note: Use forward slashes '/'.
+    LOG_PATTERN = 'Z:/Bianca/????-??-??/??/*.log'
+    # LOG_PATTERN = 'D:/TestLogs/????-??-??/??/*.log'
+
+    # 2. Set the date range to bring up to date (None skips the update)
+    START_DATE = "2026-05-13"
+    END_DATE   = "2026-05-16"
+
+    # 3. The lookup; see ResultStore.find_logs. Like('...%') matches a pattern.
+    LOOKUP = {'tray_sn': 'P3952-L1000000005179', 'failed': True}
+    # LOOKUP = {'error_code': Like('%140'), 'pod_rack_slot': Like('%-POD3-%'),
+    #           'start_time': datetime.now() - timedelta(days=7)}
+    # LOOKUP = {'exit_code': 'MODS-000000000140'}
+
+    # Concurrent reads against the share
+    READERS = 8
+
+    # --- Run the function ---
+
+    store = ResultStore(STORE_PATH)
+    try:
+        if START_DATE and END_DATE:
+            final_file_list = get_log_files_in_date_range(LOG_PATTERN, START_DATE, END_DATE)
+            store.ingest(final_file_list, readers=READERS)
+
+        rows = store.find_logs(**LOOKUP)
+    finally:
+        store.close()
+
+    if not rows:
+        print(f"No stored logs match {LOOKUP}.")
+        return
+
+    csv_output_path = 'ResultStore_lookup.csv'
+    try:
+        with open(csv_output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+        print(f"\n{len(rows)} log(s) match {LOOKUP}. Written to {csv_output_path}")
+    except Exception as e:
+        print(f"Error writing to CSV file: {e}")
+
+if __name__ == "__main__":
+    main()
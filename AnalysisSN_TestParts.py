@@ -2,87 +2,128 @@ import os
 import csv
 import re
 import csv
-import glob
 import os
-import sys
 from pathlib import Path
-from datetime import datetime, date
+from datetime import datetime
 
-def get_log_files_in_date_range(base_pattern: str, 
-                                start_date_str: str, 
-                                end_date_str: str) -> list[str]:
+from functools import partial
+
+from log_cache import CACHE_DIR, parse_files_incrementally
+from log_discovery import get_log_files_in_date_range
+from log_parsers import parse_txt_bytes, read_txt_values
+from log_reports import CsvReport
+
+# Keys read from every .txt summary, in column order
+KEYS_TO_FIND = [
+    "TIME_START_CLIENT",
+    "PRODUCT",
+    "SKU",
+    "PN",
+    "SN",
+    "PROCESS",
+    "DIAG",
+    "TESTER_TYPE",
+    "FIXTURE",
+    "TestTime",
+    "TestStatus",
+    "TestErrorCode",
+    "TestErrorMessage",
+    "CoreErrorCode",
+    "CoreErrorMessage",
+    "IMAGE_VBIOS",
+    "IMAGE_CX8",
+    "CX8_VERSION",
+    "PCIE_VERSION",
+    "BASEOS_VERSION",
+    "OS_UPDATE",
+    "GOLDEN_FILE",
+    "IMAGE_BMC_UT3_0_B",
+    "IMAGE_HMC_UT3_0_B",
+    "IMAGE_CPLD_UT3_0_B",
+    "IMAGE_SBIOS_UT3_0_B",
+    "IMAGE_BMC_UT3_0_REV2_1",
+    "IMAGE_HMC_UT3_0_REV2_1",
+    "IMAGE_CPLD_UT3_0_REV2_1",
+    "IMAGE_SBIOS_UT3_0_REV2_1",
+    "BMC_IP",
+    "DUT_IP",
+    "HMC_IP",
+    "NAUTILUS_VERSION",
+    "HOST_MAC_ADDR",
+    "HOST_IP_ADDR",
+    "HOST_NAME",
+    "IMAGE_BMC",
+    "IMAGE_HMC",
+    "IMAGE_CPLD",
+    "VERSION_BMC",
+    "VERSION_HMC",
+    "VERSION_HMC_CPLD",
+    "NVL0_ID",
+    "NVL1_ID",
+    "NVL_TYPE",
+    "NVL0_SN",
+    "NVL1_SN",
+    "E4074_MAC",
+    "",
+    "",
+    "110-0902-000",
+    "110-0902-000_CPU_USE_TIMES",
+    "110-0902-000_IN_STATION_TIME",
+    "110-0902-000_CPU_LAST_RESET_TIME"
+
+]
+
+def txt_row(file_path: str, values: dict, keys_to_find: list[str]) -> list[str]:
     """
-    Finds log files from a glob pattern that fall within a date range.
+    Builds the CSV row of one .txt file from its values, printing each one.
+    """
+    # Use the full file_path to provide context in the CSV
+    row_data = [file_path]
+
+    # Find the value for each key and add it to the row data
+    for key in keys_to_find:
+        result = values[key]
+        row_data.append(result)
+        print(f"- {key}: {result}")
+
+    return row_data
+
+def parse_txt_file(file_path: str, keys_to_find: list[str]) -> list[list[str]]:
+    """
+    Reads one .txt summary file and returns its CSV row.
 
     Args:
-        base_pattern: The glob pattern to search (e.g., 'Z:/.../*.txt').
-        start_date_str: The start date in 'YYYY-MM-DD' format (inclusive).
-        end_date_str: The end date in 'YYYY-MM-DD' format (inclusive).
+        file_path: The full path to the .txt file.
+        keys_to_find: The keys to look up, in column order.
 
     Returns:
-        A list of file paths that match the criteria.
+        A single-element list holding [file_path, value1, value2, ...].
     """
-    
-    # --- 1. Define Date Range ---
-    try:
-        start_date = date.fromisoformat(start_date_str)
-        end_date = date.fromisoformat(end_date_str)
-    except ValueError as e:
-        print(f"Error: Invalid date format. Please use YYYY-MM-DD. Details: {e}", file=sys.stderr)
-        return []
-
-    print(f"Filtering for dates: {start_date} to {end_date}\n")
+    # One pass over the file, stopping once every key is found
+    values = read_txt_values(file_path, keys_to_find)
+    return [txt_row(file_path, values, keys_to_find)]
 
-    # --- 2. Get ALL files matching the pattern ---
-    # This is your original line of code
-    all_log_files = glob.glob(base_pattern)
-    
-    if not all_log_files:
-        print(f"Warning: glob pattern '{base_pattern}' found 0 files.", file=sys.stderr)
-        return []
+def parse_txt_data(file_path: str, data: bytes) -> list[list[str]]:
+    """
+    Same as parse_txt_file for KEYS_TO_FIND, given the file contents.
+    """
+    return [txt_row(file_path, parse_txt_bytes(data, KEYS_TO_FIND), KEYS_TO_FIND)]
 
-    # --- 3. Filter the results ---
-    filtered_log_files = []
-    
-    for file_path in all_log_files:
-        try:
-            # We need to extract the date string 'YYYY-MM-DD' from the path.
-            # os.path.dirname(file_path) -> 'Z:/MACHINE/Analysis/2025-10-15/03'
-            # os.path.dirname(...) -> 'Z:/MACHINE/Analysis/2025-10-15'
-            # os.path.basename(...) -> '2025-10-15'
-            
-            date_str = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
-            
-            # Convert the folder name to a date object
-            current_date = date.fromisoformat(date_str)
-            
-            # The core logic: check if the date is within the desired range
-            if start_date <= current_date <= end_date:
-                filtered_log_files.append(file_path)
-                
-        except ValueError:
-            # This handles cases where a file path matches the glob
-            # but the folder name isn't a valid date (e.g., 'ABCD-12-34')
-            # We simply ignore that file.
-            continue
-            
-    return filtered_log_files
-
-def get_value_from_log(file_content: str, key: str) -> str:
-    for line in file_content.splitlines():
-        parts = line.split('=', 1)
-        if len(parts) == 2:
-            found_key = parts[0].strip()
-            if found_key == key:
-                value = parts[1].strip()
-                return value
-    return "Value not found"
+def make_report(output_path: str) -> CsvReport:
+    """
+    This script's rows as a report for log_reports.run_reports.
+    """
+    return CsvReport('SN test parts', output_path, ['Filepath'] + KEYS_TO_FIND, parse_txt_data,
+                     suffix='.txt')
 
 def main():
     # 1. Set your desired date range
     START_DATE = "2026-01-05" # "2025-10-10"
     END_DATE = "2026-01-09"
 
+    # Worker processes used to parse new/changed files (None = all cores, 1 = serial)
+    WORKERS = None
+
     # 2. This is your original glob pattern
     #    Note: Use forward slashes '/'.
     LOG_PATTERN = 'Z:/MACHINE/Analysis/????-??-??/??/*.txt'
@@ -96,93 +137,21 @@ def main():
         return
 
     print(f"Found {len(log_files)} log file(s) to process.")
-
-    keys_to_find = [
-        "TIME_START_CLIENT",
-        "PRODUCT",
-        "SKU",
-        "PN",
-        "SN",
-        "PROCESS",
-        "DIAG",
-        "TESTER_TYPE",
-        "FIXTURE",
-        "TestTime",
-        "TestStatus",
-        "TestErrorCode",
-        "TestErrorMessage",
-        "CoreErrorCode",
-        "CoreErrorMessage",
-        "IMAGE_VBIOS",
-        "IMAGE_CX8",
-        "CX8_VERSION",
-        "PCIE_VERSION",
-        "BASEOS_VERSION",
-        "OS_UPDATE",
-        "GOLDEN_FILE",
-        "IMAGE_BMC_UT3_0_B",
-        "IMAGE_HMC_UT3_0_B",
-        "IMAGE_CPLD_UT3_0_B",
-        "IMAGE_SBIOS_UT3_0_B",
-        "IMAGE_BMC_UT3_0_REV2_1",
-        "IMAGE_HMC_UT3_0_REV2_1",
-        "IMAGE_CPLD_UT3_0_REV2_1",
-        "IMAGE_SBIOS_UT3_0_REV2_1",
-        "BMC_IP",
-        "DUT_IP",
-        "HMC_IP",
-        "NAUTILUS_VERSION",
-        "HOST_MAC_ADDR",
-        "HOST_IP_ADDR",
-        "HOST_NAME",
-        "IMAGE_BMC",
-        "IMAGE_HMC",
-        "IMAGE_CPLD",
-        "VERSION_BMC",
-        "VERSION_HMC",
-        "VERSION_HMC_CPLD",
-        "NVL0_ID",
-        "NVL1_ID",
-        "NVL_TYPE",
-        "NVL0_SN",
-        "NVL1_SN",
-        "E4074_MAC",
-        "",
-        "",
-        "110-0902-000",
-        "110-0902-000_CPU_USE_TIMES",
-        "110-0902-000_IN_STATION_TIME",
-        "110-0902-000_CPU_LAST_RESET_TIME"
-
-    ]
     
     try:
+        # Only new or changed files are read; the rest come from the manifest.
+        manifest_path = os.path.join(CACHE_DIR, 'sn_test_parts_manifest.json')
+        all_rows = parse_files_incrementally(log_files, partial(parse_txt_file, keys_to_find=KEYS_TO_FIND),
+                                             manifest_path, KEYS_TO_FIND, workers=WORKERS)
+
         # Open the CSV file for writing
         with open(csv_output_path, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.writer(csvfile)
             
             # Define and write the header row for the CSV file
-            header = ['Filepath'] + keys_to_find
+            header = ['Filepath'] + KEYS_TO_FIND
             writer.writerow(header)
-            
-            # Process each log file found
-            for file_path in log_files:
-                print(f"\nProcessing '{file_path}'...")
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Create a list to hold the data for the current file's row
-                # Use the full file_path to provide context in the CSV
-                row_data = [file_path]
-                
-                # Find the value for each key and add it to the row data
-                for key in keys_to_find:
-                    result = get_value_from_log(content, key)
-                    row_data.append(result)
-                    print(f"- {key}: {result}")
-                
-                # Write the completed row to the CSV file
-                writer.writerow(row_data)
+            writer.writerows(all_rows)
                 
         print(f"\nResults for all files have been successfully written to '{csv_output_path}'.")
 
@@ -0,0 +1,176 @@
+import os
+import csv
+from functools import partial
+
+from log_cache import CACHE_DIR, parse_files_incrementally
+from log_discovery import get_log_files_in_date_range
+from log_stats import GroupedStats
+from log_timeline import STEP_ROW_FIELDS, read_log_steps
+
+# Quantiles compared between releases.
+QUANTILES = (0.5, 0.95)
+
+def release_order(all_data):
+    """
+    Orders each station's diag versions by the first time the station ran
+    them, which is the order they were rolled out there.
+
+    Args:
+        all_data (list): Step rows as returned by read_log_steps.
+
+    Returns:
+        dict: Station -> DiagVer strings, oldest release first.
+    """
+    first_seen = {}
+    for row in all_data:
+        if row['Depth'] != 1 or row['DiagVer'] is None or row['Start'] is None:
+            continue
+        station_seen = first_seen.setdefault(row['Station'] or '', {})
+        seen = station_seen.get(row['DiagVer'])
+        if seen is None or row['Start'] < seen:
+            station_seen[row['DiagVer']] = row['Start']
+    return {station: sorted(station_seen, key=station_seen.get)
+            for station, station_seen in sorted(first_seen.items())}
+
+def compare_releases(durations, station, old_version, new_version, min_logs, min_slowdown_s,
+                     min_slowdown_pct):
+    """
+    Compares the step durations of two diag versions on one station.
+
+    Args:
+        durations (GroupedStats): Durations keyed by (DiagVer, Station, Step_Path).
+        station (str): The station both versions ran on.
+        old_version (str): The earlier release.
+        new_version (str): The release being checked.
+        min_logs (int): Steps with fewer logs on either side are not flagged.
+        min_slowdown_s (float): Smallest slowdown in seconds worth flagging.
+        min_slowdown_pct (float): Smallest slowdown in percent worth flagging.
+
+    Returns:
+        list: One dict per step timed on both releases; 'Regression' names
+              the quantiles that got slower by both thresholds.
+    """
+    summary = {row['key']: row for row in durations.summary_rows(QUANTILES)}
+    quantile_names = [f"p{q * 100:g}" for q in QUANTILES]
+
+    rows = []
+    for (version, new_station, step_path), new in summary.items():
+        if version != new_version or new_station != station:
+            continue
+        old = summary.get((old_version, station, step_path))
+        if old is None:
+            continue
+
+        row = {'DiagVer_Old': old_version, 'DiagVer_New': new_version, 'Station': station,
+               'Step_Path': step_path,
+               'Count_Old': old['count'], 'Count_New': new['count']}
+        slower = []
+        for name in quantile_names:
+            delta = new[name] - old[name]
+            pct = 100 * delta / old[name] if old[name] else None
+            row[f"{name}_Old_s"] = round(old[name], 3)
+            row[f"{name}_New_s"] = round(new[name], 3)
+            row[f"{name}_Delta_s"] = round(delta, 3)
+            row[f"{name}_Delta_%"] = round(pct, 1) if pct is not None else None
+            if delta >= min_slowdown_s and (pct is None or pct >= min_slowdown_pct):
+                slower.append(name)
+
+        enough_logs = old['count'] >= min_logs and new['count'] >= min_logs
+        row['Regression'] = ', '.join(slower) if slower and enough_logs else ''
+        rows.append(row)
+
+    return rows
+
+def main():
+    """
+    Main function to run the script. It groups the cached step timelines by
+    the DiagVer in each log's footer and flags every step whose median or
+    p95 duration grew from one diag release to the next on the same station.
+    """
+    # --- !!! IMPORTANT: SET YOUR VARIABLES HERE !!! ---
+
+    # 1. This is your original glob pattern
+    #    Note: Use forward slashes '/'.
+    LOG_PATTERN = 'Z:/Bianca/????-??-??/??/*.log'
+    # LOG_PATTERN = 'D:/TestLogs/????-??-??/??/*.log'
+
+    # 2. Set your desired date range. It must reach back far enough to
+    #    include logs from the previous release.
+    START_DATE = "2026-03-01"
+    END_DATE   = "2026-03-20"
+
+    # 3. Step levels to compare (1 = 'Top Level', 2 = its sections, ...)
+    MAX_DEPTH = 3
+
+    # 4. A step is flagged when a quantile grew by at least both of these
+    MIN_SLOWDOWN_S = 60
+    MIN_SLOWDOWN_PCT = 5
+
+    # 5. Logs needed on each release before a step can be flagged
+    MIN_LOGS = 3
+
+    # Worker processes used to parse new/changed files (None = all cores, 1 = serial)
+    WORKERS = None
+
+    # --- Run the function ---
+
+    final_file_list = get_log_files_in_date_range(LOG_PATTERN, START_DATE, END_DATE)
+    if not final_file_list:
+        print("--- No .log files found matching the criteria. ---")
+        return
+
+    csv_output_path = 'StepRegression_' + START_DATE + '_' + END_DATE + '.csv'
+    manifest_path = os.path.join(CACHE_DIR, f'step_timeline_depth{MAX_DEPTH}_manifest.json')
+    log_files_to_parse = [file_path for file_path in final_file_list if file_path.endswith(".log")]
+
+    # Shares the manifest with AnalysisStepTimeline_FromLogFile.py when both
+    # use the same MAX_DEPTH, so only logs neither report has seen are parsed.
+    all_data = parse_files_incrementally(log_files_to_parse, partial(read_log_steps, max_depth=MAX_DEPTH),
+                                         manifest_path, {'fields': STEP_ROW_FIELDS, 'max_depth': MAX_DEPTH},
+                                         workers=WORKERS)
+
+    # Releases reach the stations at different times, so each station's
+    # versions are ordered and paired on their own
+    station_versions = release_order(all_data)
+    versions = {version for station_list in station_versions.values() for version in station_list}
+    if not any(len(station_list) >= 2 for station_list in station_versions.values()):
+        print(f"Need logs from at least two diag versions on one station to compare, found {len(versions)} in all.")
+        return
+
+    # Step paths don't name the recipe, so steps are compared per station;
+    # otherwise a change in station mix would look like a slowdown
+    durations = GroupedStats()
+    for row in all_data:
+        if row['DiagVer'] is not None:
+            durations.add((row['DiagVer'], row['Station'] or '', row['Step_Path']), row['Duration_s'])
+
+    comparison = []
+    for station, station_list in station_versions.items():
+        for old_version, new_version in zip(station_list, station_list[1:]):
+            comparison.extend(compare_releases(durations, station, old_version, new_version,
+                                               MIN_LOGS, MIN_SLOWDOWN_S, MIN_SLOWDOWN_PCT))
+
+    quantile_names = [f"p{q * 100:g}" for q in QUANTILES]
+    fieldnames = ['DiagVer_Old', 'DiagVer_New', 'Station', 'Step_Path', 'Count_Old', 'Count_New']
+    for name in quantile_names:
+        fieldnames += [f"{name}_Old_s", f"{name}_New_s", f"{name}_Delta_s", f"{name}_Delta_%"]
+    fieldnames.append('Regression')
+
+    regressions = [row for row in comparison if row['Regression']]
+    for row in regressions:
+        print(f"SLOWER: {row['Station']} {row['Step_Path']} ({row['DiagVer_Old']} -> {row['DiagVer_New']}): "
+              f"p50 {row['p50_Delta_s']:+.1f}s, p95 {row['p95_Delta_s']:+.1f}s")
+
+    try:
+        with open(csv_output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(comparison)
+
+        print(f"\n{len(versions)} diag version(s) compared, {len(regressions)} step regression(s). "
+              f"Written to {csv_output_path}")
+    except Exception as e:
+        print(f"Error writing to CSV file: {e}")
+
+if __name__ == "__main__":
+    main()
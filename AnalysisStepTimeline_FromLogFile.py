@@ -0,0 +1,98 @@
+import os
+import csv
+from functools import partial
+
+from log_cache import CACHE_DIR, parse_files_incrementally
+from log_discovery import get_log_files_in_date_range
+from log_stats import GroupedStats
+from log_timeline import STEP_ROW_FIELDS, read_log_steps
+
+# Quantiles reported per step.
+QUANTILES = (0.5, 0.9, 0.99)
+
+def main():
+    """
+    Main function to run the script. It builds the step timeline of every
+    .log file in the date range and writes, per station and recipe step,
+    how long it takes across all trays and what share of that station's
+    cycle it accounts for.
+    """
+    # --- !!! IMPORTANT: SET YOUR VARIABLES HERE !!! ---
+
+    # 1. This is your original glob pattern
+    #    Note: Use forward slashes '/'.
+    LOG_PATTERN = 'Z:/Bianca/????-??-??/??/*.log'
+    # LOG_PATTERN = 'D:/TestLogs/????-??-??/??/*.log'
+
+    # 2. Set your desired date range
+    START_DATE = "2026-03-20"
+    END_DATE   = "2026-03-20"
+
+    # 3. Step levels to report (1 = 'Top Level', 2 = its sections, ...)
+    MAX_DEPTH = 3
+
+    # Worker processes used to parse new/changed files (None = all cores, 1 = serial)
+    WORKERS = None
+
+    # --- Run the function ---
+
+    final_file_list = get_log_files_in_date_range(LOG_PATTERN, START_DATE, END_DATE)
+    if not final_file_list:
+        print("--- No .log files found matching the criteria. ---")
+        return
+
+    csv_output_path = 'StepTimeline_' + START_DATE + '_' + END_DATE + '.csv'
+    manifest_path = os.path.join(CACHE_DIR, f'step_timeline_depth{MAX_DEPTH}_manifest.json')
+    log_files_to_parse = [file_path for file_path in final_file_list if file_path.endswith(".log")]
+
+    # Only new or changed files are parsed; the rest come from the manifest.
+    # The same manifest feeds AnalysisStepRegression_ByDiagVer.py at the
+    # same MAX_DEPTH; each depth keeps its own.
+    all_data = parse_files_incrementally(log_files_to_parse, partial(read_log_steps, max_depth=MAX_DEPTH),
+                                         manifest_path, {'fields': STEP_ROW_FIELDS, 'max_depth': MAX_DEPTH},
+                                         workers=WORKERS)
+
+    if not all_data:
+        print("No step timelines found in any of the log files.")
+        return
+
+    # Per-step duration distribution over every tray. Step paths don't name
+    # the recipe, so FCT, NVL and IST steps are kept apart by station.
+    durations = GroupedStats()
+    cycle_totals = {}
+    for row in all_data:
+        station = row['Station'] or ''
+        durations.add((station, row['Step_Path']), row['Duration_s'])
+        if row['Depth'] == 1:
+            cycle_totals[station] = cycle_totals.get(station, 0.0) + row['Duration_s']
+
+    quantile_names = [f"p{q * 100:g}" for q in QUANTILES]
+    fieldnames = ['Station', 'Step_Path', 'Count', 'Mean_s'] + [f"{name}_s" for name in quantile_names] + \
+                 ['Max_s', 'Total_s', 'Cycle_Share_%']
+
+    # Steps that cost the most wall time overall come first
+    summary = sorted(durations.summary_rows(QUANTILES), key=lambda row: -row['mean'] * row['count'])
+
+    try:
+        with open(csv_output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+
+            for row in summary:
+                station, step_path = row['key']
+                total = row['mean'] * row['count']
+                cycle_total = cycle_totals.get(station)
+                csv_row = {'Station': station, 'Step_Path': step_path, 'Count': row['count'],
+                           'Mean_s': round(row['mean'], 3), 'Max_s': row['max'],
+                           'Total_s': round(total, 3),
+                           'Cycle_Share_%': round(100 * total / cycle_total, 2) if cycle_total else None}
+                for name in quantile_names:
+                    csv_row[f"{name}_s"] = round(row[name], 3)
+                writer.writerow(csv_row)
+
+        print(f"\nStep durations for {len(summary)} step(s) written to {csv_output_path}")
+    except Exception as e:
+        print(f"Error writing to CSV file: {e}")
+
+if __name__ == "__main__":
+    main()
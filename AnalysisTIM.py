@@ -2,15 +2,58 @@ import csv
 import glob
 import os
 
-def get_value_from_log(file_content: str, key: str) -> str:
-    for line in file_content.splitlines():
-        parts = line.split('=', 1)
-        if len(parts) == 2:
-            found_key = parts[0].strip()
-            if found_key == key:
-                value = parts[1].strip()
-                return value
-    return "Value not found"
+from log_parsers import parse_txt_bytes, read_txt_values
+from log_reports import CsvReport
+
+# Keys read from every .txt summary, in column order
+KEYS_TO_FIND = [
+    "TIME_START_CLIENT",
+    "110-0902-000",
+    "110-0902-000_CPU_USE_TIMES",
+    "110-0902-000_IN_STATION_TIME",
+    "110-0902-000_CPU_LAST_RESET_TIME",
+    "PROCESS",
+    "DIAG",
+    "TESTER_TYPE",
+    "FIXTURE",
+    "PRODUCT",
+    "SN",
+    "PN",
+    "TestTime",
+    "TestStatus",
+    "TestErrorCode",
+    "TestErrorMessage",
+    "CoreErrorCode",
+    "CoreErrorMessage"
+]
+
+def txt_row(file_path, values):
+    """
+    Builds the CSV row of one .txt file from its values, printing each one.
+    """
+    # Use the full file_path to provide context in the CSV
+    row_data = [file_path]
+
+    # Find the value for each key and add it to the row data
+    for key in KEYS_TO_FIND:
+        result = values[key]
+        row_data.append(result)
+        print(f"- {key}: {result}")
+
+    return row_data
+
+def parse_txt_data(file_path, data):
+    """
+    Returns the CSV row of one .txt file, given its contents.
+    """
+    return [txt_row(file_path, parse_txt_bytes(data, KEYS_TO_FIND))]
+
+def make_report(output_path: str) -> CsvReport:
+    """
+    This script's rows as a report for log_reports.run_reports.
+    """
+    return CsvReport('TIM usage', output_path, ['Filepath'] + KEYS_TO_FIND, parse_txt_data,
+                     suffix='.txt')
 
 def main():
     log_files = glob.glob('????-??-??/??/*.txt')
@@ -21,27 +64,6 @@ def main():
         return
 
     print(f"Found {len(log_files)} log file(s) to process.")
-
-    keys_to_find = [
-        "TIME_START_CLIENT",
-        "110-0902-000",
-        "110-0902-000_CPU_USE_TIMES",
-        "110-0902-000_IN_STATION_TIME",
-        "110-0902-000_CPU_LAST_RESET_TIME",
-        "PROCESS",
-        "DIAG",
-        "TESTER_TYPE",
-        "FIXTURE",
-        "PRODUCT",
-        "SN",
-        "PN",
-        "TestTime",
-        "TestStatus",
-        "TestErrorCode",
-        "TestErrorMessage",
-        "CoreErrorCode",
-        "CoreErrorMessage"
-    ]
     
     try:
         # Open the CSV file for writing
@@ -49,27 +71,17 @@ def main():
             writer = csv.writer(csvfile)
             
             # Define and write the header row for the CSV file
-            header = ['Filepath'] + keys_to_find
+            header = ['Filepath'] + KEYS_TO_FIND
             writer.writerow(header)
             
             # Process each log file found
             for file_path in log_files:
                 print(f"\nProcessing '{file_path}'...")
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Create a list to hold the data for the current file's row
-                # Use the full file_path to provide context in the CSV
-                row_data = [file_path]
-                
-                # Find the value for each key and add it to the row data
-                for key in keys_to_find:
-                    result = get_value_from_log(content, key)
-                    row_data.append(result)
-                    print(f"- {key}: {result}")
+                # One pass over the file, stopping once every key is found
+                values = read_txt_values(file_path, KEYS_TO_FIND)
                 
                 # Write the completed row to the CSV file
-                writer.writerow(row_data)
+                writer.writerow(txt_row(file_path, values))
                 
         print(f"\nResults for all files have been successfully written to '{csv_output_path}'.")
 
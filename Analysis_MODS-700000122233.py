@@ -2,6 +2,12 @@ import os
 import csv
 import re
 
+from log_parsers import filter_diag_results, map_file, parse_fru_and_diag_bytes
+from log_reports import CsvReport
+
+# Column headers for the CSV
+FIELDNAMES = ['SN', 'log_file_name', 'gpu_IST', 'Notes']
+
 def parse_log_file(file_path):
     """
     Parses a single log file to find and extract specific data from lines
@@ -15,77 +21,60 @@ def parse_log_file(file_path):
               the extracted data for a matching log entry. Returns an
               empty list if no matching entries are found.
     """
+    with map_file(file_path) as data:
+        return parse_log_bytes(file_path, data)
+
+def parse_log_bytes(file_path, data):
+    """
+    Extracts the MODS-700000122233 rows from the contents of one log file.
+
+    Args:
+        file_path (str): The full path to the log file.
+        data (bytes): The file contents, mapped by parse_log_file or read
+                      by log_reports.run_reports.
+
+    Returns:
+        list: A list of dictionaries, one per matching entry.
+    """
     extracted_data = []
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            results = {}
-            device_name = ""
-
-            for i, line in enumerate(lines):
-                procmod_0 = None
-                
-                if "FRU Device Description" in line:
-                    if "ProcMod_0" in line:
-                        procmod_0 = "ProcMod_0"
-
-                if procmod_0 and (i + 2) < len(lines):
-                    serial_line = lines[i + 2]
-                    if "Board Serial Number" in serial_line:
-                        serial_number = serial_line.split()[-1]
-                        results["SN"] = serial_number
-            sn_548 = results.get("SN", "N/A")
-
-            for i, line in enumerate(lines):
-                if "FRU Device Description" in line:
-                    if "CBC_0" in line:
-                        device_name = "CBC_0"
-                    elif "CBC_1" in line:
-                        device_name = "CBC_1"
-                
-                if device_name and (i + 2) < len(lines):
-                    serial_line = lines[i + 2]
-                    if "Board Serial Number" in serial_line:
-                        serial_number = serial_line.split()[-1]
-                        results[device_name] = serial_number
-
-            cbc0 = results.get("CBC_0")
-            cbc1 = results.get("CBC_1")                
-
-            # Iterate through each line with its index
-            for i, line in enumerate(lines):
-                # Condition 1: Check for header keywords in the current line
-                if "Exit Code" in line and "Component Id" in line:
-                    # Ensure we don't go out of bounds when checking the next line
-                    if i + 3 < len(lines):
-                        next_line = lines[i+3]
-
-                        # Condition 2: Check for the specific module code in the next line
-                        if "MODS-700000122233" in next_line:
-                            # Use regular expressions to find the data in the next line.
-                            # This pattern is more specific to match formats like "GPU0_..."
-                            # gpu_match = re.search(r"(GPU\d+_\S+),", next_line)
-                            # This pattern looks for "Nvlink" followed by space(s) and digits.
-                            # nvlink_match = re.search(r"Nvlink\s+(\d+)", next_line)
-                            # This pattern looks for "Lane" followed by space(s) and digits.
-                            # lane_match = re.search(r"Lane\s+(\d+)", next_line)
-                            gpu_ist = re.search(r"00\d+:\d+:\d+.\d", next_line)
-                            notes_match = re.search(r"bad NVIDIA chip\s", next_line)
-
-                            # Extract the matched group, otherwise assign "N/A"
-                        
-                            # Store the found data
-                            extracted_data.append({
-                                'SN': sn_548,
-                                'log_file_name': os.path.basename(file_path),
-                                'gpu_IST' : gpu_ist,
-                                'Notes': notes_match
-                            })
-    except Exception as e:
-        print(f"Error processing file {file_path}: {e}")
+    # The contents are searched for the FRU and result-table markers;
+    # only the lines around them are decoded
+    fru_serials, diag_results = parse_fru_and_diag_bytes(data)
+    sn_548 = fru_serials.get("ProcMod_0", "N/A")
+
+    cbc0 = fru_serials.get("CBC_0")
+    cbc1 = fru_serials.get("CBC_1")
+
+    # Every row of every result table, filtered by exit code
+    for result in filter_diag_results(diag_results, "MODS-700000122233"):
+        # Use regular expressions to find the data in the result row.
+        # This pattern is more specific to match formats like "GPU0_..."
+        # gpu_match = re.search(r"(GPU\d+_\S+),", result.component_id)
+        # This pattern looks for "Nvlink" followed by space(s) and digits.
+        # nvlink_match = re.search(r"Nvlink\s+(\d+)", result.component_id)
+        # This pattern looks for "Lane" followed by space(s) and digits.
+        # lane_match = re.search(r"Lane\s+(\d+)", result.component_id)
+        gpu_ist = re.search(r"00\d+:\d+:\d+.\d", result.component_id)
+        notes_match = re.search(r"bad NVIDIA chip\b", result.notes)
+
+        # Extract the matched group, otherwise assign "N/A"
+
+        # Store the found data
+        extracted_data.append({
+            'SN': sn_548,
+            'log_file_name': os.path.basename(file_path),
+            'gpu_IST' : gpu_ist,
+            'Notes': notes_match
+        })
 
     return extracted_data
 
+def make_report(output_path: str) -> CsvReport:
+    """
+    This script's rows as a report for log_reports.run_reports.
+    """
+    return CsvReport('MODS-700000122233', output_path, FIELDNAMES, parse_log_bytes)
+
 def main():
     """
     Main function to find log files in a specific directory,
@@ -111,7 +100,11 @@ def main():
         if filename.endswith(".log"):
             file_path = os.path.join(log_folder_path, filename)
             print(f"Parsing {filename}...")
-            data = parse_log_file(file_path)
+            try:
+                data = parse_log_file(file_path)
+            except Exception as e:
+                print(f"Error processing file {file_path}: {e}")
+                continue
             if data:
                 all_data.extend(data)
 
@@ -122,9 +115,7 @@ def main():
     # Write the extracted data to a CSV file
     try:
         with open(output_csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-            # Define the column headers for the CSV
-            fieldnames = ['SN', 'log_file_name', 'gpu_IST', 'Notes']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
 
             writer.writeheader()
             writer.writerows(all_data)
@@ -0,0 +1,435 @@
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+
+# An archive with one of these suffixes stands in for the folder of the same
+# name without it: 'Mar_logs_archive.zip' is read as 'Mar_logs_archive/'.
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+# A gzip'd file stands in for the file without the suffix: 'X.log.gz' is
+# read as 'X.log'.
+GZIP_SUFFIX = '.gz'
+
+# Archives kept open at once; their member lists are cached with them.
+MAX_OPEN_ARCHIVES = 8
+
+# Folder and file locations remembered at once; see forget_locations.
+MAX_CACHED_LOCATIONS = 100_000
+
+
+def archive_stem(name: str) -> str | None:
+    """
+    Returns the folder name an archive stands in for ('2026-03-16_23_FCT_logs'
+    for '2026-03-16_23_FCT_logs.zip'), or None if name is not an archive.
+    """
+    lower = name.lower()
+    for suffix in ARCHIVE_SUFFIXES:
+        if lower.endswith(suffix) and len(name) > len(suffix):
+            return name[:-len(suffix)]
+    return None
+
+
+def _member_name(name: str) -> str:
+    name = name.replace('\\', '/')
+    while name.startswith('./'):
+        name = name[2:]
+    return name.lstrip('/')
+
+
+class _Archive:
+    """
+    An open .zip or .tar archive with its member list laid out as folders.
+
+    dirs maps each folder inside the archive ('' for the top, 'a/b/' below
+    it) to its entries, name -> is_dir.
+
+    A compressed tar can't seek: every backward jump would decompress it
+    again from the start, and discovery asks for members by name, not in
+    archive order. So it is unpacked once, front to back, into an
+    anonymous temp file, and members are read from there in any order.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime_ns = os.stat(path).st_mtime_ns
+        self.members = {}
+        self.dirs = {'': {}}
+        self.zip = None
+        self.tar = None
+        self.spill = None
+        self.spilled = {}
+        self.closed = False
+        # tarfile objects and the temp file can't be read from several
+        # threads at once
+        self.lock = threading.Lock()
+
+        lower = path.lower()
+        if lower.endswith('.zip'):
+            self.zip = zipfile.ZipFile(path)
+            entries = [(info.filename, info.is_dir(), info) for info in self.zip.infolist()]
+        elif lower.endswith('.tar'):
+            self.tar = tarfile.open(path, 'r:')
+            entries = [(info.name, info.isdir(), info) for info in self.tar.getmembers()
+                       if info.isdir() or info.isfile()]
+        else:
+            entries = self._unpack_tar()
+
+        for raw_name, directory, info in entries:
+            name = _member_name(raw_name).rstrip('/')
+            if not name:
+                continue
+            parts = name.split('/')
+            folder = ''
+            for part in parts[:-1]:
+                self.dirs[folder][part] = True
+                folder += part + '/'
+                self.dirs.setdefault(folder, {})
+            if directory:
+                self.dirs[folder][parts[-1]] = True
+                self.dirs.setdefault(name + '/', {})
+            else:
+                self.dirs[folder].setdefault(parts[-1], False)
+                self.members[name] = info
+
+    def _unpack_tar(self) -> list:
+        """
+        Streams a compressed tar once, copying its files into self.spill.
+
+        Returns:
+            (name, is_dir, TarInfo) entries, in archive order.
+        """
+        entries = []
+        self.spill = tempfile.TemporaryFile()
+        try:
+            with tarfile.open(self.path, 'r|*') as tar:
+                for info in tar:
+                    if info.isfile():
+                        self.spilled[info.name] = self.spill.tell()
+                        shutil.copyfileobj(tar.extractfile(info), self.spill)
+                    elif not info.isdir():
+                        continue
+                    entries.append((info.name, info.isdir(), info))
+        except BaseException:
+            self.spill.close()
+            raise
+        return entries
+
+    def size(self, member: str) -> int | None:
+        info = self.members.get(member)
+        if info is None:
+            return None
+        return info.file_size if self.zip is not None else info.size
+
+    def read(self, member: str) -> bytes:
+        info = self.members.get(member)
+        if info is None:
+            raise FileNotFoundError(f"No member '{member}' in archive '{self.path}'")
+        with self.lock:
+            if self.closed:
+                # Evicted by another thread after this one looked it up
+                self._reopen()
+            if self.zip is not None:
+                return self.zip.read(info)
+            if self.tar is not None:
+                return self.tar.extractfile(info).read()
+            offset = self.spilled[info.name]
+            if hasattr(os, 'pread'):
+                # Leaves the file position alone, which a forked worker
+                # process shares with its parent
+                return os.pread(self.spill.fileno(), info.size, offset)
+            self.spill.seek(offset)
+            return self.spill.read(info.size)
+
+    def _reopen(self) -> None:
+        if self.zip is not None:
+            self.zip = zipfile.ZipFile(self.path)
+        elif self.tar is not None:
+            self.tar = tarfile.open(self.path, 'r:')
+        else:
+            self._unpack_tar()
+        self.closed = False
+
+    def close(self) -> None:
+        """
+        Closes the archive and drops its temp file. Reads already running
+        finish first.
+        """
+        with self.lock:
+            for handle in (self.zip, self.tar, self.spill):
+                if handle is not None:
+                    handle.close()
+            self.closed = True
+
+
+_open_archives = OrderedDict()
+_open_archives_lock = threading.Lock()
+# One lock per archive being opened, so reader threads asking for the same
+# archive at once unpack it only once
+_opening_locks = {}
+
+
+def _get_archive(path: str) -> _Archive:
+    """
+    Returns the open archive at path, opening it on first use. The least
+    recently used archive is closed once MAX_OPEN_ARCHIVES are open.
+    """
+    with _open_archives_lock:
+        archive = _open_archives.get(path)
+        if archive is not None:
+            _open_archives.move_to_end(path)
+            return archive
+        opening = _opening_locks.setdefault(path, threading.Lock())
+
+    with opening:
+        with _open_archives_lock:
+            archive = _open_archives.get(path)
+            if archive is not None:
+                _open_archives.move_to_end(path)
+                return archive
+
+        archive = _Archive(path)
+        evicted = []
+        with _open_archives_lock:
+            _open_archives[path] = archive
+            _opening_locks.pop(path, None)
+            while len(_open_archives) > MAX_OPEN_ARCHIVES:
+                evicted.append(_open_archives.popitem(last=False)[1])
+
+    for old in evicted:
+        old.close()
+    return archive
+
+
+# Path -> where it is read from, as returned by _archive_folder and _locate.
+# Both describe the share as it was when first asked, so they are emptied
+# by forget_locations, and whenever they grow past MAX_CACHED_LOCATIONS.
+_folder_locations = {}
+_file_locations = {}
+
+
+def forget_locations() -> None:
+    """
+    Drops every remembered folder and file location, so paths are resolved
+    against the share again. log_discovery calls this at the start of each
+    listing, so a long-running process sees folders that were archived or
+    extracted since.
+    """
+    _folder_locations.clear()
+    _file_locations.clear()
+
+
+def _remember(cache: dict, path: str, location) -> None:
+    if len(cache) >= MAX_CACHED_LOCATIONS:
+        cache.clear()
+    cache[path] = location
+
+
+def _archive_folder(dir_path: str) -> tuple[str, str] | None:
+    """
+    Maps a folder path that only exists inside an archive to (archive path,
+    folder inside it, '' or ending in '/'). Returns None for real or missing
+    folders.
+    """
+    try:
+        return _folder_locations[dir_path]
+    except KeyError:
+        pass
+    location = _find_archive_folder(dir_path)
+    _remember(_folder_locations, dir_path, location)
+    return location
+
+
+def _find_archive_folder(dir_path: str) -> tuple[str, str] | None:
+    if os.path.isdir(dir_path):
+        return None
+    parent, name = os.path.split(dir_path)
+    if not name or parent == dir_path:
+        return None
+
+    for suffix in ARCHIVE_SUFFIXES:
+        archive_path = os.path.join(parent, name + suffix)
+        if os.path.isfile(archive_path):
+            return archive_path, ''
+
+    outer = _archive_folder(parent)
+    if outer is None:
+        return None
+    archive_path, folder = outer
+    return archive_path, folder + name + '/'
+
+
+def _locate(file_path: str) -> tuple[str, str | None] | None:
+    """
+    Returns (gz path, None) for a gzip'd file, (archive path, member name)
+    for a file inside an archive, or None for a plain file.
+
+    Files listed by list_dir are answered from what the listing saw; other
+    paths are stat'ed once and remembered.
+    """
+    try:
+        return _file_locations[file_path]
+    except KeyError:
+        pass
+    location = _find_file(file_path)
+    _remember(_file_locations, file_path, location)
+    return location
+
+
+def _find_file(file_path: str) -> tuple[str, str | None] | None:
+    if os.path.isfile(file_path):
+        return None
+    if os.path.isfile(file_path + GZIP_SUFFIX):
+        return file_path + GZIP_SUFFIX, None
+
+    parent, name = os.path.split(file_path)
+    location = _archive_folder(parent) if parent else None
+    if location is None:
+        return None
+    archive_path, folder = location
+    return archive_path, folder + name
+
+
+def list_dir(dir_path: str) -> list[tuple[str, bool]]:
+    """
+    Lists a folder as (name, is_dir) pairs, looking through archives.
+
+    In a real folder, archives are listed as folders under their stem and
+    'X.gz' files as 'X'; a real entry of the same name wins. A folder inside
+    an archive lists its members.
+
+    Where each listed file is read from is remembered, so opening it later
+    costs no further stat on the share.
+
+    Returns:
+        The entries in directory order; empty if the folder doesn't exist.
+    """
+    location = _archive_folder(dir_path) if dir_path else None
+    if location is not None:
+        archive_path, folder = location
+        entries = list(_get_archive(archive_path).dirs.get(folder, {}).items())
+        for name, directory in entries:
+            if not directory:
+                _remember(_file_locations, os.path.join(dir_path, name), (archive_path, folder + name))
+        return entries
+
+    entries = {}
+    virtual = []
+    try:
+        with os.scandir(dir_path or '.') as it:
+            for entry in it:
+                stem = archive_stem(entry.name)
+                if stem is not None and entry.is_file():
+                    virtual.append((stem, True, None))
+                elif entry.name.lower().endswith(GZIP_SUFFIX) and entry.is_file():
+                    virtual.append((entry.name[:-len(GZIP_SUFFIX)], False, os.path.join(dir_path, entry.name)))
+                else:
+                    entries[entry.name] = entry.is_dir()
+                    if not entries[entry.name]:
+                        _remember(_file_locations, os.path.join(dir_path, entry.name), None)
+    except OSError:
+        return []
+
+    for name, directory, gz_path in virtual:
+        if name not in entries:
+            entries[name] = directory
+            if gz_path is not None:
+                _remember(_file_locations, os.path.join(dir_path, name), (gz_path, None))
+    return list(entries.items())
+
+
+def is_dir(dir_path: str) -> bool:
+    """
+    os.path.isdir that also accepts archives and folders inside them.
+    """
+    if os.path.isdir(dir_path):
+        return True
+    location = _archive_folder(dir_path)
+    if location is None:
+        return False
+    archive_path, folder = location
+    return folder in _get_archive(archive_path).dirs
+
+
+def is_archived(file_path: str) -> bool:
+    """
+    True if file_path is read out of a .gz file or an archive.
+    """
+    return _locate(file_path) is not None
+
+
+def archive_of(file_path: str) -> str | None:
+    """
+    Returns the .zip or .tar file_path is read out of, or None for plain
+    and gzip'd files.
+    """
+    location = _locate(file_path)
+    if location is None or location[1] is None:
+        return None
+    return location[0]
+
+
+def read_log_bytes(file_path: str) -> bytes:
+    """
+    Returns the contents of a plain, gzip'd or archived file.
+    """
+    location = _locate(file_path)
+    if location is None:
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+    archive_path, member = location
+    if member is None:
+        with gzip.open(archive_path, 'rb') as f:
+            return f.read()
+    return _get_archive(archive_path).read(member)
+
+
+def open_log(file_path: str):
+    """
+    Opens a plain, gzip'd or archived file for binary reading.
+
+    Plain files are opened as usual. Compressed ones are decompressed into
+    memory, one file at a time and never to disk, so seek() stays cheap.
+    """
+    if _locate(file_path) is None:
+        return open(file_path, 'rb')
+    return io.BytesIO(read_log_bytes(file_path))
+
+
+def open_log_text(file_path: str, errors: str = 'ignore'):
+    """
+    open_log in text mode, like open(file_path, 'r', encoding='utf-8').
+    """
+    return io.TextIOWrapper(open_log(file_path), encoding='utf-8', errors=errors)
+
+
+def log_identity(file_path: str) -> tuple[int, int] | None:
+    """
+    Returns (size, mtime_ns) for a file, or None if it can't be found. A
+    file inside an archive reports its own size and the archive's mtime; a
+    gzip'd file reports the stat of the .gz.
+    """
+    try:
+        location = _locate(file_path)
+        if location is None or location[1] is None:
+            st = os.stat(location[0] if location else file_path)
+            return st.st_size, st.st_mtime_ns
+
+        archive = _get_archive(location[0])
+        size = archive.size(location[1])
+        return None if size is None else (size, archive.mtime_ns)
+    except (OSError, zipfile.BadZipFile, tarfile.TarError):
+        return None
+
+
+def log_exists(file_path: str) -> bool:
+    """
+    os.path.exists for plain, gzip'd and archived files.
+    """
+    return log_identity(file_path) is not None
@@ -0,0 +1,351 @@
+import hashlib
+import json
+import os
+import sys
+import time
+
+from log_archive import log_identity
+from log_parallel import parse_files_parallel
+from log_parsers import PARSER_VERSION
+
+# Local folder for manifests and caches. Never put these on the share.
+CACHE_DIR = '.log_cache'
+
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+
+
+def file_identity(file_path: str) -> tuple[int, int] | None:
+    """
+    Returns (size, mtime_ns) for a file, or None if it cannot be stat'ed.
+    Files read out of an archive report their own size and the archive's
+    mtime; see log_archive.log_identity.
+    """
+    return log_identity(file_path)
+
+
+def write_json_atomic(path: str, payload) -> None:
+    """
+    Writes JSON to a temp file and swaps it in, so an interrupted run never
+    leaves a half-written manifest behind.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+class FileManifest:
+    """
+    Local record of every file a script has parsed: path, size, mtime,
+    parse status and the rows the file produced.
+
+    A rerun only has to parse files that are new or whose size/mtime changed;
+    everything else is served from the manifest. Entries are dropped when
+    the schema or PARSER_VERSION changes, and prune() drops the files a run
+    no longer asks for.
+    """
+
+    def __init__(self, manifest_path: str, schema=None):
+        """
+        Args:
+            manifest_path: Where the manifest JSON lives (local disk).
+            schema: Anything JSON-serialisable describing the row layout
+                    (e.g. the CSV fieldnames). If it differs from the stored
+                    schema the old entries are dropped.
+        """
+        self.manifest_path = manifest_path
+        self.schema = schema
+        self.entries = {}
+        self.changed = True
+
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    payload = json.load(f)
+                if payload.get('schema') == schema and payload.get('parser_version') == PARSER_VERSION:
+                    self.entries = payload.get('files', {})
+                    self.changed = False
+                else:
+                    print(f"Manifest '{manifest_path}' was built for a different layout or parser; starting fresh.")
+            except (OSError, ValueError) as e:
+                print(f"Warning: could not read manifest '{manifest_path}': {e}", file=sys.stderr)
+
+    def cached_rows(self, file_path: str, identity: tuple[int, int] | None = None) -> list | None:
+        """
+        Returns the stored rows if the file is unchanged since it was parsed,
+        otherwise None.
+        """
+        entry = self.entries.get(file_path)
+        if entry is None or entry.get('status') != STATUS_OK:
+            return None
+
+        if identity is None:
+            identity = file_identity(file_path)
+        if identity is None or [entry.get('size'), entry.get('mtime_ns')] != list(identity):
+            return None
+
+        return entry.get('rows', [])
+
+    def record(self, file_path: str, rows: list, status: str = STATUS_OK,
+               identity: tuple[int, int] | None = None) -> None:
+        """
+        Stores the parse result of one file.
+        """
+        if identity is None:
+            identity = file_identity(file_path)
+        size, mtime_ns = identity if identity else (None, None)
+        self.entries[file_path] = {
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'status': status,
+            'rows': rows,
+        }
+        self.changed = True
+
+    def prune(self, file_paths: list[str]) -> None:
+        """
+        Drops the entries of files not in file_paths, so the manifest only
+        holds the current window instead of every file ever parsed.
+        """
+        keep = set(file_paths)
+        stale = [file_path for file_path in self.entries if file_path not in keep]
+        for file_path in stale:
+            del self.entries[file_path]
+        if stale:
+            self.changed = True
+
+    def save(self) -> None:
+        """
+        Writes the manifest, unless nothing changed since it was loaded.
+        """
+        if not self.changed:
+            return
+        write_json_atomic(self.manifest_path, {'schema': self.schema, 'parser_version': PARSER_VERSION,
+                                               'files': self.entries})
+        self.changed = False
+
+
+def parse_files_incrementally(file_paths: list[str], parse_fn, manifest_path: str, schema=None,
+                              workers: int | None = 1) -> list:
+    """
+    Runs parse_fn over file_paths, reusing results for unchanged files.
+    Files the manifest holds from earlier windows are dropped from it.
+
+    Args:
+        file_paths: The files in the requested window, in output order.
+        parse_fn: Callable taking a path and returning a list of rows. It
+                  must raise on a read or parse error rather than return
+                  [], or the file is stored as parsed and never retried.
+        manifest_path: Local manifest file for this report.
+        schema: Row layout; see FileManifest.
+        workers: Processes used for the files that need parsing; see
+                 log_parallel.parse_files_parallel. 1 parses serially.
+
+    Returns:
+        The rows of every file (cached and freshly parsed), in file order.
+    """
+    manifest = FileManifest(manifest_path, schema)
+    rows_by_index = {}
+    to_parse = []
+
+    for index, file_path in enumerate(file_paths):
+        identity = file_identity(file_path)
+        rows = manifest.cached_rows(file_path, identity)
+        if rows is not None:
+            rows_by_index[index] = rows
+        else:
+            to_parse.append((index, file_path, identity))
+
+    results = parse_files_parallel([file_path for _, file_path, _ in to_parse], parse_fn, workers)
+
+    for (index, file_path, identity), (rows, error) in zip(to_parse, results):
+        if error is None:
+            manifest.record(file_path, rows, STATUS_OK, identity)
+        else:
+            # Keep the failure in the manifest so the next run retries it.
+            print(f"Error processing file {file_path}: {error}")
+            manifest.record(file_path, rows, STATUS_ERROR, identity)
+        rows_by_index[index] = rows
+
+    manifest.prune(file_paths)
+    manifest.save()
+    print(f"\nReused {len(file_paths) - len(to_parse)} cached file(s), "
+          f"parsed {len(to_parse)} new or changed file(s).")
+
+    all_rows = []
+    for index in range(len(file_paths)):
+        all_rows.extend(rows_by_index[index])
+
+    return all_rows
+
+
+class ParseCache:
+    """
+    Cache of every field extracted from a file, keyed by path, size and mtime.
+
+    Each source file gets one small JSON entry under cache_dir holding a
+    field -> value map. Extractors add to the map, so a later report asking
+    for an overlapping field set is answered without reading the share.
+    Entries whose size/mtime no longer match the file are ignored.
+    """
+
+    def __init__(self, cache_dir: str = os.path.join(CACHE_DIR, 'parsed'),
+                 max_age_days: float | None = None,
+                 max_bytes: int | None = None):
+        """
+        Args:
+            cache_dir: Local folder for the cache entries.
+            max_age_days: Entries not used for this long are dropped by evict().
+            max_bytes: evict() drops least recently used entries above this size.
+        """
+        self.cache_dir = cache_dir
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, file_path: str) -> str:
+        digest = hashlib.sha1(file_path.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + '.json')
+
+    def _load(self, file_path: str) -> dict | None:
+        entry_path = self._entry_path(file_path)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('path') != file_path:
+            return None
+        return entry
+
+    def get_fields(self, file_path: str, names: list[str],
+                   identity: tuple[int, int] | None = None,
+                   verify: bool = True) -> dict | None:
+        """
+        Returns the cached values for names, or None if any is missing/stale.
+
+        Args:
+            file_path: The source file.
+            names: Fields the caller needs.
+            identity: (size, mtime_ns) if already known.
+            verify: If False, trust the entry without stat'ing the file.
+                    Useful for closed date folders that never change.
+        """
+        entry = self._load(file_path)
+        if entry is None:
+            return None
+
+        if verify:
+            if identity is None:
+                identity = file_identity(file_path)
+            if identity is None or [entry.get('size'), entry.get('mtime_ns')] != list(identity):
+                return None
+
+        fields = entry.get('fields', {})
+        if any(name not in fields for name in names):
+            return None
+
+        # Touch the entry so evict() treats it as recently used.
+        try:
+            os.utime(self._entry_path(file_path))
+        except OSError:
+            pass
+
+        return {name: fields[name] for name in names}
+
+    def update_fields(self, file_path: str, fields: dict,
+                      identity: tuple[int, int] | None = None) -> None:
+        """
+        Merges newly extracted fields into the file's entry.
+        """
+        if identity is None:
+            identity = file_identity(file_path)
+        if identity is None:
+            return
+
+        entry = self._load(file_path)
+        if entry is None or [entry.get('size'), entry.get('mtime_ns')] != list(identity):
+            entry = {'path': file_path, 'size': identity[0], 'mtime_ns': identity[1], 'fields': {}}
+
+        entry['fields'].update(fields)
+        write_json_atomic(self._entry_path(file_path), entry)
+
+    def evict(self) -> int:
+        """
+        Drops entries older than max_age_days, then the least recently used
+        ones until the cache fits in max_bytes.
+
+        Returns:
+            The number of entries removed.
+        """
+        entries = []
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                entry_path = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(entry_path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry_path))
+
+        removed = 0
+        kept = []
+        cutoff = None
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 86400
+
+        for used_at, size, entry_path in entries:
+            if cutoff is not None and used_at < cutoff:
+                removed += _remove_quietly(entry_path)
+            else:
+                kept.append((used_at, size, entry_path))
+
+        if self.max_bytes is not None:
+            kept.sort()
+            total = sum(size for _, size, _ in kept)
+            for _, size, entry_path in kept:
+                if total <= self.max_bytes:
+                    break
+                removed += _remove_quietly(entry_path)
+                total -= size
+
+        return removed
+
+
+def _remove_quietly(path: str) -> int:
+    try:
+        os.remove(path)
+        return 1
+    except OSError:
+        return 0
+
+
+def cached_fields(cache: ParseCache | None, file_path: str, names: list[str], extract_fn) -> dict:
+    """
+    Returns the requested fields of a file, reading it only on a cache miss.
+
+    Args:
+        cache: The ParseCache to use, or None to always call extract_fn.
+        file_path: The source file.
+        names: Fields the caller needs.
+        extract_fn: Callable taking the path and returning a dict that holds
+                    at least names. Everything it returns is cached.
+
+    Returns:
+        A dict with one value per requested name.
+    """
+    if cache is None:
+        fields = extract_fn(file_path)
+        return {name: fields.get(name) for name in names}
+
+    identity = file_identity(file_path)
+    fields = cache.get_fields(file_path, names, identity)
+    if fields is not None:
+        return fields
+
+    fields = extract_fn(file_path)
+    cache.update_fields(file_path, fields, identity)
+    return {name: fields.get(name) for name in names}
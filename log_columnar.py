@@ -0,0 +1,339 @@
+import os
+import shutil
+from datetime import datetime
+
+from log_discovery import parse_log_name
+from log_reports import CsvReport
+from log_store import TEST_TIME_FORMAT
+
+# pyarrow is only needed for the columnar output; the CSV path works without it.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Partition columns, in folder order: '<dataset>/Date=2026-05-15/Station=FCT/'.
+PARTITION_COLUMNS = ('Date', 'Station')
+
+# Partition value for logs whose date folder or station can't be decoded.
+UNKNOWN_PARTITION = 'unknown'
+
+# Rows buffered per partition before a file is written.
+ROWS_PER_FILE = 100_000
+
+# Parquet codec; zstd packs the repetitive IMAGE_*/VERSION_* strings best.
+COMPRESSION = 'zstd'
+
+# Footer test times ('20250810124729') are stored as timestamps.
+TEST_TIME_COLUMNS = ('StartTestTime', 'EndTestTime')
+
+
+def require_pyarrow() -> None:
+    """
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    if pa is None:
+        raise ImportError("Parquet output needs pyarrow; install it with 'pip install pyarrow'.")
+
+
+def log_partition(file_path: str) -> tuple[str, str]:
+    """
+    Returns the (Date, Station) partition of a log: the 'YYYY-MM-DD' folder
+    it sits in and the station decoded from its name.
+    """
+    date_name = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
+    if len(date_name) != len('YYYY-MM-DD') or date_name[4] != '-' or date_name[7] != '-':
+        date_name = UNKNOWN_PARTITION
+    log_name = parse_log_name(file_path)
+    return date_name, log_name.station if log_name else UNKNOWN_PARTITION
+
+
+def value_type(value):
+    """
+    Returns the Arrow type a value is stored as: bool, int64, float64 or
+    (for anything else) text.
+    """
+    if isinstance(value, bool):
+        return pa.bool_()
+    if isinstance(value, int):
+        return pa.int64()
+    if isinstance(value, float):
+        return pa.float64()
+    return pa.string()
+
+
+def widen(column_type, this_type):
+    """
+    Returns the type that holds values of both types: an int64 column
+    becomes float64 when a float comes along, and any other mix is text.
+    """
+    if column_type is None or column_type == this_type:
+        return this_type
+    if {column_type, this_type} == {pa.int64(), pa.float64()}:
+        return pa.float64()
+    return pa.string()
+
+
+def column_types(rows: list[dict], columns: list[str], types: dict | None = None) -> dict:
+    """
+    Picks the Arrow type of every column from its values, so BERs stay
+    float64 and Nvlink/Lane numbers int64; see widen for columns holding
+    more than one type. Columns already in types are widened from there,
+    except timestamp columns, which keep theirs. All-null columns are text.
+    """
+    picked = dict(types or {})
+    for column in columns:
+        column_type = picked.get(column)
+        if column_type is not None and pa.types.is_timestamp(column_type):
+            continue
+        for row in rows:
+            value = row.get(column)
+            if value is None:
+                continue
+            column_type = widen(column_type, value_type(value))
+            if pa.types.is_string(column_type):
+                break
+        picked[column] = column_type or pa.string()
+    return picked
+
+
+def _test_time(value):
+    if isinstance(value, datetime) or value is None:
+        return value
+    return datetime.strptime(str(value), TEST_TIME_FORMAT)
+
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ('true', 'false'):
+        return value.strip().lower() == 'true'
+    raise ValueError(f"{value!r} is not a bool")
+
+
+def _int(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise ValueError(f"{value!r} is not an int")
+
+
+def _float(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    raise ValueError(f"{value!r} is not a number")
+
+
+def _column_array(values, column_type) -> tuple:
+    """
+    Builds one Arrow column of the given type. Text columns are
+    dictionary-encoded, so a value repeated on every row is stored once.
+
+    Returns:
+        (array, count of values stored as null because they aren't test
+        times; always 0 for other columns).
+
+    Raises:
+        ValueError: If a value doesn't fit a numeric or bool column; pick
+                    the types with column_types so they all do.
+    """
+    if pa.types.is_timestamp(column_type):
+        times = []
+        for value in values:
+            try:
+                times.append(_test_time(value))
+            except ValueError:
+                times.append(None)
+        invalid = sum(1 for value, time in zip(values, times) if value is not None and time is None)
+        return pa.array(times, column_type), invalid
+    if pa.types.is_string(column_type):
+        return pa.array([None if value is None else str(value) for value in values],
+                        pa.string()).dictionary_encode(), 0
+    if pa.types.is_floating(column_type):
+        convert = _float
+    elif pa.types.is_integer(column_type):
+        convert = _int
+    else:
+        convert = _bool
+    return pa.array([None if value is None else convert(value) for value in values], column_type), 0
+
+
+def default_types(columns: list[str]) -> dict:
+    """
+    The types fixed by column name rather than by value: TEST_TIME_COLUMNS.
+    """
+    return {column: pa.timestamp('s') for column in columns if column in TEST_TIME_COLUMNS}
+
+
+def write_parquet_file(rows: list[dict], columns: list[str], output_path: str,
+                       types: dict | None = None) -> int:
+    """
+    Writes dict rows as one compressed Parquet file.
+
+    Args:
+        rows: The rows to write.
+        columns: The columns, in order.
+        output_path: The file to write.
+        types: Arrow type per column; see column_types, which picks the
+               missing ones from the rows and widens the others to fit them.
+
+    Returns:
+        The number of values stored as null because they aren't test times.
+    """
+    require_pyarrow()
+    if types is None:
+        types = default_types(columns)
+    types = column_types(rows, columns, types)
+    arrays = {}
+    invalid = 0
+    for column in columns:
+        arrays[column], column_invalid = _column_array([row.get(column) for row in rows], types[column])
+        invalid += column_invalid
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    pq.write_table(pa.table(arrays), output_path, compression=COMPRESSION, use_dictionary=True)
+    return invalid
+
+
+def retype_parquet_file(path: str, types: dict) -> None:
+    """
+    Rewrites a file written by write_parquet_file whose columns were given
+    narrower types than those in types, e.g. int64 where a later file
+    needed float64, so a dataset's files share one schema again.
+    """
+    require_pyarrow()
+    table = pq.ParquetFile(path).read()
+    arrays = {}
+    for name, column in zip(table.column_names, table.columns):
+        column_type = types.get(name)
+        if column_type is None or pa.types.is_timestamp(column_type):
+            arrays[name] = column
+        elif pa.types.is_string(column_type) and pa.types.is_dictionary(column.type):
+            arrays[name] = column
+        elif column.type == column_type:
+            arrays[name] = column
+        else:
+            arrays[name] = _column_array(column.to_pylist(), column_type)[0]
+    pq.write_table(pa.table(arrays), path, compression=COMPRESSION, use_dictionary=True)
+
+
+def partition_dir(dataset_dir: str, partition: tuple[str, str]) -> str:
+    return os.path.join(dataset_dir, *(f"{name}={value}" for name, value in zip(PARTITION_COLUMNS, partition)))
+
+
+def read_parquet_dataset(dataset_dir: str, columns: list[str] | None = None, filters=None):
+    """
+    Reads a dataset written by ParquetReport back as a pyarrow Table.
+
+    Only the requested columns are read, and filters on Date/Station skip
+    whole partition folders, e.g.
+        read_parquet_dataset('DailyReports_.../AnalysisSN_TestParts',
+                             columns=['SN', 'IMAGE_VBIOS'],
+                             filters=[('Station', '=', 'FCT')]).to_pandas()
+    pandas.read_parquet(dataset_dir, columns=...) reads the same folders.
+    """
+    require_pyarrow()
+    return pq.read_table(dataset_dir, columns=columns, filters=filters, partitioning='hive')
+
+
+class ParquetReport(CsvReport):
+    """
+    A CsvReport whose rows go to a Parquet dataset instead of one CSV file:
+    one folder per Date and Station, each holding compressed files of at
+    most ROWS_PER_FILE rows.
+
+    Rows are partitioned by the log they came from, so the file being
+    parsed is tracked between extract() and add(). Column types are picked
+    (see column_types) from all rows buffered when the first file is
+    written, and widened when a later file's rows don't fit them; files
+    already written are then rewritten in finish(), so every file in the
+    dataset has one schema. Test times that don't parse are stored as null
+    and counted in the summary line.
+    """
+
+    def __init__(self, name: str, output_path: str, fieldnames: list[str], parse_fn,
+                 accept_fn=None, suffix: str = '.log', config=None):
+        """
+        Args:
+            output_path: The dataset folder. Anything already in it is
+                         replaced, like a CSV file would be.
+            Other arguments as for CsvReport.
+        """
+        super().__init__(name, output_path, fieldnames, parse_fn, accept_fn, suffix, config)
+        # Blank spacer columns (AnalysisSN_TestParts has two) are left out
+        self.columns = [column for column in dict.fromkeys(fieldnames) if column]
+        self._buffers = {}
+        self._file_counts = {}
+        self._types = None
+        self._written = []
+        self._widened = False
+        self.invalid_times = 0
+
+    @classmethod
+    def from_csv_report(cls, report: CsvReport, output_path: str) -> 'ParquetReport':
+        """
+        The same report as a script's make_report(), written as Parquet.
+        """
+        return cls(report.name, output_path, report.fieldnames, report.parse_fn,
+                   report.accept_fn, report.suffix, report.config)
+
+    def begin(self) -> None:
+        require_pyarrow()
+        self._types = None
+        self._written = []
+        self._widened = False
+        self.invalid_times = 0
+        if os.path.isdir(self.output_path):
+            shutil.rmtree(self.output_path)
+        os.makedirs(self.output_path, exist_ok=True)
+
+    def extract(self, file_path: str, data: bytes) -> list:
+        rows = self.parse_fn(file_path, data)
+        partition = log_partition(file_path)
+        return [(partition, row) for row in rows]
+
+    def add(self, rows: list) -> None:
+        for partition, row in rows:
+            if not isinstance(row, dict):
+                row = dict(zip(self.fieldnames, row))
+            buffer = self._buffers.setdefault(partition, [])
+            buffer.append(row)
+            if len(buffer) >= ROWS_PER_FILE:
+                self._flush(partition)
+        self.row_count += len(rows)
+
+    def _flush(self, partition: tuple[str, str]) -> None:
+        rows = self._buffers.pop(partition, [])
+        if not rows:
+            return
+        if self._types is None:
+            buffered = [row for buffer in self._buffers.values() for row in buffer]
+            self._types = column_types(rows + buffered, self.columns, default_types(self.columns))
+        else:
+            types = column_types(rows, self.columns, self._types)
+            if types != self._types:
+                self._types = types
+                self._widened = True
+        index = self._file_counts.get(partition, 0)
+        self._file_counts[partition] = index + 1
+        path = os.path.join(partition_dir(self.output_path, partition), f"part-{index:05d}.parquet")
+        self.invalid_times += write_parquet_file(rows, self.columns, path, self._types)
+        self._written.append((path, self._types))
+
+    def finish(self) -> None:
+        for partition in list(self._buffers):
+            self._flush(partition)
+        if self._widened:
+            for path, types in self._written:
+                if types != self._types:
+                    retype_parquet_file(path, self._types)
+
+        if self.invalid_times:
+            print(f"{self.name}: {self.invalid_times} test time(s) could not be parsed and were stored as null.")
+        if not self.row_count:
+            shutil.rmtree(self.output_path, ignore_errors=True)
+            print(f"{self.name}: no matching entries found.")
+        else:
+            print(f"{self.name}: {self.row_count} row(s) written to {self.output_path}")
@@ -0,0 +1,393 @@
+import fnmatch
+import glob
+import os
+import re
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+
+from log_archive import forget_locations, is_dir, list_dir
+
+# Every share we read is laid out as '<root>/YYYY-MM-DD/HH/<file>'. Any
+# folder on the way may also be a .zip/.tar archive of the same name, and
+# any file a .gz of it; see log_archive.
+DATE_DIR_GLOB = '????-??-??'
+
+_GLOB_MAGIC = re.compile(r'[*?[]')
+
+
+@dataclass(frozen=True)
+class LogName:
+    """
+    Metadata encoded in a log file name, e.g.
+    'FXHC_NA_900-2G548-0001-000_1651126052429_F_FCT_20260325T225601Z.log'.
+    """
+    site: str
+    pbr: str
+    pn: str | None
+    sn: str | None
+    result: str
+    station: str
+    timestamp: datetime | None
+    file_name: str
+
+    @property
+    def failed(self) -> bool:
+        return self.result == 'F'
+
+    @property
+    def passed(self) -> bool:
+        return self.result == 'P'
+
+
+def _parse_name_timestamp(text: str) -> datetime | None:
+    """
+    Parses 'YYYYMMDDTHHMMSSZ' by slicing, without strptime.
+    """
+    if len(text) != 16 or text[8] != 'T' or text[15] != 'Z':
+        return None
+    try:
+        return datetime(int(text[0:4]), int(text[4:6]), int(text[6:8]),
+                        int(text[9:11]), int(text[11:13]), int(text[13:15]),
+                        tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def parse_log_name(file_path: str) -> LogName | None:
+    """
+    Decodes site, PBR, PN, board SN, pass/fail, station and UTC time from a
+    log file name, without opening the file.
+
+    Handles the regular layout
+        FXHC_NA_900-2G548-0001-000_1651126052429_F_FCT_20260325T225601Z.log
+    and the variant written when the PBR option leaks into the name
+        FXHC_--pbr=NA_PG548_NA_F_FCT_20260326T002550Z.log
+
+    Args:
+        file_path: A file name or full path (.log or .txt).
+
+    Returns:
+        A LogName, or None if the name does not follow the layout.
+    """
+    file_name = os.path.basename(file_path)
+    stem = os.path.splitext(file_name)[0]
+    parts = stem.split('_')
+    if len(parts) < 7:
+        return None
+
+    timestamp_text, station, result = parts[-1], parts[-2], parts[-3]
+    if result not in ('F', 'P'):
+        return None
+
+    site = parts[0]
+    pbr = '_'.join(parts[1:-5])
+    if pbr.startswith('--pbr='):
+        pbr = pbr[len('--pbr='):]
+    pn = parts[-5] if parts[-5] != 'NA' else None
+    sn = parts[-4] if parts[-4] != 'NA' else None
+
+    return LogName(site=site, pbr=pbr, pn=pn, sn=sn, result=result, station=station,
+                   timestamp=_parse_name_timestamp(timestamp_text), file_name=file_name)
+
+
+def filter_log_names(file_paths, sn: str | None = None, pn: str | None = None,
+                     station: str | list[str] | None = None, result: str | None = None,
+                     start_time: datetime | None = None, end_time: datetime | None = None):
+    """
+    Yields (file_path, LogName) for paths whose name passes every filter.
+
+    Runs on the directory listing alone; no file is opened. Names that can't
+    be decoded are dropped whenever any filter is given.
+
+    Args:
+        file_paths: Paths from one of the discovery functions.
+        sn: Board serial number.
+        pn: Product part number.
+        station: Station code ('FCT', 'NVL', ...) or a list of them.
+        result: 'F' or 'P'.
+        start_time: Earliest name timestamp (inclusive). Naive datetimes are UTC.
+        end_time: Latest name timestamp (inclusive). Naive datetimes are UTC.
+    """
+    if isinstance(station, str):
+        station = [station]
+    if start_time is not None and start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=timezone.utc)
+    if end_time is not None and end_time.tzinfo is None:
+        end_time = end_time.replace(tzinfo=timezone.utc)
+
+    for file_path in file_paths:
+        log_name = parse_log_name(file_path)
+        if log_name is None:
+            continue
+        if sn is not None and log_name.sn != sn:
+            continue
+        if pn is not None and log_name.pn != pn:
+            continue
+        if station is not None and log_name.station not in station:
+            continue
+        if result is not None and log_name.result != result:
+            continue
+        if start_time is not None and (log_name.timestamp is None or log_name.timestamp < start_time):
+            continue
+        if end_time is not None and (log_name.timestamp is None or log_name.timestamp > end_time):
+            continue
+        yield file_path, log_name
+
+
+def split_partitioned_pattern(base_pattern: str) -> tuple[str, str, str] | None:
+    """
+    Splits a '<root>/????-??-??/<hour glob>/<file glob>' pattern into its parts.
+
+    Args:
+        base_pattern: The glob pattern used by the scripts
+                      (e.g., 'Z:/Bianca/????-??-??/??/*.log').
+
+    Returns:
+        A (root, hour_glob, file_glob) tuple, or None if the pattern does not
+        follow the date/hour folder layout.
+    """
+    # Split the same way glob.glob does so the joined paths come out identical.
+    hour_pattern, file_glob = os.path.split(base_pattern)
+    date_pattern, hour_glob = os.path.split(hour_pattern)
+    root, date_glob = os.path.split(date_pattern)
+
+    if date_glob != DATE_DIR_GLOB or not hour_glob or not file_glob:
+        return None
+    if _GLOB_MAGIC.search(root):
+        return None
+
+    return root, hour_glob, file_glob
+
+
+def _scandir_names(dir_path: str, name_glob: str, want_dir: bool) -> list[str]:
+    """
+    Lists the entries of one directory whose names match a glob, sorted by name.
+
+    Hidden entries are skipped the same way glob.glob skips them. Archives
+    and .gz files are looked through; see log_archive.list_dir.
+    """
+    names = []
+    # Missing day/hour folders are normal on the share and list as empty.
+    for name, is_directory in list_dir(dir_path):
+        if name.startswith('.') and not name_glob.startswith('.'):
+            continue
+        if not fnmatch.fnmatch(name, name_glob):
+            continue
+        if want_dir and not is_directory:
+            continue
+        names.append(name)
+
+    names.sort()
+    return names
+
+
+def list_date_dirs(root: str) -> list[date]:
+    """
+    Returns the dates of every 'YYYY-MM-DD' folder under root, oldest first.
+    """
+    dates = []
+    for name in _scandir_names(root, DATE_DIR_GLOB, want_dir=True):
+        try:
+            dates.append(date.fromisoformat(name))
+        except ValueError:
+            # The folder name isn't a valid date (e.g., 'ABCD-12-34').
+            continue
+    return dates
+
+
+def iter_date_dirs(root: str, start_date: date, end_date: date):
+    """
+    Yields (date, path) for every existing 'YYYY-MM-DD' folder in the range.
+
+    Only the folders inside the range are probed, so the cost follows the size
+    of the window and not the number of days archived under root.
+    """
+    current_date = start_date
+    while current_date <= end_date:
+        date_path = os.path.join(root, current_date.isoformat())
+        if is_dir(date_path):
+            yield current_date, date_path
+        current_date += timedelta(days=1)
+
+
+def parse_window_bound(value: str | datetime) -> datetime:
+    """
+    Converts a time-window bound into a datetime.
+
+    Args:
+        value: A datetime, or a string such as '2026-05-15', '2026-05-15 22:00'
+               or '2026-05-15T22:00:00'.
+
+    Returns:
+        The parsed datetime.
+
+    Raises:
+        ValueError: If the string is not an ISO date/datetime.
+    """
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def last_hours(hours: int, now: datetime | None = None) -> tuple[datetime, datetime]:
+    """
+    Returns a (start, end) window covering the last N hours up to now.
+    """
+    end_time = now or datetime.now()
+    return end_time - timedelta(hours=hours), end_time
+
+
+def iter_hour_dirs(root: str, hour_glob: str, start_time: datetime, end_time: datetime):
+    """
+    Yields (hour_start, path) for every existing 'YYYY-MM-DD/HH' folder that
+    overlaps [start_time, end_time].
+
+    Hour folders are probed by name, so a three-hour window costs three
+    directory lookups no matter how many hours each day holds.
+    """
+    hour_start = start_time.replace(minute=0, second=0, microsecond=0)
+    current_date = None
+    date_exists = False
+
+    while hour_start <= end_time:
+        if hour_start.date() != current_date:
+            current_date = hour_start.date()
+            date_exists = is_dir(os.path.join(root, current_date.isoformat()))
+
+        hour_name = f"{hour_start.hour:02d}"
+        if date_exists and fnmatch.fnmatch(hour_name, hour_glob):
+            hour_path = os.path.join(root, current_date.isoformat(), hour_name)
+            if is_dir(hour_path):
+                yield hour_start, hour_path
+
+        hour_start += timedelta(hours=1)
+
+
+def get_log_files_in_time_range(base_pattern: str,
+                                start_time: str | datetime,
+                                end_time: str | datetime) -> list[str]:
+    """
+    Finds log files whose 'YYYY-MM-DD/HH' folder overlaps a datetime range.
+
+    Unlike get_log_files_in_date_range this prunes at the hour-folder level,
+    so windows such as the last 3 hours or 22:00-02:00 across midnight only
+    list and open the matching HH folders.
+
+    Args:
+        base_pattern: The glob pattern to search (e.g., 'Z:/Bianca/????-??-??/??/*.log').
+        start_time: Window start (inclusive), e.g. '2026-05-14 22:00'.
+        end_time: Window end (inclusive), e.g. '2026-05-15 02:00'.
+
+    Returns:
+        A list of file paths that match the criteria.
+    """
+    try:
+        start_time = parse_window_bound(start_time)
+        end_time = parse_window_bound(end_time)
+    except ValueError as e:
+        print(f"Error: Invalid datetime format. Please use YYYY-MM-DD HH:MM. Details: {e}", file=sys.stderr)
+        return []
+
+    layout = split_partitioned_pattern(base_pattern)
+    if layout is None:
+        print(f"Error: pattern '{base_pattern}' does not follow the '????-??-??/??/' layout.", file=sys.stderr)
+        return []
+
+    print(f"Filtering for hours: {start_time} to {end_time}\n")
+
+    root, hour_glob, file_glob = layout
+    filtered_log_files = []
+    forget_locations()
+
+    for _, hour_path in iter_hour_dirs(root, hour_glob, start_time, end_time):
+        for name in _scandir_names(hour_path, file_glob, want_dir=False):
+            filtered_log_files.append(os.path.join(hour_path, name))
+
+    if not filtered_log_files:
+        print(f"Warning: glob pattern '{base_pattern}' found 0 files.", file=sys.stderr)
+
+    return filtered_log_files
+
+
+def get_log_files_in_date_range(base_pattern: str,
+                                start_date_str: str,
+                                end_date_str: str) -> list[str]:
+    """
+    Finds log files from a glob pattern that fall within a date range.
+
+    Patterns that follow the '<root>/????-??-??/??/*.log' layout are resolved
+    by listing only the date folders in range and the hour folders inside them.
+    Any other pattern falls back to a full glob that is filtered by date.
+
+    Args:
+        base_pattern: The glob pattern to search (e.g., 'Z:/.../*.txt').
+        start_date_str: The start date in 'YYYY-MM-DD' format (inclusive).
+        end_date_str: The end date in 'YYYY-MM-DD' format (inclusive).
+
+    Returns:
+        A list of file paths that match the criteria.
+    """
+
+    # --- 1. Define Date Range ---
+    try:
+        start_date = date.fromisoformat(start_date_str)
+        end_date = date.fromisoformat(end_date_str)
+    except ValueError as e:
+        print(f"Error: Invalid date format. Please use YYYY-MM-DD. Details: {e}", file=sys.stderr)
+        return []
+
+    print(f"Filtering for dates: {start_date} to {end_date}\n")
+
+    # --- 2. Walk only the folders inside the window ---
+    # Re-resolve folders that were archived or extracted since the last run.
+    forget_locations()
+    layout = split_partitioned_pattern(base_pattern)
+    if layout is None:
+        return _glob_files_in_date_range(base_pattern, start_date, end_date)
+
+    root, hour_glob, file_glob = layout
+    filtered_log_files = []
+
+    for _, date_path in iter_date_dirs(root, start_date, end_date):
+        for hour in _scandir_names(date_path, hour_glob, want_dir=True):
+            hour_path = os.path.join(date_path, hour)
+            for name in _scandir_names(hour_path, file_glob, want_dir=False):
+                filtered_log_files.append(os.path.join(hour_path, name))
+
+    if not filtered_log_files:
+        print(f"Warning: glob pattern '{base_pattern}' found 0 files.", file=sys.stderr)
+
+    return filtered_log_files
+
+
+def _glob_files_in_date_range(base_pattern: str,
+                              start_date: date,
+                              end_date: date) -> list[str]:
+    """
+    Original discovery path: globs everything, then filters by date folder.
+    """
+    all_log_files = glob.glob(base_pattern)
+
+    if not all_log_files:
+        print(f"Warning: glob pattern '{base_pattern}' found 0 files.", file=sys.stderr)
+        return []
+
+    filtered_log_files = []
+
+    for file_path in all_log_files:
+        try:
+            # os.path.dirname(file_path) -> 'Z:/MACHINE/Analysis/2025-10-15/03'
+            # os.path.dirname(...) -> 'Z:/MACHINE/Analysis/2025-10-15'
+            # os.path.basename(...) -> '2025-10-15'
+            date_str = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
+            current_date = date.fromisoformat(date_str)
+
+            if start_date <= current_date <= end_date:
+                filtered_log_files.append(file_path)
+
+        except ValueError:
+            # The folder name isn't a valid date (e.g., 'ABCD-12-34').
+            continue
+
+    return filtered_log_files
@@ -0,0 +1,129 @@
+from log_archive import open_log
+from log_cache import ParseCache, cached_fields
+from log_parsers import FOOTER_MARKER, SKIP_SECTIONS, SectionRun, decode_lines, iter_log_lines, map_file
+from log_timeline import STEP_SEPARATOR, split_step
+
+# ParseCache field holding a file's section index.
+SECTION_INDEX_FIELD = 'section_index'
+
+# Name the footer is indexed under.
+FOOTER_SECTION = FOOTER_MARKER
+
+
+def index_sections(lines) -> list[list]:
+    """
+    Records where each top-level recipe section and the footer sit in a
+    .log file, in one pass.
+
+    A section is a run of consecutive lines logged under the same step right
+    below the top level, e.g. 'TEST_FIXTURE_CHECK'. Lines without a step
+    (wrapped messages, blank lines) belong to the run they follow. Lines
+    logged by the top-level recipe itself are indexed under its own name.
+
+    Args:
+        lines: An iterable of raw byte lines; pass the file opened 'rb'. A
+               SectionRun among them (see log_parsers.iter_log_lines) is
+               counted whole, without splitting its lines.
+
+    Returns:
+        [name, offset, length] spans in file order, in bytes. A section that
+        comes back later in the log gets one span per run. The footer, if
+        any, is the last span, named FOOTER_SECTION, and runs to the end.
+    """
+    footer_marker = FOOTER_MARKER.encode()
+    spans = []
+    # Breadcrumb -> section name
+    names = {}
+    current = None
+    offset = 0
+
+    for line in lines:
+        if isinstance(line, SectionRun):
+            breadcrumb = line.breadcrumb
+            line = line.data
+        else:
+            breadcrumb = None
+
+        if current != FOOTER_SECTION:
+            if breadcrumb is None:
+                fields = line.split(b'\t', 2)
+                if len(fields) == 3:
+                    breadcrumb = fields[1]
+            if breadcrumb is not None:
+                name = names.get(breadcrumb)
+                if name is None:
+                    steps = breadcrumb.decode('utf-8', errors='ignore').split(STEP_SEPARATOR, 2)
+                    name = names[breadcrumb] = split_step(steps[min(1, len(steps) - 1)])[0]
+            elif line.strip() == footer_marker:
+                name = FOOTER_SECTION
+            else:
+                name = current
+
+            if name != current and name is not None:
+                spans.append([name, offset, 0])
+                current = name
+
+        if spans:
+            spans[-1][2] += len(line)
+        offset += len(line)
+
+    return spans
+
+
+def build_section_index(file_path: str) -> list[list]:
+    """
+    Returns the section spans of a .log file in one pass over the mapped
+    file; see index_sections. The SKIP_SECTIONS runs are counted whole.
+    """
+    with map_file(file_path) as data:
+        return index_sections(iter_log_lines(data, SKIP_SECTIONS, raw=True))
+
+
+def read_section_index(file_path: str, cache: ParseCache | None = None) -> list[list]:
+    """
+    Returns the section spans of a .log file from the local cache, building
+    and caching them on the first call or after the file changed.
+
+    Args:
+        file_path: The .log file.
+        cache: The ParseCache holding the index; defaults to the shared one
+               under CACHE_DIR.
+    """
+    if cache is None:
+        cache = ParseCache()
+    fields = cached_fields(cache, file_path, [SECTION_INDEX_FIELD],
+                           lambda path: {SECTION_INDEX_FIELD: build_section_index(path)})
+    return fields[SECTION_INDEX_FIELD]
+
+
+def section_names(spans: list[list]) -> list[str]:
+    """
+    Returns the distinct section names of an index, in file order.
+    """
+    return list(dict.fromkeys(name for name, _, _ in spans))
+
+
+def read_section(file_path: str, name: str, cache: ParseCache | None = None) -> bytes:
+    """
+    Reads the raw bytes of one section, e.g. 'ONEDIAG_BAT_THERMAL_C2C' or
+    FOOTER_SECTION, with one seek per run of the section.
+
+    Returns:
+        The bytes of every run of the section, joined; empty if the log
+        has no such section.
+    """
+    spans = [span for span in read_section_index(file_path, cache) if span[0] == name]
+    chunks = []
+    if spans:
+        with open_log(file_path) as f:
+            for _, offset, length in spans:
+                f.seek(offset)
+                chunks.append(f.read(length))
+    return b''.join(chunks)
+
+
+def read_section_lines(file_path: str, name: str, cache: ParseCache | None = None):
+    """
+    Iterates over the text lines of one section; see read_section.
+    """
+    return decode_lines(read_section(file_path, name, cache))
@@ -0,0 +1,276 @@
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from log_archive import archive_of, read_log_bytes
+
+
+def _parse_one(parse_fn, file_path: str):
+    """
+    Runs parse_fn on one file and never raises, so one bad log can't abort
+    the whole batch. Prints nothing: in a worker that would interleave with
+    the other processes' output.
+
+    Returns:
+        A (rows, error) tuple; error is None on success.
+    """
+    try:
+        return parse_fn(file_path), None
+    except Exception as e:
+        return [], str(e)
+
+
+def _parse_batch(parse_fn, file_paths: list[str]) -> list:
+    return [_parse_one(parse_fn, file_path) for file_path in file_paths]
+
+
+def _worker_batches(file_paths: list[str], chunksize: int) -> list[list[int]]:
+    """
+    Splits the indexes of file_paths into worker tasks: every member of one
+    archive goes into a single task, so only one worker opens (and, for a
+    compressed tar, unpacks) each archive; plain files go in chunks of
+    chunksize. Archive tasks come first, being the largest.
+    """
+    by_archive = {}
+    plain = []
+    for index, file_path in enumerate(file_paths):
+        archive_path = archive_of(file_path)
+        if archive_path is None:
+            plain.append(index)
+        else:
+            by_archive.setdefault(archive_path, []).append(index)
+
+    return list(by_archive.values()) + [plain[i:i + chunksize] for i in range(0, len(plain), chunksize)]
+
+
+def default_chunksize(task_count: int, workers: int) -> int:
+    """
+    Picks a chunk size that gives every worker about four batches.
+    """
+    return max(1, task_count // (workers * 4))
+
+
+def parse_files_parallel(file_paths: list[str], parse_fn, workers: int | None = None,
+                         chunksize: int | None = None) -> list[tuple[list, str | None]]:
+    """
+    Runs a per-file parser over many files in a process pool.
+
+    Results come back in the order of file_paths, so the output is identical
+    to a serial run. parse_fn must be picklable: a module-level function or a
+    functools.partial of one (the scripts' parse_log_file qualifies, as long
+    as main() sits behind the usual `if __name__ == "__main__":` guard).
+
+    Args:
+        file_paths: The files to parse.
+        parse_fn: Callable taking a path and returning a list of rows.
+        workers: Number of processes. None uses every core; 1 runs serially
+                 in this process.
+        chunksize: Plain files handed to a worker per task. None picks one
+                   from the number of files and workers. The members of one
+                   archive always go to a single worker.
+
+    Returns:
+        A list of (rows, error) tuples, one per input file.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(file_paths) < 2:
+        results = []
+        for file_path in file_paths:
+            print(f"Parsing {file_path}...")
+            results.append(_parse_one(parse_fn, file_path))
+        return results
+
+    workers = min(workers, len(file_paths))
+    if chunksize is None:
+        chunksize = default_chunksize(len(file_paths), workers)
+
+    batches = _worker_batches(file_paths, chunksize)
+    results = [None] * len(file_paths)
+
+    print(f"Parsing {len(file_paths)} file(s) with {workers} worker process(es)...")
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_parse_batch, parse_fn, [file_paths[index] for index in batch]): batch
+                   for batch in batches}
+        # Progress is reported here, in the parent, as batches complete
+        for future in as_completed(futures):
+            batch = futures[future]
+            for index, result in zip(batch, future.result()):
+                results[index] = result
+            done += len(batch)
+            print(f"Parsed {done}/{len(file_paths)} file(s)...")
+    return results
+
+
+def imap_ordered(fn, items, workers: int = 8, max_in_flight: int = 32):
+    """
+    Lazily maps fn over items on a thread pool, yielding results in input
+    order.
+
+    At most max_in_flight calls are queued or running at once, so a consumer
+    that reads slowly never lets the pool run far ahead, and one that stops
+    early leaves at most that many calls to finish. Meant for I/O-bound
+    work such as reading footers off the share.
+
+    Args:
+        fn: Callable taking one item.
+        items: Any iterable; it is consumed as results are taken.
+        workers: Threads. 1 maps serially in this thread.
+        max_in_flight: Calls submitted ahead of the consumer.
+    """
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            for item in items:
+                pending.append(pool.submit(fn, item))
+                if len(pending) >= max_in_flight:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+# Marks the end of the row stream for the writer thread.
+_END_OF_ROWS = object()
+
+
+def run_io_pipeline(file_paths: list[str], parse_fn, write_fn=None, readers: int = 8,
+                    max_in_flight: int = 32, write_queue_size: int = 256):
+    """
+    Overlaps share reads with parsing and CSV writing.
+
+    Three stages run at once:
+      * up to `readers` threads fetch whole files from the share,
+      * this thread parses them strictly in file order,
+      * a writer thread hands each file's rows to write_fn.
+
+    At most max_in_flight files are fetched but not yet parsed, and at most
+    write_queue_size row batches wait for the writer. When either limit is hit
+    the stage upstream blocks, so a slow parser or disk never lets memory grow
+    and the file server never sees more than `readers` open files from us.
+
+    Parsing stays in this thread, so parse_fn may update module-level
+    counters such as LBPCB_FAIL_SN.
+
+    Args:
+        file_paths: The files to process, in output order.
+        parse_fn: Callable taking (file_path, data: bytes) and returning rows.
+        write_fn: Callable taking a list of rows (e.g. csv_writer.writerows).
+                  If None, the rows are collected and returned.
+        readers: Concurrent reads against the share.
+        max_in_flight: Files read ahead of the parser.
+        write_queue_size: Row batches buffered ahead of the writer.
+
+    Returns:
+        The collected rows if write_fn is None, otherwise the number of rows
+        written.
+    """
+    slots = threading.Semaphore(max_in_flight)
+    stopped = threading.Event()
+    fetched = queue.Queue()
+    to_write = queue.Queue(maxsize=write_queue_size)
+    collected = []
+    writer_errors = []
+
+    def write_rows():
+        while True:
+            rows = to_write.get()
+            if rows is _END_OF_ROWS:
+                return
+            if writer_errors:
+                continue
+            try:
+                if write_fn is None:
+                    collected.extend(rows)
+                else:
+                    write_fn(rows)
+            except Exception as e:
+                writer_errors.append(e)
+
+    def fetch(index, file_path):
+        try:
+            fetched.put((index, file_path, read_log_bytes(file_path), None))
+        except Exception as e:
+            # Every file must reach the queue, or the parser waits for it forever
+            fetched.put((index, file_path, None, e))
+
+    def submit_reads(pool):
+        for index, file_path in enumerate(file_paths):
+            slots.acquire()
+            if stopped.is_set():
+                return
+            try:
+                pool.submit(fetch, index, file_path)
+            except RuntimeError:
+                # The pool was shut down by a failure in the parsing loop
+                return
+
+    def stop_reads(pool):
+        # Stop submitting and drop the reads still queued, so leaving the
+        # pool only waits for the reads already running
+        stopped.set()
+        slots.release()
+        pool.shutdown(cancel_futures=True)
+
+    writer_thread = threading.Thread(target=write_rows, daemon=True)
+    writer_thread.start()
+    row_count = 0
+
+    try:
+        with ThreadPoolExecutor(max_workers=readers) as pool:
+            producer = threading.Thread(target=submit_reads, args=(pool,), daemon=True)
+            producer.start()
+
+            try:
+                # Files arrive in any order; park them until their turn comes.
+                waiting = {}
+                for next_index in range(len(file_paths)):
+                    if writer_errors:
+                        # Nothing more can be written; don't read the rest
+                        stop_reads(pool)
+                        break
+
+                    while next_index not in waiting:
+                        index, file_path, data, error = fetched.get()
+                        waiting[index] = (file_path, data, error)
+
+                    file_path, data, error = waiting.pop(next_index)
+                    slots.release()
+
+                    if error is not None:
+                        print(f"Error reading file {file_path}: {error}")
+                        continue
+
+                    print(f"Parsing {file_path}...")
+                    try:
+                        rows = parse_fn(file_path, data)
+                    except Exception as e:
+                        print(f"Error processing file {file_path}: {e}")
+                        continue
+
+                    if rows:
+                        row_count += len(rows)
+                        to_write.put(rows)
+            except BaseException:
+                stop_reads(pool)
+                raise
+            finally:
+                producer.join()
+    finally:
+        to_write.put(_END_OF_ROWS)
+        writer_thread.join()
+
+    if writer_errors:
+        raise writer_errors[0]
+
+    return collected if write_fn is None else row_count
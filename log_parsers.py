@@ -0,0 +1,814 @@
+import io
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+
+from log_archive import is_archived, log_exists, open_log, open_log_text, read_log_bytes
+
+# Bump when a change to these parsers, or to a script's parse function,
+# alters the rows they return; rows cached by an older version are rebuilt.
+PARSER_VERSION = 1
+
+# Marker line that opens the footer at the end of every .log file.
+FOOTER_MARKER = "Factory Information"
+FOOTER_END_MARKER = "****END****"
+
+# Footer fields the analysis scripts report on, in the order they print them.
+FOOTER_KEYS = [
+    "BrdSN",
+    "TRAY_SN",
+    "FLAT ID",
+    "FOX_Routing",
+    "Error Code",
+    "PN",
+    "DiagVer",
+    "StartTestTime",
+    "EndTestTime",
+]
+
+
+def decode_lines(data: bytes):
+    """
+    Iterates over raw file bytes line by line, exactly like iterating over
+    open(path, 'r', encoding='utf-8', errors='ignore').
+    """
+    return io.TextIOWrapper(io.BytesIO(data), encoding='utf-8', errors='ignore')
+
+
+# Recipe sections whose body lines readers may step over in bulk, written
+# like the Step_Path column of the step timeline. The DUT boot UART capture
+# is about two thirds of the lines of an FCT log.
+SKIP_SECTIONS = ("Top Level > DUT_BOOT_UP_1 > DUT_BOOT_UP_MONITOR",)
+
+
+@dataclass
+class SectionRun:
+    """
+    A run of consecutive lines logged under a skipped section or its
+    sub-steps, handed over whole by iter_log_lines instead of line by line.
+    """
+    breadcrumb: bytes   # The section's step path as logged, recipes included
+    data: bytes         # The raw lines of the run
+
+    def line_count(self) -> int:
+        return self.data.count(b"\n") + (not self.data.endswith(b"\n"))
+
+    def first_line(self) -> bytes:
+        return self.data[:self.data.find(b"\n") + 1 or len(self.data)]
+
+    def last_line(self) -> bytes:
+        end = len(self.data) - self.data.endswith(b"\n")
+        return self.data[self.data.rfind(b"\n", 0, end) + 1:]
+
+
+@lru_cache(maxsize=None)
+def _section_patterns(sections: tuple) -> tuple:
+    """
+    Compiles, for step paths like 'A > B', a search pattern for the last
+    step name and a pattern matching a body line logged under any of the
+    paths, whose group 1 is the section's exact breadcrumb.
+    Each step may carry its ' (RECIPE)' suffix.
+    """
+    names = []
+    paths = []
+    for section in sections:
+        steps = [step.encode() for step in section.split(" > ")]
+        names.append(re.escape(b" > " + steps[-1]))
+        paths.append(b" > ".join(re.escape(step) + rb"(?: \([^()\t\n]*\))?" for step in steps))
+
+    needle = re.compile(b"|".join(names))
+    section_line = re.compile(rb"[^\t\n]*\t(" + b"|".join(paths) + rb")(?: > |\t)")
+    return needle, section_line
+
+
+@lru_cache(maxsize=None)
+def _run_line_pattern(breadcrumb: bytes):
+    """
+    Matches a newline and the start of the line after it, if that line is
+    logged under breadcrumb or one of its sub-steps: any timestamp, then
+    the breadcrumb right after the line's first tab.
+    """
+    return re.compile(rb"\n[^\t\n]*\t" + re.escape(breadcrumb) + rb"(?:\t| > )")
+
+
+def _section_run_end(data, start: int, breadcrumb: bytes) -> int:
+    """
+    Returns the offset just past the run of lines, from start on, that are
+    logged under breadcrumb or one of its sub-steps.
+
+    The run is checked in 64 KiB chunks by comparing how many lines a chunk
+    has with how many of them start with the breadcrumb, both counted in C.
+    Only line starts count: a UART line that lost its newline carries the
+    breadcrumb twice and must not make up for a line outside the section.
+    The chunk is halved near the end of the run, and only the line where
+    the run ends is looked at on its own.
+    """
+    own_lines = b"\t" + breadcrumb + b"\t"
+    sub_steps = b"\t" + breadcrumb + b" > "
+    run_line = _run_line_pattern(breadcrumb)
+    size = len(data)
+    end = start
+    step = 1 << 16
+
+    while step >= 1024 and end < size:
+        stop = data.find(b"\n", min(end + step, size - 1))
+        stop = size if stop < 0 else stop + 1
+        # Sliced, as an mmap has no count()
+        lines = data[end:stop].count(b"\n") + (data[stop - 1:stop] != b"\n")
+        # Each match starts at the newline before its line, so a run that
+        # starts the data has its first line counted by hand
+        found = len(run_line.findall(data, end - 1, stop)) if end else 1 + len(run_line.findall(data, 0, stop))
+        if found == lines:
+            end = stop
+        else:
+            step //= 2
+
+    while end < size:
+        stop = data.find(b"\n", end)
+        stop = size if stop < 0 else stop + 1
+        tab = data.find(b"\t", end, stop)
+        # Sliced, as an mmap has no startswith()
+        if tab < 0 or (data[tab:tab + len(own_lines)] != own_lines
+                       and data[tab:tab + len(sub_steps)] != sub_steps):
+            break
+        end = stop
+    return end
+
+
+def _raw_lines(data):
+    """
+    Splits raw bytes at newlines only, like iterating over a file opened
+    'rb'.
+    """
+    return io.BytesIO(data)
+
+
+def iter_log_lines(data, skip_sections=SKIP_SECTIONS, raw: bool = False):
+    """
+    Iterates over the lines of raw .log bytes like decode_lines, but hands
+    over the body lines of the given recipe sections as one SectionRun per
+    run, without decoding or splitting them.
+
+    Each skipped section is found with a byte search for its step name and
+    stepped over in bulk (see _section_run_end).
+
+    Args:
+        data: The file contents, e.g. from map_file.
+        skip_sections: Step paths to step over, e.g. 'Top Level >
+                       DUT_BOOT_UP_1'; sub-steps go with them. Empty yields
+                       every line.
+        raw: Yield the other lines as bytes, like a file opened 'rb',
+             instead of decoding them.
+
+    Yields:
+        The lines as str (or bytes), and a SectionRun in place of each run
+        of skipped lines, in file order.
+    """
+    split = _raw_lines if raw else decode_lines
+    if not skip_sections:
+        yield from split(data)
+        return
+
+    needle, section_line = _section_patterns(tuple(skip_sections))
+    emit_from = 0
+    search_from = 0
+    while True:
+        hit = needle.search(data, search_from)
+        if hit is None:
+            break
+        line_start = data.rfind(b"\n", 0, hit.start()) + 1
+        match = section_line.match(data, line_start)
+        if match is None:
+            # The step name turned up somewhere else, e.g. in a message
+            search_from = hit.end()
+            continue
+        if line_start > emit_from:
+            yield from split(data[emit_from:line_start])
+        run_end = _section_run_end(data, line_start, match.group(1))
+        yield SectionRun(match.group(1), data[line_start:run_end])
+        emit_from = search_from = run_end
+
+    yield from split(data[emit_from:])
+
+
+@contextmanager
+def map_file(file_path: str):
+    """
+    Maps a file read-only into memory for bytes-level scanning, so markers
+    are found with bytes.find and only the lines around them are copied and
+    decoded. The pages stay with the OS; nothing is read until touched.
+
+    Yields:
+        An mmap (b'' for an empty file, which can't be mapped). It supports
+        find, rfind and slicing like bytes and is closed on exit. Files read
+        out of an archive come as bytes instead.
+    """
+    if is_archived(file_path):
+        yield read_log_bytes(file_path)
+        return
+
+    with open(file_path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b""
+            return
+        with data:
+            yield data
+
+
+def parse_footer_lines(lines) -> dict:
+    """
+    Extracts every field of the "Factory Information" footer in one pass.
+
+    Inside the footer each 'Key:Value' line is taken as-is. For logs whose
+    footer is missing or truncated, any FOOTER_KEYS still unset fall back to
+    the first body line containing 'Key:', which is what the old per-key scan
+    returned.
+
+    Args:
+        lines: An iterable of text lines (a file object or a list).
+
+    Returns:
+        A dictionary of footer field -> value. Empty values are left out.
+    """
+    footer = {}
+    fallback = {}
+    in_footer = False
+    search_keys = [(key, key + ":") for key in FOOTER_KEYS]
+
+    for line in lines:
+        if in_footer:
+            stripped = line.strip()
+            if stripped == FOOTER_END_MARKER:
+                break
+            key, sep, value = stripped.partition(":")
+            if sep and value.strip() and key not in footer:
+                footer[key] = value.strip()
+            continue
+
+        if line.startswith(FOOTER_MARKER):
+            in_footer = True
+            continue
+
+        if len(fallback) < len(search_keys):
+            for key, search_key in search_keys:
+                if key not in fallback and search_key in line:
+                    value = line.split(search_key, 1)[1].strip()
+                    if value:
+                        fallback[key] = value
+
+    for key, value in fallback.items():
+        footer.setdefault(key, value)
+
+    return footer
+
+
+def parse_footer_bytes(data) -> dict:
+    """
+    Same result as parse_footer_lines over the whole file, for raw contents
+    (bytes or an mmap): the footer and each fallback 'Key:' are located with
+    bytes.find and only those lines are decoded.
+    """
+    marker = FOOTER_MARKER.encode()
+    if data[:len(marker)] == marker:
+        body_end = 0
+    else:
+        body_end = data.find(b"\n" + marker)
+        body_end = len(data) if body_end < 0 else body_end + 1
+
+    footer = {}
+    if body_end < len(data):
+        footer_text = data[body_end:].decode('utf-8', errors='ignore')
+        footer = parse_footer_lines(footer_text.splitlines())
+
+    for key in FOOTER_KEYS:
+        if key in footer:
+            continue
+        search_key = (key + ":").encode()
+        position = data.find(search_key, 0, body_end)
+        while position >= 0:
+            start, end = _line_bounds(data, position)
+            line = data[start:end].decode('utf-8', errors='ignore')
+            value = line.split(key + ":", 1)[1].strip()
+            if value:
+                footer[key] = value
+                break
+            position = data.find(search_key, end, body_end)
+
+    return footer
+
+
+def read_footer_tail(file_path: str, block_size: int = 4096, max_tail_bytes: int = 256 * 1024) -> dict | None:
+    """
+    Reads the footer by seeking to the end of the file and stepping
+    backwards in small blocks until the "Factory Information" line shows up.
+
+    Args:
+        file_path: The full path to the .log file.
+        block_size: Bytes read per step.
+        max_tail_bytes: Give up after this many bytes from the end.
+
+    Returns:
+        A dictionary of footer field -> value, or None if the marker was not
+        found in the tail.
+    """
+    marker = b"\n" + FOOTER_MARKER.encode('ascii')
+
+    with open_log(file_path) as f:
+        f.seek(0, os.SEEK_END)
+        file_size = f.tell()
+        tail = b""
+        position = file_size
+
+        while position > 0 and len(tail) < max_tail_bytes:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+
+            index = tail.rfind(marker)
+            if index != -1:
+                footer_bytes = tail[index + 1:]
+                break
+            if position == 0 and tail.startswith(marker[1:]):
+                footer_bytes = tail
+                break
+        else:
+            return None
+
+    text = footer_bytes.decode('utf-8', errors='ignore')
+    return parse_footer_lines(text.splitlines())
+
+
+def parse_log_footer(data, max_tail_bytes: int = 256 * 1024) -> dict:
+    """
+    Same result as read_footer, for contents already in memory (bytes or an
+    mmap): the footer is looked up in the last max_tail_bytes first and the
+    whole body is searched only if it isn't there.
+    """
+    marker = b"\n" + FOOTER_MARKER.encode('ascii')
+    tail_start = max(0, len(data) - max_tail_bytes)
+    index = data.rfind(marker, tail_start)
+    if index != -1:
+        footer_bytes = data[index + 1:]
+    elif tail_start == 0 and data[:len(marker) - 1] == marker[1:]:
+        footer_bytes = data
+    else:
+        return parse_footer_bytes(data)
+
+    text = footer_bytes.decode('utf-8', errors='ignore')
+    return parse_footer_lines(text.splitlines())
+
+
+def read_footer(file_path: str, strict: bool = False) -> dict:
+    """
+    Returns the footer fields of a .log file.
+
+    Only the last few KB are read when the footer is where it should be;
+    otherwise the mapped file is searched for the footer keys.
+
+    Args:
+        file_path: The full path to the .log file.
+        strict: Raise read errors (a missing file included) instead of
+                printing them, so the caller can tell them from a log
+                without a footer.
+
+    Returns:
+        A dictionary of footer field -> value, empty if the file can't be read.
+    """
+    if not strict and not log_exists(file_path):
+        print(f"Error: File '{file_path}' not found.")
+        return {}
+
+    try:
+        footer = read_footer_tail(file_path)
+        if footer is not None:
+            return footer
+
+        with map_file(file_path) as data:
+            return parse_footer_bytes(data)
+    except Exception as e:
+        if strict:
+            raise
+        print(f"An error occurred while reading the file: {e}")
+
+    return {}
+
+
+# Line fragments the body scanner keys on.
+FRU_DESCRIPTION = "FRU Device Description"
+FRU_BOARD_SERIAL = "Board Serial Number"
+DIAG_HEADER_KEYS = ("Exit Code", "Component Id")
+
+# Columns of a ONEDIAG result table, in order.
+DIAG_COLUMNS = ("Exit Code", "Virtual Id", "Test", "Subtest", "Component", "Component Id", "Notes")
+
+# FRU devices whose board serials the scripts report on.
+FRU_DEVICES = ("ProcMod_0", "CBC_0", "CBC_1")
+
+# Lines between a FRU description and its "Board Serial Number" line.
+_FRU_SERIAL_OFFSET = 2
+
+
+@dataclass(frozen=True)
+class DiagResult:
+    """
+    One row of a ONEDIAG result table, e.g.
+    'MODS-000000000140 | BoardTestBAT | custommods | | GPU, Nvswitch |
+     GPU0_0008:06:00.0, Nvlink 13, Lane 0, raw_lane_ber | Found 8e-07, ...'.
+    """
+    exit_code: str
+    virtual_id: str
+    test: str
+    subtest: str
+    component: str
+    component_id: str
+    notes: str
+
+    @property
+    def passed(self) -> bool:
+        # 'MODS-000000000000' and friends: every digit of the code is zero
+        return not self.exit_code.rpartition('-')[2].strip('0')
+
+    @property
+    def failed(self) -> bool:
+        return not self.passed
+
+    @classmethod
+    def from_dict(cls, row: dict) -> 'DiagResult':
+        """
+        Rebuilds a DiagResult from a dict holding its fields (e.g. a cached
+        CSV row written with dataclasses.asdict); other keys are ignored.
+        """
+        return cls(*(row[name] for name in cls.__dataclass_fields__))
+
+
+def parse_diag_row(message: str) -> DiagResult | None:
+    """
+    Splits one result-table row on '|' into a DiagResult.
+
+    Notes may themselves contain '|', so only the first six separators split.
+
+    Returns:
+        A DiagResult, or None if the line has too few columns.
+    """
+    cells = message.split("|", len(DIAG_COLUMNS) - 1)
+    if len(cells) != len(DIAG_COLUMNS):
+        return None
+    return DiagResult(*(cell.strip() for cell in cells))
+
+
+# 'Found 8e-07, exceeded threshold 5e-07' in the Notes of a lane BER row.
+_BER_NOTES = re.compile(r"Found\s+([-+0-9.eE]+).*?threshold\s+([-+0-9.eE]+)")
+_NVLINK_ID = re.compile(r"Nvlink\s+(\d+)")
+_LANE_ID = re.compile(r"Lane\s+(\d+)")
+
+
+@dataclass(frozen=True)
+class LaneBer:
+    """
+    Measured and limit BER of one lane, from a result row such as
+    'GPU0_0008:06:00.0, Nvlink 13, Lane 0, raw_lane_ber | Found 8e-07,
+    exceeded threshold 5e-07'.
+    """
+    gpu: str
+    nvlink: int
+    lane: int
+    metric: str
+    measured: float
+    threshold: float
+
+    @property
+    def margin(self) -> float:
+        """
+        Headroom below the threshold; negative when the lane exceeded it.
+        """
+        return self.threshold - self.measured
+
+
+def parse_lane_ber(result: DiagResult) -> LaneBer | None:
+    """
+    Pulls GPU, Nvlink, Lane and the measured/threshold BER out of a result
+    row as numbers.
+
+    Returns:
+        A LaneBer, or None if the row is not a lane BER measurement.
+    """
+    notes_match = _BER_NOTES.search(result.notes)
+    nvlink_match = _NVLINK_ID.search(result.component_id)
+    lane_match = _LANE_ID.search(result.component_id)
+    if not (notes_match and nvlink_match and lane_match):
+        return None
+
+    try:
+        measured = float(notes_match.group(1).rstrip(".,"))
+        threshold = float(notes_match.group(2).rstrip(".,"))
+    except ValueError:
+        return None
+
+    # 'GPU0_0008:06:00.0, Nvlink 13, Lane 0, raw_lane_ber'
+    parts = [part.strip() for part in result.component_id.split(",")]
+    metric = parts[-1] if len(parts) > 3 else ""
+
+    return LaneBer(parts[0], int(nvlink_match.group(1)), int(lane_match.group(1)),
+                   metric, measured, threshold)
+
+
+def log_message(line: str) -> str:
+    """
+    Returns the message part of a body line ('timestamp<TAB>step<TAB>message'),
+    or the whole line, without its newline, if it has no such prefix.
+    """
+    return line.rstrip("\r\n").split("\t", 2)[-1]
+
+
+def _line_bounds(data, position: int) -> tuple[int, int]:
+    """
+    Returns the (start, end) offsets of the line holding position, without
+    its newline.
+    """
+    start = data.rfind(b"\n", 0, position) + 1
+    end = data.find(b"\n", position)
+    return start, len(data) if end < 0 else end
+
+
+def scan_fru_and_diag_bytes(data, devices=FRU_DEVICES):
+    """
+    Walks a log once and emits FRU serials and ONEDIAG result rows as they
+    go past, finding each marker with bytes.find on the raw file contents.
+
+    A FRU serial is taken from the "Board Serial Number" line two lines
+    below the "FRU Device Description" line naming the device. Every row of
+    every "Exit Code | ... | Notes" table is emitted, OK rows included.
+    Only the lines holding a marker, the serial lines below FRU descriptions
+    and the rows of result tables are decoded; the rest of the log (binary
+    UART output included) is never turned into str.
+
+    Args:
+        data: The file contents as bytes or an mmap; see map_file.
+        devices: FRU device names to report serials for.
+
+    Yields:
+        ('fru', device, serial) and ('diag', DiagResult) tuples, in file
+        order.
+    """
+    fru_marker = FRU_DESCRIPTION.encode()
+    serial_marker = FRU_BOARD_SERIAL.encode()
+    header_first, header_second = (key.encode() for key in DIAG_HEADER_KEYS)
+    device_markers = [(device, device.encode()) for device in devices]
+    size = len(data)
+
+    fru_at = data.find(fru_marker) if device_markers else -1
+    header_at = data.find(header_first)
+
+    while fru_at >= 0 or header_at >= 0:
+        if header_at < 0 or 0 <= fru_at < header_at:
+            start, end = _line_bounds(data, fru_at)
+            line = data[start:end]
+            device = next((name for name, marker in device_markers if marker in line), None)
+            if device is not None and end < size:
+                # The serial is two lines below the description
+                _, skipped_end = _line_bounds(data, end + 1)
+                if skipped_end < size:
+                    serial_start, serial_end = _line_bounds(data, skipped_end + 1)
+                    serial_line = data[serial_start:serial_end]
+                    if serial_marker in serial_line:
+                        yield 'fru', device, serial_line.decode('utf-8', errors='ignore').split()[-1]
+            fru_at = data.find(fru_marker, end)
+            continue
+
+        start, end = _line_bounds(data, header_at)
+        position = end + 1
+        if header_second in data[start:end]:
+            while position < size:
+                _, row_end = _line_bounds(data, position)
+                message = log_message(data[position:row_end].decode('utf-8', errors='ignore'))
+                if not message.startswith("="):
+                    result = parse_diag_row(message)
+                    if result is None:
+                        # This line may open the next table
+                        break
+                    yield 'diag', result
+                position = row_end + 1
+        header_at = data.find(header_first, min(position, size))
+
+
+def parse_fru_and_diag_bytes(data, devices=FRU_DEVICES) -> tuple[dict, list[DiagResult]]:
+    """
+    Collects what scan_fru_and_diag_bytes emits for one log.
+
+    Args:
+        data: The file contents as bytes or an mmap; see map_file.
+        devices: FRU device names to report serials for.
+
+    Returns:
+        A (fru_serials, diag_results) tuple: device -> serial (the last dump
+        in the log wins) and every result row, in file order.
+    """
+    fru_serials = {}
+    diag_rows = []
+
+    for event in scan_fru_and_diag_bytes(data, devices):
+        if event[0] == 'fru':
+            fru_serials[event[1]] = event[2]
+        else:
+            diag_rows.append(event[1])
+
+    return fru_serials, diag_rows
+
+
+def read_fru_and_diag(file_path: str, devices=FRU_DEVICES) -> tuple[dict, list[DiagResult]]:
+    """
+    Returns the FRU serials and ONEDIAG result rows of a .log file, scanned
+    through a read-only mmap; see parse_fru_and_diag_bytes.
+    """
+    with map_file(file_path) as data:
+        return parse_fru_and_diag_bytes(data, devices)
+
+
+def read_diag_results(file_path: str) -> list[DiagResult]:
+    """
+    Returns every ONEDIAG result row of a .log file; see read_fru_and_diag.
+    """
+    return read_fru_and_diag(file_path, devices=())[1]
+
+
+def diag_result_matches(result: DiagResult, exit_codes=None, failed_only: bool = False) -> bool:
+    """
+    Checks one result row against an exit-code filter.
+
+    Args:
+        result: The DiagResult to check.
+        exit_codes: A code ('MODS-000000000140') or a collection of codes.
+                    None accepts every code.
+        failed_only: Reject the OK rows.
+
+    Returns:
+        True if the row passes the filter.
+    """
+    if failed_only and result.passed:
+        return False
+    if exit_codes is None:
+        return True
+    if isinstance(exit_codes, str):
+        return result.exit_code == exit_codes
+    return result.exit_code in exit_codes
+
+
+def filter_diag_results(results, exit_codes=None, failed_only: bool = False) -> list[DiagResult]:
+    """
+    Picks result rows by exit code; see diag_result_matches.
+
+    Returns:
+        The matching rows, in their original order.
+    """
+    return [result for result in results if diag_result_matches(result, exit_codes, failed_only)]
+
+
+# Keyword names accepted by footer_matches and the footer field each one checks.
+FOOTER_FILTER_FIELDS = {
+    'error_code': "Error Code",
+    'routing': "FOX_Routing",
+    'station': "Routing",
+    'pn': "PN",
+    'diag': "DiagVer",
+    'board_sn': "BrdSN",
+    'tray_sn': "TRAY_SN",
+    'flat_id': "FLAT ID",
+}
+
+
+def footer_matches(footer: dict, **filters) -> bool:
+    """
+    Checks footer fields against simple predicates.
+
+    Each filter value may be a string (exact match), a list/tuple/set
+    (membership) or a callable taking the field value. None means no filter.
+
+    Example:
+        footer_matches(footer, error_code='E028163006_000-001-1-0-008-00-546-284',
+                       routing='FUNCTIONAL_TEST')
+
+    Returns:
+        True if every given filter accepts the footer.
+    """
+    for name, expected in filters.items():
+        if expected is None:
+            continue
+        value = footer.get(FOOTER_FILTER_FIELDS[name])
+
+        if callable(expected):
+            if not expected(value):
+                return False
+        elif isinstance(expected, (list, tuple, set, frozenset)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+
+    return True
+
+
+def read_footer_if(file_path: str, **filters) -> dict | None:
+    """
+    Reads only the footer and applies the filters to it before any body parse.
+
+    Returns:
+        The footer if it passes every filter, otherwise None.
+    """
+    footer = read_footer(file_path)
+    if not footer or not footer_matches(footer, **filters):
+        return None
+    return footer
+
+
+def print_footer(footer: dict) -> None:
+    """
+    Prints the footer fields the way the scripts always have.
+    """
+    for key in FOOTER_KEYS:
+        value = footer.get(key)
+        if value:
+            print(f"Extracted {key}: {value}")
+        else:
+            print(f"{key} key not found in the file.")
+
+
+# Returned for keys missing from a .txt summary, as the scripts always have.
+VALUE_NOT_FOUND = "Value not found"
+
+
+def parse_txt_values(lines, keys=None) -> dict:
+    """
+    Builds the key -> value map of a .txt summary file in one pass.
+
+    Each 'KEY = value' line is split on the first '='. The first occurrence
+    of a key wins, matching get_value_from_log.
+
+    Args:
+        lines: An iterable of text lines (a file object or a list).
+        keys: Optional keys of interest. When given, only those are kept and
+              the scan stops as soon as all of them have been seen.
+
+    Returns:
+        A dictionary of key -> value for the keys that were found.
+    """
+    values = {}
+    wanted = set(keys) if keys is not None else None
+    remaining = len(wanted) if wanted is not None else -1
+
+    for line in lines:
+        found_key, sep, value = line.partition('=')
+        if not sep:
+            continue
+        found_key = found_key.strip()
+        if found_key in values:
+            continue
+        if wanted is not None:
+            if found_key not in wanted:
+                continue
+            remaining -= 1
+        values[found_key] = value.strip()
+        if remaining == 0:
+            break
+
+    return values
+
+
+def parse_txt_bytes(data, keys=None) -> dict:
+    """
+    Same result as read_txt_values, for the contents of a .txt summary file
+    already in memory.
+    """
+    lines = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8', errors='strict')
+    values = parse_txt_values(lines, keys)
+
+    for key in keys or ():
+        values.setdefault(key, VALUE_NOT_FOUND)
+
+    return values
+
+
+def read_txt_values(file_path: str, keys=None) -> dict:
+    """
+    Reads a .txt summary file once, line by line, and returns its values.
+
+    Args:
+        file_path: The full path to the .txt file.
+        keys: Optional keys of interest; see parse_txt_values. Keys that are
+              not in the file map to VALUE_NOT_FOUND.
+
+    Returns:
+        A dictionary of key -> value.
+    """
+    with open_log_text(file_path, errors='strict') as f:
+        values = parse_txt_values(f, keys)
+
+    for key in keys or ():
+        values.setdefault(key, VALUE_NOT_FOUND)
+
+    return values
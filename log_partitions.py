@@ -0,0 +1,209 @@
+import csv
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from log_archive import log_identity
+from log_cache import CACHE_DIR, write_json_atomic
+from log_reports import CsvReport, Report
+
+# Local folder for the per-hour result partitions. Never put it on the share.
+PARTITIONS_DIR = os.path.join(CACHE_DIR, 'partitions')
+
+# An hour folder is finalised once its hour is over and none of its files
+# changed for this long; after that it is neither stat'ed nor parsed again.
+SETTLE_SECONDS = 2 * 3600
+
+
+def hour_partition(file_path: str) -> str | None:
+    """
+    Returns the 'YYYY-MM-DD/HH' partition a file belongs to, taken from the
+    date and hour folders it sits in, or None outside that layout.
+    """
+    hour_dir = os.path.dirname(file_path)
+    hour = os.path.basename(hour_dir)
+    date_name = os.path.basename(os.path.dirname(hour_dir))
+    if len(hour) != 2 or not hour.isdigit():
+        return None
+    try:
+        date.fromisoformat(date_name)
+    except ValueError:
+        return None
+    return date_name + '/' + hour
+
+
+def partition_end(partition: str) -> datetime:
+    """
+    Returns the end of a partition's hour, in the share's local time.
+    """
+    date_name, hour = partition.split('/')
+    return datetime.fromisoformat(date_name) + timedelta(hours=int(hour) + 1)
+
+
+class PartitionedReport(Report):
+    """
+    Builds a CsvReport's output from stored per-hour partitions, so
+    overlapping windows don't parse the same logs again.
+
+    Each 'YYYY-MM-DD/HH' folder's rows are kept as one small CSV under
+    PARTITIONS_DIR/<key>, next to a manifest of the files that produced
+    them. A partition whose files, and whose report schema (see
+    CsvReport.schema), are unchanged is reused without parsing; once it is
+    final (see SETTLE_SECONDS) its files aren't even stat'ed.
+    The window's output is then the stored partitions concatenated, in
+    file order, and is identical to a full rebuild.
+
+    Files outside the date/hour layout are parsed on every run.
+    """
+
+    def __init__(self, report: CsvReport, key: str, partitions_dir: str = PARTITIONS_DIR,
+                 settle_seconds: float = SETTLE_SECONDS):
+        """
+        Args:
+            report: The report to build, such as a script's make_report().
+                    Its output file is rewritten for every window.
+            key: Names this report's partitions; use one that doesn't change
+                 with the window, such as the script name.
+            partitions_dir: Local folder holding every report's partitions.
+            settle_seconds: See SETTLE_SECONDS.
+        """
+        self.report = report
+        self.name = report.name
+        self.partition_dir = os.path.join(partitions_dir, key)
+        self.settle_seconds = settle_seconds
+        self._partitions = {}
+        self._open = {}
+        self._to_parse = set()
+        self._rows = {}
+        self._parsed = {}
+
+    def _paths(self, partition: str) -> tuple[str, str]:
+        date_name, hour = partition.split('/')
+        base = os.path.join(self.partition_dir, date_name, hour)
+        return base + '.csv', base + '.json'
+
+    def _load_manifest(self, partition: str) -> dict | None:
+        manifest_path = self._paths(partition)[1]
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not read partition manifest '{manifest_path}': {e}", file=sys.stderr)
+            return None
+        if manifest.get('schema') != self.report.schema:
+            return None
+        return manifest
+
+    def _settled(self, partition: str, files: dict, now: float) -> bool:
+        if any(identity is None for identity in files.values()):
+            return False
+        newest = max((identity[1] for identity in files.values()), default=0) / 1e9
+        return max(partition_end(partition).timestamp(), newest) + self.settle_seconds <= now
+
+    def prepare(self, file_paths: list[str]) -> None:
+        """
+        Sorts the report's files into partitions and decides which of them
+        are open, i.e. new, changed or never stored, and must be parsed.
+        """
+        self._partitions = {}
+        self._open = {}
+        self._to_parse = set()
+        self._rows = {}
+        self._parsed = {}
+        for file_path in file_paths:
+            if self.report.wants(file_path):
+                self._partitions.setdefault(hour_partition(file_path), []).append(file_path)
+
+        now = time.time()
+        for partition, partition_files in self._partitions.items():
+            if partition is None:
+                self._to_parse.update(partition_files)
+                continue
+
+            manifest = self._load_manifest(partition)
+            names = sorted(os.path.basename(file_path) for file_path in partition_files)
+            if manifest and manifest.get('final') and sorted(manifest.get('files', {})) == names:
+                continue
+
+            files = {}
+            for file_path in partition_files:
+                identity = log_identity(file_path)
+                files[os.path.basename(file_path)] = list(identity) if identity else None
+            settled = self._settled(partition, files, now)
+
+            if manifest and manifest.get('files') == files:
+                if settled and not manifest.get('final'):
+                    manifest['final'] = True
+                    write_json_atomic(self._paths(partition)[1], manifest)
+                continue
+
+            self._open[partition] = {'schema': self.report.schema, 'files': files, 'final': settled}
+            self._to_parse.update(partition_files)
+
+    def wants(self, file_path: str) -> bool:
+        return file_path in self._to_parse
+
+    def extract(self, file_path: str, data: bytes) -> list:
+        # One batch per file, even without rows, so add() can tell when a
+        # partition has been parsed completely
+        return [(hour_partition(file_path), self.report.extract(file_path, data))]
+
+    def add(self, rows: list) -> None:
+        for partition, partition_rows in rows:
+            self._rows.setdefault(partition, []).extend(partition_rows)
+            self._parsed[partition] = self._parsed.get(partition, 0) + 1
+
+    def _store_partition(self, partition: str, rows: list) -> None:
+        """
+        Writes one partition's rows, then its manifest, so a partition is
+        only ever reused with all of its rows.
+        """
+        csv_path, manifest_path = self._paths(partition)
+        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        tmp_path = csv_path + '.tmp'
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(self.report.fieldnames)
+            for row in rows:
+                if isinstance(row, dict):
+                    row = [row.get(name) for name in self.report.fieldnames]
+                writer.writerow(row)
+        os.replace(tmp_path, csv_path)
+        write_json_atomic(manifest_path, self._open[partition])
+
+    def _stored_rows(self, partition: str) -> list:
+        with open(self._paths(partition)[0], 'r', newline='', encoding='utf-8') as csvfile:
+            reader = csv.reader(csvfile)
+            next(reader, None)
+            return list(reader)
+
+    def finish(self) -> None:
+        """
+        Stores every open partition that was parsed completely, then writes
+        the window's output from all of its partitions. Partitions left
+        incomplete by an error stay open and are parsed again next run.
+        """
+        stored = 0
+        for partition, manifest in self._open.items():
+            if self._parsed.get(partition, 0) == len(self._partitions[partition]):
+                self._store_partition(partition, self._rows.get(partition, []))
+                stored += 1
+
+        self.report.begin()
+        try:
+            for partition in self._partitions:
+                if partition is None or partition in self._open:
+                    rows = self._rows.get(partition, [])
+                else:
+                    rows = self._stored_rows(partition)
+                if rows:
+                    self.report.add(rows)
+        finally:
+            self.report.finish()
+
+        reused = sum(1 for partition in self._partitions if partition is not None and partition not in self._open)
+        print(f"{self.name}: reused {reused} stored partition(s), parsed and stored {stored} open one(s).")
@@ -0,0 +1,325 @@
+import copy
+import csv
+import os
+from dataclasses import asdict
+from datetime import date, datetime
+
+from log_discovery import (DATE_DIR_GLOB, filter_log_names, get_log_files_in_date_range,
+                           get_log_files_in_time_range, last_hours, list_date_dirs, parse_log_name)
+from log_parallel import imap_ordered
+from log_parsers import (FOOTER_FILTER_FIELDS, DiagResult, filter_diag_results, footer_matches, map_file,
+                         parse_fru_and_diag_bytes, parse_log_footer, read_footer)
+
+# Footer columns, named like the CSV columns of the EC scripts -> footer field.
+FOOTER_COLUMNS = {
+    'SN': "BrdSN",
+    'Tray_SN': "TRAY_SN",
+    'POD_Rack_Slot': "FLAT ID",
+    'FOX_Routing': "FOX_Routing",
+    'Error_Code': "Error Code",
+    'PN': "PN",
+    'Diag': "DiagVer",
+    'StartTestTime': "StartTestTime",
+    'EndTestTime': "EndTestTime",
+}
+
+# FRU columns -> the FRU device whose board serial they hold.
+FRU_COLUMNS = {
+    'ProcMod_0_SN': "ProcMod_0",
+    'NVL0_SN': "CBC_0",
+    'NVL1_SN': "CBC_1",
+}
+
+# Columns known from the path alone.
+NAME_COLUMNS = ('file_path', 'log_file_name', 'Station', 'Result', 'Timestamp')
+
+# One row per ONEDIAG result when any of these is selected.
+DIAG_RESULT_COLUMNS = tuple(DiagResult.__dataclass_fields__)
+
+# Columns returned when select() is not called.
+DEFAULT_COLUMNS = ('log_file_name', 'Station', 'Result') + tuple(FOOTER_COLUMNS)
+
+# where() filters answered from the ONEDIAG result tables in the body.
+BODY_FILTERS = ('exit_code', 'failed_only')
+
+
+class LogSet:
+    """
+    A lazy, chainable query over the logs of one share.
+
+    Every method returns a new LogSet; nothing is listed or read until the
+    results are iterated. Each predicate runs at the cheapest layer that can
+    answer it:
+
+      * directory: between()/last_hours() only list the date/hour folders
+        in the window,
+      * file name: station()/failed()/passed()/sn()/pn() decode the name,
+        without opening the file,
+      * footer: where(error_code=..., tray_sn=..., ...) reads the last few
+        KB of the files that got this far,
+      * body: where(exit_code=...) and the FRU/diag columns parse the body
+        of the files whose footer passed.
+
+    Example:
+        rows = (LogSet('Z:/Bianca')
+                .between('2026-05-13', '2026-05-16')
+                .station('FCT').failed()
+                .where(error_code='E028163006_000-000-1-000000000140')
+                .select('SN', 'Tray_SN', 'NVL0_SN', 'log_file_name'))
+        for row in rows:
+            print(row)
+        rows.to_csv('EC140.csv')
+    """
+
+    def __init__(self, root: str, file_glob: str = '*.log', hour_glob: str = '??'):
+        """
+        Args:
+            root: The share root holding the 'YYYY-MM-DD/HH' folders.
+            file_glob: Files to consider in each hour folder.
+            hour_glob: Hour folders to consider.
+        """
+        self.root = root
+        self.file_glob = file_glob
+        self.hour_glob = hour_glob
+        self._window = None
+        self._name_filters = {}
+        self._footer_filters = {}
+        self._body_filters = {}
+        self._columns = DEFAULT_COLUMNS
+        self._readers = 8
+
+    def _with(self, **changes) -> 'LogSet':
+        query = copy.copy(self)
+        query._name_filters = dict(self._name_filters)
+        query._footer_filters = dict(self._footer_filters)
+        query._body_filters = dict(self._body_filters)
+        for name, value in changes.items():
+            setattr(query, name, value)
+        return query
+
+    # --- Directory layer ---
+
+    def between(self, start, end) -> 'LogSet':
+        """
+        Keeps the logs of a date range, e.g. between('2026-05-13', '2026-05-16'),
+        or of an hour window, e.g. between('2026-05-14 22:00', '2026-05-15 02:00').
+        Both bounds are inclusive.
+        """
+        return self._with(_window=(start, end))
+
+    def last_hours(self, hours: int) -> 'LogSet':
+        """
+        Keeps the logs of the last N hour folders up to now.
+        """
+        return self._with(_window=last_hours(hours))
+
+    # --- File name layer ---
+
+    def station(self, *stations: str) -> 'LogSet':
+        """
+        Keeps the logs of one or more stations ('FCT', 'NVL', ...).
+        """
+        query = self._with()
+        query._name_filters['station'] = list(stations)
+        return query
+
+    def failed(self) -> 'LogSet':
+        query = self._with()
+        query._name_filters['result'] = 'F'
+        return query
+
+    def passed(self) -> 'LogSet':
+        query = self._with()
+        query._name_filters['result'] = 'P'
+        return query
+
+    def sn(self, sn: str) -> 'LogSet':
+        """
+        Keeps the logs of one board serial number, as written in the name.
+        """
+        query = self._with()
+        query._name_filters['sn'] = sn
+        return query
+
+    def pn(self, pn: str) -> 'LogSet':
+        """
+        Keeps the logs of one product part number, as written in the name.
+        """
+        query = self._with()
+        query._name_filters['pn'] = pn
+        return query
+
+    # --- Footer and body layers ---
+
+    def where(self, **filters) -> 'LogSet':
+        """
+        Adds footer and body predicates.
+
+        Footer filters take the names of log_parsers.footer_matches
+        (error_code, routing, station, pn, diag, board_sn, tray_sn, flat_id);
+        each value may be a string, a collection or a callable. Body filters
+        pick ONEDIAG result rows: exit_code (a code or a collection of codes)
+        and failed_only. A log with no matching row is dropped.
+
+        Raises:
+            ValueError: For an unknown filter name.
+        """
+        query = self._with()
+        for name, value in filters.items():
+            if name in FOOTER_FILTER_FIELDS:
+                query._footer_filters[name] = value
+            elif name in BODY_FILTERS:
+                query._body_filters[name] = value
+            else:
+                raise ValueError(f"Unknown filter '{name}'; use one of "
+                                 f"{sorted(FOOTER_FILTER_FIELDS) + list(BODY_FILTERS)}")
+        return query
+
+    def select(self, *columns: str) -> 'LogSet':
+        """
+        Picks the output columns; see NAME_COLUMNS, FOOTER_COLUMNS,
+        FRU_COLUMNS and DIAG_RESULT_COLUMNS. Selecting a diag column gives one
+        row per matching ONEDIAG result instead of one row per log.
+
+        Raises:
+            ValueError: For an unknown column.
+        """
+        known = set(NAME_COLUMNS) | set(FOOTER_COLUMNS) | set(FRU_COLUMNS) | set(DIAG_RESULT_COLUMNS)
+        unknown = [column for column in columns if column not in known]
+        if unknown:
+            raise ValueError(f"Unknown column(s) {unknown}")
+        return self._with(_columns=tuple(columns))
+
+    def parallel(self, readers: int) -> 'LogSet':
+        """
+        Sets how many logs are read from the share at once (default 8).
+        """
+        return self._with(_readers=readers)
+
+    # --- Evaluation ---
+
+    def _pattern(self) -> str:
+        return '/'.join([self.root.rstrip('/\\'), DATE_DIR_GLOB, self.hour_glob, self.file_glob])
+
+    def _list_files(self) -> list[str]:
+        window = self._window
+        if window is None:
+            dates = list_date_dirs(self.root)
+            if not dates:
+                return []
+            window = (dates[0].isoformat(), dates[-1].isoformat())
+
+        start, end = window
+        if _is_date_only(start) and _is_date_only(end):
+            return get_log_files_in_date_range(self._pattern(), str(start), str(end))
+        return get_log_files_in_time_range(self._pattern(), start, end)
+
+    def files(self):
+        """
+        Yields the paths that pass the directory and file name layers, in
+        folder order. No file is opened.
+        """
+        paths = self._list_files()
+        if not self._name_filters:
+            yield from paths
+            return
+        for file_path, _ in filter_log_names(paths, **self._name_filters):
+            yield file_path
+
+    def _evaluate(self, file_path: str) -> list[dict]:
+        columns = self._columns
+        fru_devices = tuple(FRU_COLUMNS[column] for column in columns if column in FRU_COLUMNS)
+        per_result = any(column in DIAG_RESULT_COLUMNS for column in columns)
+        need_footer = bool(self._footer_filters) or any(column in FOOTER_COLUMNS for column in columns)
+        need_body = bool(fru_devices) or per_result or bool(self._body_filters)
+
+        footer = {}
+        fru_serials, results = {}, []
+        if need_body:
+            with map_file(file_path) as data:
+                if need_footer:
+                    footer = parse_log_footer(data)
+                    if self._footer_filters and (not footer or not footer_matches(footer, **self._footer_filters)):
+                        return []
+                fru_serials, results = parse_fru_and_diag_bytes(data, fru_devices)
+        elif need_footer:
+            footer = read_footer(file_path)
+            if self._footer_filters and (not footer or not footer_matches(footer, **self._footer_filters)):
+                return []
+
+        if self._body_filters or per_result:
+            results = filter_diag_results(results, self._body_filters.get('exit_code'),
+                                          self._body_filters.get('failed_only', False))
+            if self._body_filters and not results:
+                return []
+
+        values = self._name_fields(file_path)
+        for column, field in FOOTER_COLUMNS.items():
+            values[column] = footer.get(field)
+        for column, device in FRU_COLUMNS.items():
+            values[column] = fru_serials.get(device)
+
+        if not per_result:
+            return [{column: values.get(column) for column in columns}]
+
+        rows = []
+        for result in results:
+            values.update(asdict(result))
+            rows.append({column: values.get(column) for column in columns})
+        return rows
+
+    @staticmethod
+    def _name_fields(file_path: str) -> dict:
+        fields = {'file_path': file_path, 'log_file_name': os.path.basename(file_path)}
+        log_name = parse_log_name(file_path)
+        if log_name is not None:
+            fields['Station'] = log_name.station
+            fields['Result'] = log_name.result
+            fields['Timestamp'] = log_name.timestamp.isoformat() if log_name.timestamp else None
+        return fields
+
+    def _evaluate_quietly(self, file_path: str) -> list[dict]:
+        try:
+            return self._evaluate(file_path)
+        except Exception as e:
+            print(f"Error processing file {file_path}: {e}")
+            return []
+
+    def __iter__(self):
+        """
+        Yields one dict per result row, in folder order. Up to the
+        parallel() number of logs are read ahead of the consumer.
+        """
+        for rows in imap_ordered(self._evaluate_quietly, self.files(), workers=self._readers,
+                                 max_in_flight=self._readers * 4):
+            yield from rows
+
+    def count(self) -> int:
+        """
+        Returns the number of result rows.
+        """
+        return sum(1 for _ in self)
+
+    def to_csv(self, output_path: str) -> int:
+        """
+        Streams the result rows to a CSV file.
+
+        Returns:
+            The number of rows written.
+        """
+        row_count = 0
+        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=list(self._columns))
+            writer.writeheader()
+            for row in self:
+                writer.writerow(row)
+                row_count += 1
+        return row_count
+
+
+def _is_date_only(value) -> bool:
+    if isinstance(value, datetime):
+        return False
+    if isinstance(value, date):
+        return True
+    return len(str(value)) == len('YYYY-MM-DD')
@@ -0,0 +1,192 @@
+import csv
+import os
+
+from log_parallel import run_io_pipeline
+from log_parsers import PARSER_VERSION
+
+
+class Report:
+    """
+    One report fed by run_reports.
+
+    A report picks the files it wants by name, turns the contents of each
+    one into rows, and collects those rows. Subclasses override wants() and
+    extract(), and prepare()/begin()/add()/finish() to aggregate the rows.
+
+    extract() runs in the engine's parse thread, one file at a time and in
+    file order; add() runs in its writer thread.
+    """
+
+    name = 'report'
+
+    def prepare(self, file_paths: list[str]) -> None:
+        """
+        Called once with every file of the run, before the first wants().
+        """
+
+    def wants(self, file_path: str) -> bool:
+        """
+        Decides from the path alone whether extract() should see this file.
+        """
+        return True
+
+    def begin(self) -> None:
+        """
+        Called once before the first file.
+        """
+
+    def extract(self, file_path: str, data: bytes) -> list:
+        """
+        Returns the rows for one file, given its full contents.
+        """
+        raise NotImplementedError
+
+    def add(self, rows: list) -> None:
+        """
+        Receives the rows of one file, in file order.
+        """
+
+    def finish(self) -> None:
+        """
+        Called once after the last file, also when the run fails.
+        """
+
+
+class CsvReport(Report):
+    """
+    A report whose rows are streamed to one CSV file as they come in.
+
+    Rows may be dicts (written by fieldnames) or lists (written as-is). The
+    file is removed again if no row was written.
+    """
+
+    def __init__(self, name: str, output_path: str, fieldnames: list[str], parse_fn,
+                 accept_fn=None, suffix: str = '.log', config=None):
+        """
+        Args:
+            name: Shown in progress and error messages.
+            output_path: The CSV file to write.
+            fieldnames: The header row.
+            parse_fn: Callable taking (file_path, data: bytes) and returning
+                      rows, such as a script's parse_log_bytes.
+            accept_fn: Optional callable taking a path, such as a script's
+                       check_filename. Files it rejects are skipped.
+            suffix: Only file names ending in this are considered.
+            config: Optional JSON-serializable settings that change which
+                    rows parse_fn returns, such as a script's filters; see
+                    schema.
+        """
+        self.name = name
+        self.output_path = output_path
+        self.fieldnames = fieldnames
+        self.parse_fn = parse_fn
+        self.accept_fn = accept_fn
+        self.suffix = suffix
+        self.config = config
+        self.row_count = 0
+        self._csvfile = None
+        self._writer = None
+
+    @property
+    def schema(self) -> dict:
+        """
+        What the rows depend on besides the files: the columns, the config
+        and log_parsers.PARSER_VERSION. Rows stored under another schema
+        must be parsed again.
+        """
+        return {'fieldnames': list(self.fieldnames), 'config': self.config,
+                'parser_version': PARSER_VERSION}
+
+    def wants(self, file_path: str) -> bool:
+        if not file_path.endswith(self.suffix):
+            return False
+        return self.accept_fn is None or self.accept_fn(file_path)
+
+    def begin(self) -> None:
+        directory = os.path.dirname(self.output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._csvfile = open(self.output_path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._csvfile)
+        self._writer.writerow(self.fieldnames)
+
+    def extract(self, file_path: str, data: bytes) -> list:
+        return self.parse_fn(file_path, data)
+
+    def add(self, rows: list) -> None:
+        for row in rows:
+            if isinstance(row, dict):
+                row = [row.get(name) for name in self.fieldnames]
+            self._writer.writerow(row)
+        self.row_count += len(rows)
+
+    def finish(self) -> None:
+        if self._csvfile is None:
+            return
+        self._csvfile.close()
+        self._csvfile = None
+
+        if not self.row_count:
+            os.remove(self.output_path)
+            print(f"{self.name}: no matching entries found.")
+        else:
+            print(f"{self.name}: {self.row_count} row(s) written to {self.output_path}")
+
+
+def run_reports(file_paths: list[str], reports: list[Report], readers: int = 8,
+                max_in_flight: int = 32) -> int:
+    """
+    Feeds every file to every report that wants it, reading each file once.
+
+    Files no report wants are never opened. The rest go through
+    log_parallel.run_io_pipeline, and each report's extract() gets the same
+    bytes, so running N reports costs one scan of the share rather than N.
+    A report failing on one file doesn't stop the other reports.
+
+    Args:
+        file_paths: The files to process, in output order.
+        reports: The reports to feed.
+        readers: Concurrent reads against the share.
+        max_in_flight: Files read ahead of the parser.
+
+    Returns:
+        The number of files read.
+    """
+    for report in reports:
+        report.prepare(file_paths)
+
+    plan = {}
+    for file_path in file_paths:
+        wanted_by = [report for report in reports if report.wants(file_path)]
+        if wanted_by:
+            plan[file_path] = wanted_by
+
+    def parse_fn(file_path, data):
+        batches = []
+        for report in plan[file_path]:
+            try:
+                rows = report.extract(file_path, data)
+            except Exception as e:
+                print(f"Error in {report.name} for file {file_path}: {e}")
+                continue
+            if rows:
+                batches.append((report, rows))
+        return batches
+
+    def write_fn(batches):
+        for report, rows in batches:
+            report.add(rows)
+
+    print(f"Reading {len(plan)} of {len(file_paths)} file(s) once for {len(reports)} report(s)...")
+
+    started = []
+    try:
+        for report in reports:
+            report.begin()
+            started.append(report)
+        run_io_pipeline(list(plan), parse_fn, write_fn, readers=readers, max_in_flight=max_in_flight)
+    finally:
+        for report in started:
+            report.finish()
+
+    return len(plan)
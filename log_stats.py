@@ -0,0 +1,260 @@
+import json
+import math
+import os
+import sys
+
+from log_cache import write_json_atomic
+
+
+class RunningStats:
+    """
+    Count, mean, variance, min and max of a stream of numbers, updated one
+    value at a time (Welford) without keeping the values.
+
+    Two instances built over different files can be merged, so per-file or
+    per-worker results add up to the fleet-wide figures.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: 'RunningStats') -> None:
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> 'RunningStats':
+        stats = cls()
+        stats.count = payload['count']
+        stats.mean = payload['mean']
+        stats.m2 = payload['m2']
+        stats.min = payload['min']
+        stats.max = payload['max']
+        return stats
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with a fixed relative error (DDSketch-style).
+
+    Values are counted in logarithmic buckets, so every quantile it returns
+    is within relative_accuracy of a true sample value whatever the scale.
+    That suits BERs, which spread over several decades. Memory grows with
+    the number of decades covered, not with the number of values.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        """
+        Args:
+            relative_accuracy: Worst-case relative error of a quantile.
+        """
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _bucket(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _bucket_value(self, index: int) -> float:
+        # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i]
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value > 0:
+            index = self._bucket(value)
+            self.positive[index] = self.positive.get(index, 0) + 1
+        elif value < 0:
+            index = self._bucket(-value)
+            self.negative[index] = self.negative.get(index, 0) + 1
+        else:
+            self.zero_count += 1
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.positive.items():
+            self.positive[index] = self.positive.get(index, 0) + count
+        for index, count in other.negative.items():
+            self.negative[index] = self.negative.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Returns the approximate q-quantile (0 <= q <= 1), or None if empty.
+        """
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+        # Most negative first: large negative buckets come before small ones
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._bucket_value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._bucket_value(index)
+        return self._bucket_value(max(self.positive))
+
+    def to_dict(self) -> dict:
+        # JSON keys must be strings
+        return {'relative_accuracy': self.relative_accuracy,
+                'positive': {str(k): v for k, v in self.positive.items()},
+                'negative': {str(k): v for k, v in self.negative.items()},
+                'zero_count': self.zero_count, 'count': self.count}
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> 'QuantileSketch':
+        sketch = cls(payload['relative_accuracy'])
+        sketch.positive = {int(k): v for k, v in payload['positive'].items()}
+        sketch.negative = {int(k): v for k, v in payload['negative'].items()}
+        sketch.zero_count = payload['zero_count']
+        sketch.count = payload['count']
+        return sketch
+
+
+class GroupedStats:
+    """
+    RunningStats plus a QuantileSketch per key, e.g. per (GPU, Nvlink, Lane).
+
+    Can be saved to and reloaded from a local JSON file, so a report adds
+    only the new logs to what earlier runs already counted.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.groups = {}
+
+    def add(self, key: tuple, value: float) -> None:
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = (RunningStats(), QuantileSketch(self.relative_accuracy))
+        group[0].add(value)
+        group[1].add(value)
+
+    def merge(self, other: 'GroupedStats') -> None:
+        for key, (stats, sketch) in other.groups.items():
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = (RunningStats(), QuantileSketch(self.relative_accuracy))
+            group[0].merge(stats)
+            group[1].merge(sketch)
+
+    def summary_rows(self, quantiles=(0.5, 0.9, 0.99)) -> list[dict]:
+        """
+        One dict per key with count, mean, stdev, min, max and the requested
+        quantiles (as 'p50', 'p90', ...), sorted by key.
+        """
+        rows = []
+        for key in sorted(self.groups):
+            stats, sketch = self.groups[key]
+            row = {'key': key, 'count': stats.count, 'mean': stats.mean,
+                   'stdev': stats.stdev, 'min': stats.min, 'max': stats.max}
+            for q in quantiles:
+                # Bucket midpoints can land just outside the exact range
+                row[f"p{q * 100:g}"] = min(max(sketch.quantile(q), stats.min), stats.max)
+            rows.append(row)
+        return rows
+
+    def to_dict(self) -> dict:
+        return {'relative_accuracy': self.relative_accuracy,
+                'groups': [[list(key), stats.to_dict(), sketch.to_dict()]
+                           for key, (stats, sketch) in self.groups.items()]}
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> 'GroupedStats':
+        grouped = cls(payload['relative_accuracy'])
+        for key, stats, sketch in payload['groups']:
+            grouped.groups[tuple(key)] = (RunningStats.from_dict(stats), QuantileSketch.from_dict(sketch))
+        return grouped
+
+
+def load_stats_state(state_path: str, schema=None) -> tuple[dict, set]:
+    """
+    Loads named GroupedStats and the set of files they already include.
+
+    Args:
+        state_path: Local JSON file written by save_stats_state.
+        schema: Anything JSON-serialisable describing what was measured. If
+                it differs from the stored one, the state starts empty.
+
+    Returns:
+        A (stats_by_name, merged_files) tuple; both empty on a first run.
+        Merged file entries come back as saved: paths, or tuples such as
+        (path, size, mtime_ns).
+    """
+    if not os.path.exists(state_path):
+        return {}, set()
+
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read stats state '{state_path}': {e}", file=sys.stderr)
+        return {}, set()
+
+    if payload.get('schema') != schema:
+        print(f"Stats state '{state_path}' was built for a different layout; starting fresh.")
+        return {}, set()
+
+    stats = {name: GroupedStats.from_dict(grouped) for name, grouped in payload['stats'].items()}
+    # JSON turns tuples into lists
+    return stats, {tuple(entry) if isinstance(entry, list) else entry for entry in payload['files']}
+
+
+def save_stats_state(state_path: str, stats: dict, merged_files: set, schema=None) -> None:
+    """
+    Saves named GroupedStats and the files they include; see load_stats_state.
+    """
+    write_json_atomic(state_path, {
+        'schema': schema,
+        'stats': {name: grouped.to_dict() for name, grouped in stats.items()},
+        'files': sorted(merged_files),
+    })
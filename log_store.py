@@ -0,0 +1,279 @@
+import os
+import sqlite3
+import threading
+from dataclasses import astuple, dataclass
+from datetime import datetime
+
+from log_archive import log_identity
+from log_cache import CACHE_DIR
+from log_discovery import parse_log_name
+from log_parsers import parse_fru_and_diag_bytes, parse_log_footer
+from log_query import DIAG_RESULT_COLUMNS, FOOTER_COLUMNS, FRU_COLUMNS
+from log_reports import Report, run_reports
+
+# Local database of parsed logs. Never put it on the share.
+STORE_PATH = os.path.join(CACHE_DIR, 'results.sqlite')
+
+# Per-log columns, after the log_file key.
+LOG_COLUMNS = ('log_file_name', 'size', 'mtime_ns', 'Station', 'Result', 'Name_Time') + \
+              tuple(FOOTER_COLUMNS) + tuple(FRU_COLUMNS)
+
+# Columns the stored logs are looked up by; each gets an index.
+INDEXED_COLUMNS = ('SN', 'Tray_SN', 'Error_Code', 'POD_Rack_Slot', 'StartTestTime')
+
+# Footer StartTestTime/EndTestTime layout, e.g. '20250810124729'.
+TEST_TIME_FORMAT = '%Y%m%d%H%M%S'
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS logs (log_file TEXT PRIMARY KEY, "
+    + ', '.join(f'"{column}"' for column in LOG_COLUMNS) + ")",
+    "CREATE TABLE IF NOT EXISTS diag_results (log_file TEXT NOT NULL, row_index INTEGER NOT NULL, "
+    + ', '.join(DIAG_RESULT_COLUMNS) + ", PRIMARY KEY (log_file, row_index))",
+    "CREATE INDEX IF NOT EXISTS diag_results_exit_code ON diag_results (exit_code)",
+] + [f'CREATE INDEX IF NOT EXISTS logs_{column} ON logs ("{column}")' for column in INDEXED_COLUMNS]
+
+
+def parse_log_record(file_path: str, data) -> tuple[dict, list]:
+    """
+    Extracts everything the store keeps about one .log file: the fields
+    decoded from its name, its footer, its FRU serials and every ONEDIAG
+    result row.
+
+    Args:
+        file_path: The full path to the log file.
+        data: Its contents (bytes or an mmap).
+
+    Returns:
+        A (record, diag results) tuple; record maps LOG_COLUMNS (but not
+        size/mtime_ns) to values.
+    """
+    footer = parse_log_footer(data)
+    fru_serials, results = parse_fru_and_diag_bytes(data)
+    log_name = parse_log_name(file_path)
+
+    record = {'log_file_name': os.path.basename(file_path)}
+    record['Station'] = log_name.station if log_name else None
+    record['Result'] = log_name.result if log_name else None
+    record['Name_Time'] = log_name.timestamp.isoformat() if log_name and log_name.timestamp else None
+    for column, field in FOOTER_COLUMNS.items():
+        record[column] = footer.get(field)
+    for column, device in FRU_COLUMNS.items():
+        record[column] = fru_serials.get(device)
+
+    return record, results
+
+
+def _test_time(value) -> str:
+    """
+    Converts a datetime or ISO string to the footer's StartTestTime layout,
+    which sorts as text.
+    """
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(value)
+    return value.strftime(TEST_TIME_FORMAT)
+
+
+@dataclass(frozen=True)
+class Like:
+    """
+    A find_logs filter matched as a pattern instead of exactly: '%' stands
+    for any run of characters and everything else is literal, '_' included,
+    so Like('%_POD3_%') only matches values containing '_POD3_'.
+
+    SQLite's LIKE ignores ASCII case and can't use the column indexes, so a
+    Like filter reads every stored log; pair it with an exact or time filter
+    on large stores.
+    """
+    pattern: str
+
+    def escaped(self) -> str:
+        """
+        Returns the pattern for LIKE ... ESCAPE '\\', with the '\\' and '_'
+        in its literal parts escaped.
+        """
+        return self.pattern.replace('\\', '\\\\').replace('_', '\\_')
+
+
+class ResultStore:
+    """
+    Local SQLite database of parsed footer, FRU and ONEDIAG result records,
+    one 'logs' row per log file (keyed by its path) plus its 'diag_results'
+    rows.
+
+    Logs are upserted, so re-ingesting a window only parses files that are
+    new or whose size/mtime changed. Lookups by SN, Tray_SN, Error_Code,
+    POD_Rack_Slot and StartTestTime use an index and never touch the share.
+    """
+
+    def __init__(self, db_path: str = STORE_PATH):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        # Written from the I/O pipeline's writer thread; every use holds the lock
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            for statement in _SCHEMA:
+                self.connection.execute(statement)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def is_current(self, file_path: str, identity: tuple[int, int] | None = None) -> bool:
+        """
+        True if the log is stored and its size/mtime haven't changed since.
+        """
+        if identity is None:
+            identity = log_identity(file_path)
+        if identity is None:
+            return False
+        with self.lock:
+            row = self.connection.execute("SELECT size, mtime_ns FROM logs WHERE log_file = ?",
+                                          (file_path,)).fetchone()
+        return row is not None and (row['size'], row['mtime_ns']) == tuple(identity)
+
+    def upsert(self, file_path: str, record: dict, results: list,
+               identity: tuple[int, int] | None = None, commit: bool = True) -> None:
+        """
+        Stores one log's record and result rows, replacing what was stored
+        for the same path.
+        """
+        if identity is None:
+            identity = log_identity(file_path)
+        size, mtime_ns = identity if identity else (None, None)
+        values = dict(record, size=size, mtime_ns=mtime_ns)
+
+        columns = ('log_file',) + LOG_COLUMNS
+        quoted = ', '.join(f'"{column}"' for column in columns)
+        updates = ', '.join(f'"{column}" = excluded."{column}"' for column in LOG_COLUMNS)
+        with self.lock:
+            self.connection.execute(
+                f"INSERT INTO logs ({quoted}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT (log_file) DO UPDATE SET {updates}",
+                [file_path] + [values.get(column) for column in LOG_COLUMNS])
+            self.connection.execute("DELETE FROM diag_results WHERE log_file = ?", (file_path,))
+            self.connection.executemany(
+                f"INSERT INTO diag_results VALUES ({', '.join('?' * (len(DIAG_RESULT_COLUMNS) + 2))})",
+                [(file_path, index) + astuple(result) for index, result in enumerate(results)])
+            if commit:
+                self.connection.commit()
+
+    def commit(self) -> None:
+        with self.lock:
+            self.connection.commit()
+
+    def ingest(self, file_paths: list[str], readers: int = 8, max_in_flight: int = 32) -> int:
+        """
+        Parses and upserts every .log in file_paths that isn't current yet,
+        reading each one once.
+
+        Returns:
+            The number of logs parsed.
+        """
+        return run_reports(file_paths, [StoreReport(self)], readers=readers, max_in_flight=max_in_flight)
+
+    def query(self, sql: str, params=()) -> list[dict]:
+        """
+        Runs any SELECT against the store and returns its rows as dicts.
+        """
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def find_logs(self, sn: str | Like | None = None, tray_sn: str | Like | None = None,
+                  error_code: str | Like | None = None, pod_rack_slot: str | Like | None = None,
+                  start_time=None, end_time=None, failed: bool | None = None, exit_code: str | None = None) -> list[dict]:
+        """
+        Looks logs up by the indexed columns.
+
+        String filters match exactly; wrap one in Like to match a pattern:
+        find_logs(error_code=Like('%140'), pod_rack_slot=Like('%-POD3-%')).
+
+        Args:
+            sn: Board serial number (footer BrdSN).
+            tray_sn: Tray serial number.
+            error_code: Footer Error Code.
+            pod_rack_slot: Footer FLAT ID, e.g. 'FXHC-POD3-R25-T5L'.
+            start_time: Earliest StartTestTime, as a datetime or ISO string.
+            end_time: Latest StartTestTime, as a datetime or ISO string.
+            failed: True for FAIL logs only, False for PASS logs only.
+            exit_code: Keep logs with a ONEDIAG result row of this exit code.
+
+        Returns:
+            The matching 'logs' rows, oldest StartTestTime first.
+        """
+        clauses = []
+        params = []
+        for column, value in (('SN', sn), ('Tray_SN', tray_sn), ('Error_Code', error_code),
+                              ('POD_Rack_Slot', pod_rack_slot)):
+            if value is None:
+                continue
+            if isinstance(value, Like):
+                clauses.append(f'"{column}" LIKE ? ESCAPE \'\\\'')
+                params.append(value.escaped())
+            else:
+                clauses.append(f'"{column}" = ?')
+                params.append(value)
+        if start_time is not None:
+            clauses.append('StartTestTime >= ?')
+            params.append(_test_time(start_time))
+        if end_time is not None:
+            clauses.append('StartTestTime <= ?')
+            params.append(_test_time(end_time))
+        if failed is not None:
+            clauses.append('Result = ?')
+            params.append('F' if failed else 'P')
+        if exit_code is not None:
+            clauses.append('log_file IN (SELECT log_file FROM diag_results WHERE exit_code = ?)')
+            params.append(exit_code)
+
+        where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+        return self.query(f'SELECT * FROM logs{where} ORDER BY StartTestTime', params)
+
+    def diag_results(self, log_file: str) -> list[dict]:
+        """
+        Returns the stored ONEDIAG result rows of one log, in table order.
+        """
+        return self.query('SELECT * FROM diag_results WHERE log_file = ? ORDER BY row_index', (log_file,))
+
+
+class StoreReport(Report):
+    """
+    Upserts every .log it sees into a ResultStore, so the store can be
+    filled by the same run_reports pass as the CSV reports. Logs already
+    current in the store are not read.
+    """
+
+    name = 'Result store'
+
+    # Logs upserted per transaction
+    commit_every = 500
+
+    def __init__(self, store: ResultStore):
+        self.store = store
+        self.stored = 0
+        self._identities = {}
+
+    def wants(self, file_path: str) -> bool:
+        if not file_path.endswith('.log'):
+            return False
+        identity = log_identity(file_path)
+        if self.store.is_current(file_path, identity):
+            return False
+        self._identities[file_path] = identity
+        return True
+
+    def extract(self, file_path: str, data: bytes) -> list:
+        return [(file_path,) + parse_log_record(file_path, data)]
+
+    def add(self, rows: list) -> None:
+        for file_path, record, results in rows:
+            self.store.upsert(file_path, record, results, self._identities.get(file_path), commit=False)
+            self.stored += 1
+            if self.stored % self.commit_every == 0:
+                self.store.commit()
+
+    def finish(self) -> None:
+        self.store.commit()
+        print(f"{self.name}: {self.stored} log(s) upserted into {self.store.db_path}")
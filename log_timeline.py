@@ -0,0 +1,313 @@
+import os
+from datetime import datetime, timezone
+
+from log_archive import open_log_text
+from log_discovery import parse_log_name
+from log_parsers import SKIP_SECTIONS, SectionRun, iter_log_lines, map_file, read_footer
+
+# Separator between the levels of the step path in a body line.
+STEP_SEPARATOR = " > "
+
+# Marker the recipe engine prints when a step finishes.
+ELAPSED_MARKER = "Elapsed: "
+
+# Epoch seconds at the start of each 'YYYY-MM-DDTHH:MM' + UTC offset seen
+# so far. A log spans a few dozen minutes, but a worker process parsing a
+# month of logs sees tens of thousands, so the cache is emptied whenever it
+# reaches _MINUTE_CACHE_SIZE entries.
+_minute_cache = {}
+_MINUTE_CACHE_SIZE = 4096
+
+
+def parse_log_timestamp(text: str) -> float | None:
+    """
+    Converts a body-line timestamp such as '2025-08-10T12:48:13.334648+08:00'
+    to epoch seconds.
+
+    For the fixed layout the minute prefix is converted once and cached;
+    each line then costs one float() on 'SS.ffffff'. Other ISO layouts fall
+    back to datetime.fromisoformat.
+
+    Returns:
+        Seconds since the epoch (UTC), or None if the text is not a timestamp.
+    """
+    if len(text) == 32 and text[10] == 'T' and text[19] == '.':
+        key = text[:16] + text[26:]
+        base = _minute_cache.get(key)
+        if base is None:
+            try:
+                base = datetime.fromisoformat(text[:16] + ':00' + text[26:]).timestamp()
+            except ValueError:
+                return None
+            if len(_minute_cache) >= _MINUTE_CACHE_SIZE:
+                _minute_cache.clear()
+            _minute_cache[key] = base
+        try:
+            return base + float(text[17:26])
+        except ValueError:
+            return None
+
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_elapsed(text: str) -> int | None:
+    """
+    Converts 'HH:MM:SS' to seconds, or returns None.
+    """
+    parts = text.strip().split(':')
+    if len(parts) != 3:
+        return None
+    try:
+        hours, minutes, seconds = (int(part) for part in parts)
+    except ValueError:
+        return None
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def split_step(segment: str) -> tuple[str, str | None]:
+    """
+    Splits 'FLASH_BMC (SUBRECIPE_FLASH_BMC)' into ('FLASH_BMC',
+    'SUBRECIPE_FLASH_BMC'); a plain 'PING_BMC' gives ('PING_BMC', None).
+    """
+    if segment.endswith(')'):
+        name, sep, recipe = segment[:-1].partition(' (')
+        if sep:
+            return name, recipe
+    return segment, None
+
+
+class StepNode:
+    """
+    One node of a recipe step tree, e.g. 'TEST_FIXTURE_CHECK' under
+    'Top Level'.
+
+    duration is the wall time of every line logged under this node (up to
+    the next line of the log), so a parent's duration includes its children.
+    elapsed adds up the recipe engine's own 'Elapsed: HH:MM:SS' markers.
+    """
+
+    def __init__(self, name: str, recipe: str | None = None):
+        self.name = name
+        self.recipe = recipe
+        self.start = None
+        self.end = None
+        self.duration = 0.0
+        self.elapsed = None
+        self.line_count = 0
+        self.children = {}
+
+    def child(self, segment: str) -> 'StepNode':
+        node = self.children.get(segment)
+        if node is None:
+            node = self.children[segment] = StepNode(*split_step(segment))
+        return node
+
+    def walk(self, path: tuple = ()):
+        """
+        Yields (path, node) for every node below this one, parents first;
+        path is the tuple of step names from the top level down.
+        """
+        for node in self.children.values():
+            node_path = path + (node.name,)
+            yield node_path, node
+            yield from node.walk(node_path)
+
+
+def _run_elapsed(run: SectionRun) -> int | None:
+    """
+    Adds up the 'Elapsed:' markers logged by a skipped section itself, found
+    with bytes.find; its sub-steps' markers are left out like the sub-steps.
+    """
+    marker = b"\t" + run.breadcrumb + b"\t" + ELAPSED_MARKER.encode()
+    total = None
+    position = run.data.find(marker)
+    while position >= 0:
+        start = position + len(marker)
+        end = run.data.find(b"\n", start)
+        seconds = parse_elapsed(run.data[start:end if end >= 0 else len(run.data)].decode('ascii', 'ignore'))
+        if seconds is not None:
+            total = (total or 0) + seconds
+        position = run.data.find(marker, start)
+    return total
+
+
+def parse_step_timeline(lines) -> StepNode:
+    """
+    Builds the recipe step tree of a .log file in one pass.
+
+    A SectionRun among the lines (see log_parsers.iter_log_lines) becomes
+    one step timed from its first to its last line, without its sub-steps,
+    so its lines are never decoded one by one.
+
+    Args:
+        lines: An iterable of text lines; pass the open file to stream it.
+
+    Returns:
+        A root StepNode whose children are the top-level recipes (normally
+        the single 'Top Level (RECIPE_...)' node).
+    """
+    root = StepNode("")
+    # Step path string -> the nodes from the top level down to the leaf
+    chains = {}
+    previous_chain = None
+    previous_time = None
+
+    for line in lines:
+        run = None
+        if isinstance(line, SectionRun):
+            run = line
+            line = run.first_line().decode('utf-8', errors='ignore')
+            fields = [line.split('\t', 1)[0], run.breadcrumb.decode('utf-8', errors='ignore'), '']
+        else:
+            fields = line.split('\t', 2)
+            if len(fields) < 3:
+                continue
+        timestamp = parse_log_timestamp(fields[0])
+        if timestamp is None:
+            continue
+
+        chain = chains.get(fields[1])
+        if chain is None:
+            chain = []
+            node = root
+            for segment in fields[1].split(STEP_SEPARATOR):
+                node = node.child(segment)
+                chain.append(node)
+            chains[fields[1]] = chain
+
+        if run is not None:
+            # Every gap inside the run belongs to the section's chain
+            last_time = parse_log_timestamp(run.last_line().decode('utf-8', errors='ignore').split('\t', 1)[0])
+            if last_time is None or last_time < timestamp:
+                last_time = timestamp
+            if previous_chain is not None and timestamp >= previous_time:
+                gap = timestamp - previous_time
+                for node in previous_chain:
+                    node.duration += gap
+            line_count = run.line_count()
+            for node in chain:
+                if node.start is None:
+                    node.start = timestamp
+                node.end = last_time
+                node.duration += last_time - timestamp
+                node.line_count += line_count
+            seconds = _run_elapsed(run)
+            if seconds is not None:
+                chain[-1].elapsed = (chain[-1].elapsed or 0) + seconds
+            previous_chain = chain
+            previous_time = last_time
+            continue
+
+        # The gap since the previous line belongs to the step that printed it
+        if previous_chain is not None and timestamp >= previous_time:
+            gap = timestamp - previous_time
+            for node in previous_chain:
+                node.duration += gap
+
+        for node in chain:
+            if node.start is None:
+                node.start = timestamp
+            node.end = timestamp
+            node.line_count += 1
+
+        message = fields[2]
+        if message.startswith(ELAPSED_MARKER):
+            seconds = parse_elapsed(message[len(ELAPSED_MARKER):])
+            if seconds is not None:
+                leaf = chain[-1]
+                leaf.elapsed = (leaf.elapsed or 0) + seconds
+
+        previous_chain = chain
+        previous_time = timestamp
+
+    return root
+
+
+def read_step_timeline(file_path: str, skip_sections=()) -> StepNode:
+    """
+    Returns the recipe step tree of a .log file; see parse_step_timeline.
+
+    Args:
+        file_path: The full path to the .log file.
+        skip_sections: Step paths (see log_parsers.SKIP_SECTIONS) kept as
+                       single steps, their lines stepped over in bulk.
+    """
+    if not skip_sections:
+        with open_log_text(file_path) as f:
+            return parse_step_timeline(f)
+
+    with map_file(file_path) as data:
+        return parse_step_timeline(iter_log_lines(data, skip_sections))
+
+
+def timeline_rows(root: StepNode, max_depth: int | None = None) -> list[dict]:
+    """
+    Flattens a step tree into one dict per node, parents first.
+
+    Args:
+        root: The tree returned by parse_step_timeline.
+        max_depth: Keep only nodes this many levels below the top level
+                   (1 = the top-level recipe itself). None keeps all.
+
+    Returns:
+        Dicts with Step_Path ('A > B > C'), Step, Depth, Start, End (epoch
+        seconds), Duration_s, Elapsed_s and Lines.
+    """
+    rows = []
+    for path, node in root.walk():
+        if max_depth is not None and len(path) > max_depth:
+            continue
+        rows.append({
+            'Step_Path': STEP_SEPARATOR.join(path),
+            'Step': node.name,
+            'Depth': len(path),
+            'Start': node.start,
+            'End': node.end,
+            'Duration_s': round(node.duration, 3),
+            'Elapsed_s': node.elapsed,
+            'Lines': node.line_count,
+        })
+    return rows
+
+
+# Columns of the per-log step rows returned by read_log_steps.
+STEP_ROW_FIELDS = ['Step_Path', 'Step', 'Depth', 'Start', 'End', 'Duration_s', 'Elapsed_s', 'Lines',
+                   'SN', 'Station', 'DiagVer', 'log_file_name']
+
+
+def read_log_steps(file_path: str, max_depth: int | None = None) -> list[dict]:
+    """
+    Returns the step rows of one .log file (see timeline_rows), each tagged
+    with the board SN and station from the file name and the DiagVer from
+    the footer, so reports can group timelines by tray, station or diag
+    release.
+
+    Args:
+        file_path: The full path to the .log file.
+        max_depth: Deepest step level kept (1 = top level). None keeps all.
+
+    Returns:
+        A list of dicts with the STEP_ROW_FIELDS keys.
+    """
+    log_name = parse_log_name(file_path)
+    diag_version = read_footer(file_path).get("DiagVer")
+
+    # Sections at max_depth lose their sub-steps to it anyway, so their
+    # lines (the DUT boot UART capture) are stepped over in bulk
+    skip_sections = [] if max_depth is None else [
+        section for section in SKIP_SECTIONS if len(section.split(STEP_SEPARATOR)) >= max_depth]
+
+    rows = timeline_rows(read_step_timeline(file_path, skip_sections), max_depth)
+    for row in rows:
+        row['SN'] = log_name.sn if log_name else None
+        row['Station'] = log_name.station if log_name else None
+        row['DiagVer'] = diag_version
+        row['log_file_name'] = os.path.basename(file_path)
+
+    return rows